@@ -1,112 +1,161 @@
 # backtester/backtester.py
 
-import pandas as pd
-from quant_bot.utils.metrics import (
+import numpy as np
+
+from backtester.costs import prepare_costs
+from backtester.engine import TRADE_BUY, TRADE_DTYPE, IntrabarPrices, as_price_array, simulate
+from backtester.ledger import TradeLedger
+from utils.market_data import as_market_data
+from utils.metrics import (
     calculate_sharpe_ratio,
     calculate_max_drawdown,
-    calculate_win_rate,
-    calculate_profit_factor
+    calculate_trade_statistics
 )
+from utils.profiling import make_profiler
 
 class Backtester:
     def __init__(self, data, strategy_cls, strategy_kwargs={}, initial_cash=100000, allocation_pct=0.1,
-                 stop_loss_pct=0.05, take_profit_pct=0.1):
+                 stop_loss_pct=0.05, take_profit_pct=0.1, use_jit=True, profile=False, intrabar=False,
+                 costs=None):
 
         """
               Initialize the backtester.
 
               Parameters:
-              - data: OHLCV DataFrame
+              - data: OHLCV DataFrame or utils.market_data.MarketData
               - strategy_cls: strategy class to instantiate
               - strategy_kwargs: arguments for the strategy (e.g. windows)
               - initial_cash: starting capital
               - allocation_pct: % of cash to use per trade
               - stop_loss_pct: % drop from entry price to trigger stop-loss
               - take_profit_pct: % rise from entry price to trigger take-profit
+              - use_jit: run the execution loop through Numba when it is installed
+              - profile: True, or a dict of utils.profiling.Profiler options such as
+                {'use_cprofile': True}, to time each phase; the report is added to
+                the summary under 'profile'
+              - intrabar: where stop-loss / take-profit are checked. False: against
+                each bar's close (fills at the close). True: against each bar's
+                High/Low (fills at the stop/target level, or the Open on a gap).
+                A DataFrame/MarketData of finer bars (e.g. minute High/Low): against
+                those, in order, so the level reached first inside a bar wins
+              - costs: optional backtester.costs.CostModel (commission, spread,
+                slippage, next-open fills); default: free fills at the close
               """
 
-        self.data = data.copy()
-        self.strategy = strategy_cls(data, **strategy_kwargs)
+        self.profiler = make_profiler(profile)
+        with self.profiler.phase('market_data'):
+            self.data = as_market_data(data)  # read-only, shared with the strategy
+            if intrabar is True:
+                self.intrabar = IntrabarPrices.from_bars(self.data)
+            elif intrabar is False or intrabar is None:
+                self.intrabar = None
+            else:
+                self.intrabar = IntrabarPrices.from_sub_bars(self.data, as_market_data(intrabar))
+            self.costs = prepare_costs(costs, self.data)
+        with self.profiler.phase('strategy_init'):
+            self.strategy = strategy_cls(self.data, **strategy_kwargs)
         self.initial_cash = initial_cash
         self.allocation_pct = allocation_pct
         self.stop_loss_pct = stop_loss_pct
         self.take_profit_pct = take_profit_pct
+        self.use_jit = use_jit
 
-        self.equity_curve = []
+        self.equity_curve = np.empty(0)  # float64, one value per bar
         self.position = 0
         self.cash = initial_cash
         self.portfolio_value = initial_cash
-        self.trades = []
+        self.trades = np.empty(0, dtype=TRADE_DTYPE)  # record array (engine.TRADE_DTYPE)
+        self.ledger = TradeLedger.empty()  # completed round trips
+        self.prices = None  # closes of every run so far; bar indices count across runs
 
         self.entry_price = None  # track for SL/TP
+        self.entry_index = None
 
-    def run(self):
+    def run(self, metrics_only=False):
         """
         Execute the backtest using the strategy’s signals.
         Applies stop-loss and take-profit exit logic.
-        """
-        signals = self.strategy.generate_signals()
-        prices = self.data['Close'].values
-
-        for i, signal in enumerate(signals):
-            price = prices[i]
-            if pd.isna(price):
-                self.equity_curve.append(self.portfolio_value)
-                continue
-
-            # If in position, check stop-loss or take-profit first
-            if self.position > 0 and self.entry_price is not None:
-                if price <= self.entry_price * (1 - self.stop_loss_pct):
-                    # Trigger stop-loss
-                    self.cash += self.position * price
-                    self.trades.append(('stop_loss', i, price, self.position))
-                    self.position = 0
-                    self.entry_price = None
-
-                elif price >= self.entry_price * (1 + self.take_profit_pct):
-                    # Trigger take-profit
-                    self.cash += self.position * price
-                    self.trades.append(('take_profit', i, price, self.position))
-                    self.position = 0
-                    self.entry_price = None
+        The bar loop itself runs in backtester.engine (Numba-compiled when available).
 
-            # Handle new signal
-            if signal == 'buy' and self.cash > 0 and self.position == 0:
-                allocation = self.cash * self.allocation_pct
-                shares_to_buy = allocation // price
-                if shares_to_buy > 0:
-                    cost = shares_to_buy * price
-                    self.cash -= cost
-                    self.position += shares_to_buy
-                    self.entry_price = price
-                    self.trades.append(('buy', i, price, shares_to_buy))
-
-            elif signal == 'sell' and self.position > 0:
-                proceeds = self.position * price
-                self.cash += proceeds
-                self.trades.append(('sell', i, price, self.position))
-                self.position = 0
-                self.entry_price = None
-
-            self.portfolio_value = self.cash + self.position * price
-            self.equity_curve.append(self.portfolio_value)
-
-        return self.get_summary()
+        With metrics_only=True the summary leaves out the trades and the
+        equity curve, and the backtester does not keep them either.
+        """
+        with self.profiler.phase('signals'):
+            signals = self.strategy.generate_signal_array()
+            prices = as_price_array(self.data['Close'])
+        # Bars of earlier runs come first, so this run's bar i is bar offset + i
+        offset = len(self.prices) if self.prices is not None else 0
+
+        with self.profiler.phase('execution'):
+            result = simulate(
+                prices, signals,
+                initial_cash=self.cash,
+                allocation_pct=self.allocation_pct,
+                stop_loss_pct=self.stop_loss_pct,
+                take_profit_pct=self.take_profit_pct,
+                position=self.position,
+                entry_price=self.entry_price,
+                portfolio_value=self.portfolio_value,
+                use_jit=self.use_jit,
+                intrabar=self.intrabar,
+                costs=self.costs
+            )
+
+            self.ledger = self.ledger.concat(TradeLedger.from_trades(
+                result.trade_type, result.trade_index + offset, result.trade_price, result.trade_shares,
+                open_index=self.entry_index if self.entry_index is not None else -1,
+                open_price=self.entry_price if self.entry_price is not None else float('nan')
+            ))
+            if result.position > 0 and len(result.trade_type) and result.trade_type[-1] == TRADE_BUY:
+                self.entry_index = int(result.trade_index[-1]) + offset
+            elif result.position == 0:
+                self.entry_index = None
+
+        self.cash = result.cash
+        self.position = result.position
+        self.entry_price = result.entry_price
+        self.portfolio_value = result.portfolio_value
+        self.prices = np.concatenate([self.prices, prices]) if offset else prices
+        if metrics_only:
+            # Metrics only need this run's equity; trade statistics come from the ledger
+            self.equity_curve = result.equity
+        else:
+            # Later runs continue from this account state, so their output is appended
+            trades = result.trade_records()
+            trades['index'] += offset
+            self.trades = np.concatenate([self.trades, trades]) if len(self.trades) else trades
+            self.equity_curve = (np.concatenate([self.equity_curve, result.equity])
+                                 if len(self.equity_curve) else result.equity)
+
+        summary = self.get_summary()
+        if metrics_only:
+            del summary['trades'], summary['equity_curve']
+            self.equity_curve = np.empty(0)
+        self.profiler.stop()
+        return summary
 
     def get_summary(self):
         """
         Return a summary of the backtest.
-        Includes final value, return, trades, and equity curve.
+        Includes final value, return, trades (TRADE_DTYPE record array),
+        and equity curve (float64 array).
+        Trade statistics come from one pass over the round-trip ledger.
         """
-        total_return = (self.portfolio_value - self.initial_cash) / self.initial_cash
-        return {
-            'initial_cash': float(self.initial_cash),
-            'final_value': float(self.portfolio_value),
-            'total_return': float(total_return),
-            'trades': self.trades,
-            'equity_curve': self.equity_curve,
-            'sharpe_ratio': float(calculate_sharpe_ratio(self.equity_curve)),
-            'max_drawdown': float(calculate_max_drawdown(self.equity_curve)),
-            'win_rate': float(calculate_win_rate(self.trades)),
-            'profit_factor': float(calculate_profit_factor(self.trades))
-        }
\ No newline at end of file
+        with self.profiler.phase('metrics'):
+            total_return = (self.portfolio_value - self.initial_cash) / self.initial_cash
+            trade_stats = calculate_trade_statistics(self.ledger, self.prices)
+            summary = {
+                'initial_cash': float(self.initial_cash),
+                'final_value': float(self.portfolio_value),
+                'total_return': float(total_return),
+                'trades': self.trades,
+                'equity_curve': self.equity_curve,
+                'sharpe_ratio': float(calculate_sharpe_ratio(self.equity_curve)),
+                'max_drawdown': float(calculate_max_drawdown(self.equity_curve)),
+                'win_rate': float(trade_stats['win_rate']),
+                'profit_factor': float(trade_stats['profit_factor']),
+                'trade_stats': trade_stats
+            }
+        if self.profiler.enabled:
+            summary['profile'] = self.profiler.report()
+        return summary
\ No newline at end of file
@@ -0,0 +1,103 @@
+# backtester/costs.py
+
+import numpy as np
+
+FILL_MODES = ('close', 'next_open')
+
+
+class ExecutionCosts:
+    """
+    Costs of one price history as per-bar arrays, ready for the execution loop
+    (engine.simulate / simulate_batch):
+    - fill_prices: price a signal on each bar fills at (NaN = no fill)
+    - cost_rate: fraction of the price paid on each fill (half spread + slippage)
+    - impact_rate: extra fraction of the price per share traded
+    - commission, commission_pct: per-trade commission, fixed and as a fraction of value
+    """
+    def __init__(self, fill_prices, cost_rate, impact_rate, commission=0.0, commission_pct=0.0):
+        self.fill_prices = np.ascontiguousarray(fill_prices, dtype=np.float64)
+        self.cost_rate = np.ascontiguousarray(cost_rate, dtype=np.float64)
+        self.impact_rate = np.ascontiguousarray(impact_rate, dtype=np.float64)
+        self.commission = float(commission)
+        self.commission_pct = float(commission_pct)
+
+    def __len__(self):
+        return len(self.fill_prices)
+
+    def slice(self, start=None, stop=None):
+        """
+        Costs of bars [start, stop) (views, no copy).
+        """
+        return ExecutionCosts(self.fill_prices[start:stop], self.cost_rate[start:stop],
+                              self.impact_rate[start:stop], self.commission, self.commission_pct)
+
+
+class CostModel:
+    """
+    Transaction costs and fill timing for Backtester, sweeps and optimizers.
+
+    Every part of the model is an array transform over the price history
+    (`prepare`), so the compiled execution loop only reads one value per
+    fill and batched sweeps pay for it once, not once per parameter set.
+
+    Parameters:
+    - commission: fixed commission per trade (in cash)
+    - commission_pct: commission as a fraction of the traded value
+    - spread_pct: bid/ask spread as a fraction of the price; half is paid on each fill
+    - slippage_pct: extra fraction of the price lost on each fill
+    - impact: volume-participation slippage; a fill of `shares` moves its price
+      by impact * shares / Volume of the bar (bars without Volume get none)
+    - fill: 'close' fills signals at their bar's close; 'next_open' fills them
+      at the next bar's Open (recorded on the signal bar; a signal on the last
+      bar does not fill). Stop-loss / take-profit exits keep their own fill
+      prices either way, and pay the same costs.
+    """
+    def __init__(self, commission=0.0, commission_pct=0.0, spread_pct=0.0, slippage_pct=0.0, impact=0.0,
+                 fill='close'):
+        if fill not in FILL_MODES:
+            raise ValueError(f"fill must be one of {FILL_MODES}")
+        self.commission = commission
+        self.commission_pct = commission_pct
+        self.spread_pct = spread_pct
+        self.slippage_pct = slippage_pct
+        self.impact = impact
+        self.fill = fill
+
+    def __repr__(self):
+        return (f"CostModel(commission={self.commission!r}, commission_pct={self.commission_pct!r}, "
+                f"spread_pct={self.spread_pct!r}, slippage_pct={self.slippage_pct!r}, "
+                f"impact={self.impact!r}, fill={self.fill!r})")
+
+    def prepare(self, data):
+        """
+        Per-bar cost arrays for an OHLCV DataFrame or MarketData.
+
+        Returns:
+        - ExecutionCosts
+        """
+        close = np.asarray(data['Close'], dtype=np.float64)
+        n = len(close)
+
+        if self.fill == 'next_open':
+            if 'Open' not in data:
+                raise ValueError("next_open fills need an 'Open' column")
+            fill_prices = np.full(n, np.nan)
+            fill_prices[:-1] = np.asarray(data['Open'], dtype=np.float64)[1:]
+        else:
+            fill_prices = close
+
+        cost_rate = np.full(n, self.spread_pct / 2 + self.slippage_pct)
+        impact_rate = np.zeros(n)
+        if self.impact and 'Volume' in data:
+            volume = np.asarray(data['Volume'], dtype=np.float64)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                impact_rate = np.where(volume > 0, self.impact / volume, 0.0)
+
+        return ExecutionCosts(fill_prices, cost_rate, impact_rate, self.commission, self.commission_pct)
+
+
+def prepare_costs(costs, data):
+    """
+    ExecutionCosts for `data` from a CostModel (None stays None).
+    """
+    return costs.prepare(data) if costs is not None else None
@@ -0,0 +1,586 @@
+# backtester/engine.py
+
+from enum import IntEnum
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # pure NumPy/Python fallback
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Trade type codes stored in the trade arrays
+TRADE_BUY = 0
+TRADE_SELL = 1
+TRADE_STOP_LOSS = 2
+TRADE_TAKE_PROFIT = 3
+
+TRADE_TYPES = ('buy', 'sell', 'stop_loss', 'take_profit')
+
+
+class TradeType(IntEnum):
+    BUY = TRADE_BUY
+    SELL = TRADE_SELL
+    STOP_LOSS = TRADE_STOP_LOSS
+    TAKE_PROFIT = TRADE_TAKE_PROFIT
+
+
+# One trade per record (25 bytes); 'type' holds a TradeType code
+TRADE_DTYPE = np.dtype([('type', np.int8), ('index', np.int64), ('price', np.float64), ('shares', np.float64)])
+
+
+# Signal codes (same as strategies.base_strategy)
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+
+def as_price_array(values):
+    """
+    Converts a price column (Series, one-column DataFrame or array)
+    to a contiguous 1D float64 array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 2:
+        values = values[:, 0]
+    return np.ascontiguousarray(values)
+
+
+def _simulate(prices, signals, cash, position, entry_price, portfolio_value,
+              allocation_pct, stop_loss_pct, take_profit_pct,
+              fill_prices, cost_rate, impact_rate, commission, commission_pct,
+              equity, positions, trade_type, trade_index, trade_price, trade_shares):
+    """
+    Bar-by-bar execution loop over preallocated arrays.
+    Written in the Numba subset so it can be JIT-compiled; runs as plain
+    Python when Numba is not installed.
+
+    Stops are checked against `prices` (the close) and fill there; signals
+    fill at `fill_prices`. Every fill pays cost_rate (a fraction of the
+    price) plus impact_rate per share traded, and commission +
+    commission_pct of its value. Trade prices and entry_price are all-in
+    per-share prices (costs and commission included); with zero costs they
+    are the raw fill prices.
+
+    entry_price is only meaningful while position > 0.
+    Returns the final (cash, position, entry_price, portfolio_value, n_trades).
+    """
+    n_trades = 0
+
+    for i in range(len(signals)):
+        price = prices[i]
+        if np.isnan(price):
+            equity[i] = portfolio_value
+            positions[i] = position
+            continue
+
+        # If in position, check stop-loss or take-profit first, then a sell signal
+        signal = signals[i]
+        kind = -1
+        fill = price
+        if position > 0:
+            if price <= entry_price * (1 - stop_loss_pct):
+                kind = TRADE_STOP_LOSS
+            elif price >= entry_price * (1 + take_profit_pct):
+                kind = TRADE_TAKE_PROFIT
+            elif signal == SIGNAL_SELL and not np.isnan(fill_prices[i]):
+                kind = TRADE_SELL
+                fill = fill_prices[i]
+
+        if kind >= 0:
+            fill = fill * (1 - cost_rate[i]) * (1 - impact_rate[i] * position)
+            proceeds = position * fill
+            fee = commission + commission_pct * proceeds
+            cash += proceeds - fee
+            trade_type[n_trades] = kind
+            trade_index[n_trades] = i
+            trade_price[n_trades] = fill - fee / position
+            trade_shares[n_trades] = position
+            n_trades += 1
+            position = 0.0
+
+        # Handle a buy signal
+        if signal == SIGNAL_BUY and cash > 0 and position == 0:
+            unit_price = fill_prices[i] * (1 + cost_rate[i])
+            shares_to_buy = (cash * allocation_pct - commission) // (unit_price * (1 + commission_pct))
+            if shares_to_buy > 0:
+                unit_price = unit_price * (1 + impact_rate[i] * shares_to_buy)
+                cost = shares_to_buy * unit_price
+                fee = commission + commission_pct * cost
+                cash -= cost + fee
+                position += shares_to_buy
+                entry_price = unit_price + fee / shares_to_buy
+                trade_type[n_trades] = TRADE_BUY
+                trade_index[n_trades] = i
+                trade_price[n_trades] = entry_price
+                trade_shares[n_trades] = shares_to_buy
+                n_trades += 1
+
+        portfolio_value = cash + position * price
+        equity[i] = portfolio_value
+        positions[i] = position
+
+    return cash, position, entry_price, portfolio_value, n_trades
+
+
+_simulate_jit = njit(cache=True)(_simulate) if NUMBA_AVAILABLE else _simulate
+
+
+class IntrabarPrices:
+    """
+    Prices used to trigger stop-loss / take-profit inside bars.
+
+    Holds Open/High/Low of "sub-bars" laid out bar by bar: the sub-bars of
+    bar i are rows bar_start[i]:bar_start[i + 1]. With bar data alone every
+    bar is its own single sub-bar; with finer data (e.g. minute bars) the
+    order of the sub-bars tells which level was reached first.
+    """
+    def __init__(self, open, high, low, bar_start):
+        self.open = np.ascontiguousarray(open, dtype=np.float64)
+        self.high = np.ascontiguousarray(high, dtype=np.float64)
+        self.low = np.ascontiguousarray(low, dtype=np.float64)
+        self.bar_start = np.ascontiguousarray(bar_start, dtype=np.int64)
+
+    @classmethod
+    def from_bars(cls, data):
+        """
+        One sub-bar per bar from the High/Low (and Open, if present) columns
+        of an OHLCV DataFrame or MarketData.
+        """
+        if 'High' not in data or 'Low' not in data:
+            raise ValueError("intrabar stops need 'High' and 'Low' columns")
+        high = as_price_array(data['High'])
+        open_ = as_price_array(data['Open']) if 'Open' in data else np.full(len(high), np.nan)
+        return cls(open_, high, as_price_array(data['Low']), np.arange(len(high) + 1))
+
+    @classmethod
+    def from_sub_bars(cls, data, sub_data):
+        """
+        Sub-bars from finer-grained data: each row of `sub_data` belongs to the
+        last bar whose timestamp is at or before its own (bar timestamps mark
+        the start of the bar, as with yfinance daily data). Bars without any
+        sub-bars fall back to their own Open/High/Low.
+
+        Parameters:
+        - data: the bars being backtested (DataFrame or MarketData)
+        - sub_data: High/Low (and optionally Open) on a sorted index of the same type
+        """
+        bars = cls.from_bars(data)
+        sub = cls.from_bars(sub_data)
+        n = len(bars.high)
+
+        owner = np.asarray(data.index.searchsorted(sub_data.index, side='right'), dtype=np.int64) - 1
+        keep = (owner >= 0) & (owner < n)
+        owner = owner[keep]
+        missing = np.ones(n, dtype=bool)
+        missing[owner] = False
+
+        # Stable sort by owning bar: sub-bars keep their order, filler rows go to empty bars
+        owners = np.concatenate([owner, np.flatnonzero(missing)])
+        order = np.argsort(owners, kind='stable')
+        columns = [np.concatenate([sub_values[keep], bar_values[missing]])[order]
+                   for sub_values, bar_values in ((sub.open, bars.open), (sub.high, bars.high), (sub.low, bars.low))]
+        bar_start = np.searchsorted(owners[order], np.arange(n + 1), side='left')
+        return cls(*columns, bar_start)
+
+
+# Helpers of the intrabar loop come in two versions: vectorized NumPy for the
+# plain Python loop, and scalar loops for the Numba-compiled one (where they
+# avoid temporary arrays).
+
+def _next_index(mask):
+    """
+    For each position i, the first position >= i where `mask` is True
+    (len(mask) when there is none), via a reversed cumulative minimum.
+    """
+    n = len(mask)
+    positions = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(positions[::-1])[::-1].copy()
+
+
+def _next_index_scalar(mask):
+    n = len(mask)
+    result = np.empty(n, dtype=np.int64)
+    next_position = n
+    for i in range(n - 1, -1, -1):
+        if mask[i]:
+            next_position = i
+        result[i] = next_position
+    return result
+
+
+def _first_hit(high, low, start, end, stop_level, target_level):
+    """
+    First sub-bar in [start, end) whose Low reaches `stop_level` or whose High
+    reaches `target_level` (-1 if none). Scans vectorized windows that double
+    in size, so short holds stay cheap and long ones take few passes.
+    """
+    size = 64
+    while start < end:
+        stop = min(start + size, end)
+        hits = np.flatnonzero((low[start:stop] <= stop_level) | (high[start:stop] >= target_level))
+        if len(hits) > 0:
+            return start + hits[0]
+        start = stop
+        size *= 2
+    return -1
+
+
+def _first_hit_scalar(high, low, start, end, stop_level, target_level):
+    for j in range(start, end):
+        if low[j] <= stop_level or high[j] >= target_level:
+            return j
+    return -1
+
+
+def _mark_to_market(prices, start, end, cash, position, portfolio_value, equity, positions):
+    """
+    Equity and position of bars [start, end) held without trading (NaN closes
+    keep the last value). Returns the portfolio value after the last bar.
+    """
+    values = cash + position * prices[start:end]
+    equity[start:end] = values
+    positions[start:end] = position
+    missing = np.isnan(values)
+    if not missing.any():
+        return values[-1] if end > start else portfolio_value
+    for k in np.flatnonzero(missing):
+        equity[start + k] = equity[start + k - 1] if k > 0 else portfolio_value
+    return equity[end - 1]
+
+
+def _mark_to_market_scalar(prices, start, end, cash, position, portfolio_value, equity, positions):
+    for k in range(start, end):
+        if not np.isnan(prices[k]):
+            portfolio_value = cash + position * prices[k]
+        equity[k] = portfolio_value
+        positions[k] = position
+    return portfolio_value
+
+
+def _make_intrabar_kernel(first_hit, mark_to_market):
+    def _simulate_intrabar(prices, signals, next_buy, next_sell, sub_open, sub_high, sub_low, bar_start,
+                           cash, position, entry_price, portfolio_value,
+                           allocation_pct, stop_loss_pct, take_profit_pct,
+                           fill_prices, cost_rate, impact_rate, commission, commission_pct,
+                           equity, positions, trade_type, trade_index, trade_price, trade_shares):
+        """
+        Execution loop that resolves stop-loss / take-profit against sub-bar
+        High/Low instead of the close. Same entry, signal-exit, allocation and
+        cost rules as `_simulate`, and the same return values.
+
+        Instead of checking every bar, it jumps between events: while flat, to
+        the next buy signal (`next_buy`); while holding, to the earlier of the
+        first sub-bar that hits a level (`_first_hit`) and the next sell signal
+        (`next_sell`). The bars in between are marked to market in one pass.
+
+        A level hit fills at the level, or at the sub-bar's Open when it gapped
+        through. When one sub-bar reaches both levels the stop is assumed first.
+        A position opened on a bar's close can only be stopped from the next bar.
+        """
+        n = len(signals)
+        n_trades = 0
+        i = 0
+        while i < n:
+            if position > 0:
+                stop_level = entry_price * (1 - stop_loss_pct)
+                target_level = entry_price * (1 + take_profit_pct)
+                sell_bar = next_sell[i]
+                last_bar = sell_bar if sell_bar < n else n - 1
+                hit = first_hit(sub_high, sub_low, bar_start[i], bar_start[last_bar + 1], stop_level, target_level)
+                exit_bar = np.searchsorted(bar_start, hit, side='right') - 1 if hit >= 0 else sell_bar
+
+                # Held through bars i .. exit_bar - 1
+                end = exit_bar if exit_bar < n else n
+                portfolio_value = mark_to_market(prices, i, end, cash, position, portfolio_value,
+                                                 equity, positions)
+                if exit_bar >= n:
+                    break
+
+                i = exit_bar
+                if hit >= 0:
+                    if sub_open[hit] <= stop_level:
+                        price, kind = sub_open[hit], TRADE_STOP_LOSS
+                    elif sub_open[hit] >= target_level:
+                        price, kind = sub_open[hit], TRADE_TAKE_PROFIT
+                    elif sub_low[hit] <= stop_level:
+                        price, kind = stop_level, TRADE_STOP_LOSS
+                    else:
+                        price, kind = target_level, TRADE_TAKE_PROFIT
+                else:
+                    price, kind = fill_prices[i], TRADE_SELL
+                price = price * (1 - cost_rate[i]) * (1 - impact_rate[i] * position)
+                proceeds = position * price
+                fee = commission + commission_pct * proceeds
+                cash += proceeds - fee
+                trade_type[n_trades] = kind
+                trade_index[n_trades] = i
+                trade_price[n_trades] = price - fee / position
+                trade_shares[n_trades] = position
+                n_trades += 1
+                position = 0.0
+                portfolio_value = cash
+
+            # Flat from bar i (after any exit on it) until the next buy signal
+            buy_bar = next_buy[i]
+            end = buy_bar if buy_bar < n else n
+            equity[i:end] = portfolio_value
+            positions[i:end] = 0.0
+            if buy_bar >= n:
+                break
+
+            i = buy_bar
+            if cash > 0:
+                unit_price = fill_prices[i] * (1 + cost_rate[i])
+                shares_to_buy = (cash * allocation_pct - commission) // (unit_price * (1 + commission_pct))
+                if shares_to_buy > 0:
+                    unit_price = unit_price * (1 + impact_rate[i] * shares_to_buy)
+                    cost = shares_to_buy * unit_price
+                    fee = commission + commission_pct * cost
+                    cash -= cost + fee
+                    position += shares_to_buy
+                    entry_price = unit_price + fee / shares_to_buy
+                    trade_type[n_trades] = TRADE_BUY
+                    trade_index[n_trades] = i
+                    trade_price[n_trades] = entry_price
+                    trade_shares[n_trades] = shares_to_buy
+                    n_trades += 1
+            portfolio_value = cash + position * prices[i]
+            equity[i] = portfolio_value
+            positions[i] = position
+            i += 1
+
+        return cash, position, entry_price, portfolio_value, n_trades
+
+    return _simulate_intrabar
+
+
+_simulate_intrabar = _make_intrabar_kernel(_first_hit, _mark_to_market)
+if NUMBA_AVAILABLE:
+    _next_index_jit = njit(cache=True)(_next_index_scalar)
+    _simulate_intrabar_jit = njit(_make_intrabar_kernel(njit(cache=True)(_first_hit_scalar),
+                                                        njit(cache=True)(_mark_to_market_scalar)))
+else:
+    _next_index_jit = _next_index
+    _simulate_intrabar_jit = _simulate_intrabar
+
+
+def _cost_args(costs, prices):
+    """
+    Execution-loop cost arguments (fill_prices, cost_rate, impact_rate,
+    commission, commission_pct) from a backtester.costs.ExecutionCosts,
+    or zero costs with fills at `prices` when `costs` is None.
+    """
+    if costs is None:
+        zeros = np.zeros(len(prices))
+        return prices, zeros, zeros, 0.0, 0.0
+    if len(costs) != len(prices):
+        raise ValueError("execution costs do not cover the same bars as `prices`")
+    return costs.fill_prices, costs.cost_rate, costs.impact_rate, float(costs.commission), float(costs.commission_pct)
+
+
+class SimulationResult:
+    """
+    Output of `simulate`: per-bar equity/position arrays, the trade arrays
+    (trimmed to the trades actually made) and the final account state.
+    """
+    def __init__(self, equity, positions, trade_type, trade_index, trade_price, trade_shares,
+                 cash, position, entry_price, portfolio_value):
+        self.equity = equity
+        self.positions = positions
+        self.trade_type = trade_type
+        self.trade_index = trade_index
+        self.trade_price = trade_price
+        self.trade_shares = trade_shares
+        self.cash = cash
+        self.position = position
+        self.entry_price = entry_price
+        self.portfolio_value = portfolio_value
+
+    def trade_records(self):
+        """
+        Trades as a TRADE_DTYPE record array.
+        """
+        records = np.empty(len(self.trade_type), dtype=TRADE_DTYPE)
+        records['type'] = self.trade_type
+        records['index'] = self.trade_index
+        records['price'] = self.trade_price
+        records['shares'] = self.trade_shares
+        return records
+
+
+def simulate(prices, signals, initial_cash=100000, allocation_pct=0.1, stop_loss_pct=0.05,
+             take_profit_pct=0.1, position=0.0, entry_price=None, portfolio_value=None, use_jit=True,
+             intrabar=None, costs=None):
+    """
+    Run the execution loop over NumPy arrays.
+
+    Parameters:
+    - prices: 1D array of closes (NaN bars are skipped); fill prices unless `costs` says otherwise
+    - signals: int8 signal array (+1 buy, -1 sell, 0 hold)
+    - initial_cash: cash at the start of the run
+    - allocation_pct / stop_loss_pct / take_profit_pct: same as Backtester
+    - position, entry_price, portfolio_value: account state to resume from
+    - use_jit: use the Numba-compiled loop when Numba is installed
+    - intrabar: optional IntrabarPrices; stop-loss / take-profit then trigger on
+      the bars' (or sub-bars') High/Low instead of the close
+    - costs: optional backtester.costs.ExecutionCosts for the same bars
+      (fill prices, spread/slippage, commission)
+
+    Returns:
+    - SimulationResult
+    """
+    prices = as_price_array(prices)
+    signals = np.ascontiguousarray(signals, dtype=np.int8)
+    n = len(signals)
+    if portfolio_value is None:
+        portfolio_value = initial_cash
+
+    equity = np.empty(n, dtype=np.float64)
+    positions = np.empty(n, dtype=np.float64)
+    # At most one exit and one entry per bar
+    trade_type = np.empty(2 * n, dtype=np.int8)
+    trade_index = np.empty(2 * n, dtype=np.int64)
+    trade_price = np.empty(2 * n, dtype=np.float64)
+    trade_shares = np.empty(2 * n, dtype=np.float64)
+
+    cost_args = _cost_args(costs, prices)
+    state = (float(initial_cash), float(position), float(entry_price) if entry_price is not None else 0.0,
+             float(portfolio_value), float(allocation_pct), float(stop_loss_pct), float(take_profit_pct),
+             *cost_args, equity, positions, trade_type, trade_index, trade_price, trade_shares)
+    if intrabar is None:
+        kernel = _simulate_jit if use_jit else _simulate
+        cash, position, entry_price, portfolio_value, n_trades = kernel(prices, signals, *state)
+    else:
+        if len(intrabar.bar_start) != n + 1:
+            raise ValueError("intrabar prices do not cover the same bars as `prices`")
+        valid = ~np.isnan(prices) & ~np.isnan(cost_args[0])
+        kernel, next_index = (_simulate_intrabar_jit, _next_index_jit) if use_jit else (_simulate_intrabar, _next_index)
+        cash, position, entry_price, portfolio_value, n_trades = kernel(
+            prices, signals,
+            next_index((signals == SIGNAL_BUY) & valid), next_index((signals == SIGNAL_SELL) & valid),
+            intrabar.open, intrabar.high, intrabar.low, intrabar.bar_start, *state
+        )
+
+    return SimulationResult(
+        equity, positions,
+        trade_type[:n_trades].copy(), trade_index[:n_trades].copy(),
+        trade_price[:n_trades].copy(), trade_shares[:n_trades].copy(),
+        cash, position, entry_price if position > 0 else None, portfolio_value
+    )
+
+
+# Columns of the metrics array returned by `simulate_batch`
+BATCH_METRICS = ('final_value', 'total_return', 'sharpe_ratio', 'max_drawdown',
+                 'win_rate', 'profit_factor', 'total_trades')
+
+
+def _make_batch_kernel(simulate_kernel):
+    def _simulate_batch(prices, signals, initial_cash, allocation_pct, stop_loss_pct,
+                        take_profit_pct, fill_prices, cost_rate, impact_rate, commission, commission_pct,
+                        metrics):
+        """
+        Runs `simulate_kernel` for every row of a (params x bars) signal matrix,
+        reusing one set of scratch buffers, and writes summary metrics per row
+        (same formulas as utils/metrics.py) instead of keeping equity curves.
+        """
+        n_rows, n = signals.shape
+        equity = np.empty(n, dtype=np.float64)
+        positions = np.empty(n, dtype=np.float64)
+        trade_type = np.empty(2 * n, dtype=np.int8)
+        trade_index = np.empty(2 * n, dtype=np.int64)
+        trade_price = np.empty(2 * n, dtype=np.float64)
+        trade_shares = np.empty(2 * n, dtype=np.float64)
+
+        for row in range(n_rows):
+            cash, position, entry_price, portfolio_value, n_trades = simulate_kernel(
+                prices, signals[row], initial_cash, 0.0, 0.0, initial_cash,
+                allocation_pct, stop_loss_pct, take_profit_pct,
+                fill_prices, cost_rate, impact_rate, commission, commission_pct,
+                equity, positions, trade_type, trade_index, trade_price, trade_shares
+            )
+
+            # Win rate / profit factor: pair each exit with the most recent buy
+            wins = 0
+            exits = 0
+            profit = 0.0
+            loss = 0.0
+            buy_price = 0.0
+            for k in range(n_trades):
+                if trade_type[k] == TRADE_BUY:
+                    buy_price = trade_price[k]
+                elif buy_price != 0.0:
+                    exits += 1
+                    if trade_price[k] > buy_price:
+                        wins += 1
+                    pnl = (trade_price[k] - buy_price) * trade_shares[k]
+                    if pnl > 0:
+                        profit += pnl
+                    else:
+                        loss += abs(pnl)
+
+            # Sharpe ratio of bar returns (population std, annualized with √252)
+            sharpe = np.nan
+            if n > 1:
+                total = 0.0
+                for i in range(1, n):
+                    total += (equity[i] - equity[i - 1]) / equity[i - 1]
+                mean = total / (n - 1)
+                var = 0.0
+                for i in range(1, n):
+                    diff = (equity[i] - equity[i - 1]) / equity[i - 1] - mean
+                    var += diff * diff
+                std = np.sqrt(var / (n - 1))
+                sharpe = 0.0 if std == 0 else mean / std * np.sqrt(252.0)
+
+            # Max drawdown
+            peak = equity[0] if n > 0 else 0.0
+            max_drawdown = 0.0
+            for i in range(n):
+                if equity[i] > peak:
+                    peak = equity[i]
+                drawdown = (equity[i] - peak) / peak
+                if drawdown < max_drawdown:
+                    max_drawdown = drawdown
+
+            metrics[row, 0] = portfolio_value
+            metrics[row, 1] = (portfolio_value - initial_cash) / initial_cash
+            metrics[row, 2] = sharpe
+            metrics[row, 3] = max_drawdown
+            metrics[row, 4] = wins / exits if exits > 0 else 0.0
+            metrics[row, 5] = profit / loss if loss > 0 else np.inf
+            metrics[row, 6] = exits
+
+    return _simulate_batch
+
+
+_simulate_batch = _make_batch_kernel(_simulate)
+_simulate_batch_jit = njit(_make_batch_kernel(_simulate_jit)) if NUMBA_AVAILABLE else _simulate_batch
+
+
+def simulate_batch(prices, signal_matrix, initial_cash=100000, allocation_pct=0.1, stop_loss_pct=0.05,
+                   take_profit_pct=0.1, use_jit=True, costs=None):
+    """
+    Backtest many signal rows against the same prices in one compiled pass.
+
+    Parameters:
+    - prices: 1D array of closes
+    - signal_matrix: int8 array of shape (n_param_sets, n_bars)
+    - other arguments: same as `simulate`
+
+    Returns:
+    - float64 array of shape (n_param_sets, len(BATCH_METRICS))
+    """
+    prices = as_price_array(prices)
+    signal_matrix = np.ascontiguousarray(signal_matrix, dtype=np.int8)
+    metrics = np.empty((signal_matrix.shape[0], len(BATCH_METRICS)), dtype=np.float64)
+
+    kernel = _simulate_batch_jit if use_jit else _simulate_batch
+    kernel(prices, signal_matrix, float(initial_cash), float(allocation_pct),
+           float(stop_loss_pct), float(take_profit_pct), *_cost_args(costs, prices), metrics)
+    return metrics
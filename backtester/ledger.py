@@ -0,0 +1,96 @@
+# backtester/ledger.py
+
+import numpy as np
+import pandas as pd
+
+from backtester.engine import TRADE_BUY, TRADE_TYPES
+
+
+def trades_to_frame(trades):
+    """
+    TRADE_DTYPE trade records as a DataFrame with 'Type' labels
+    ('buy', 'sell', ...), 'Index', 'Price' and 'Shares' columns.
+    """
+    return pd.DataFrame({
+        'Type': np.array(TRADE_TYPES)[trades['type']],
+        'Index': trades['index'],
+        'Price': trades['price'],
+        'Shares': trades['shares'],
+    })
+
+
+class TradeLedger:
+    """
+    Round-trip trades stored as parallel NumPy arrays:
+    entry bar/price, exit bar/price, shares and exit reason
+    (a trade type code from backtester.engine: sell, stop_loss or take_profit).
+    """
+    def __init__(self, entry_index, entry_price, exit_index, exit_price, shares, exit_reason):
+        self.entry_index = entry_index
+        self.entry_price = entry_price
+        self.exit_index = exit_index
+        self.exit_price = exit_price
+        self.shares = shares
+        self.exit_reason = exit_reason
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int64), np.empty(0), np.empty(0, np.int64),
+                   np.empty(0), np.empty(0), np.empty(0, np.int8))
+
+    @classmethod
+    def from_trades(cls, trade_type, trade_index, trade_price, trade_shares, open_index=-1, open_price=np.nan):
+        """
+        Pairs the engine's trade arrays into round trips in one vectorized pass.
+
+        The engine only buys when flat and only exits an open position, so
+        every exit's entry is the trade just before it. An exit that is the
+        first trade closes the position carried in from an earlier run,
+        described by `open_index`/`open_price`.
+        """
+        exit_pos = np.flatnonzero(trade_type != TRADE_BUY)
+        entry_pos = exit_pos - 1
+        carried = entry_pos < 0
+        entry_pos = np.maximum(entry_pos, 0)
+
+        return cls(
+            np.where(carried, open_index, trade_index[entry_pos]).astype(np.int64),
+            np.where(carried, open_price, trade_price[entry_pos]).astype(np.float64),
+            trade_index[exit_pos].astype(np.int64),
+            trade_price[exit_pos].astype(np.float64),
+            trade_shares[exit_pos].astype(np.float64),
+            trade_type[exit_pos].astype(np.int8)
+        )
+
+    def concat(self, other):
+        return TradeLedger(*(np.concatenate([a, b]) for a, b in zip(self.columns(), other.columns())))
+
+    def columns(self):
+        return (self.entry_index, self.entry_price, self.exit_index,
+                self.exit_price, self.shares, self.exit_reason)
+
+    def __len__(self):
+        return len(self.exit_index)
+
+    @property
+    def pnl(self):
+        return (self.exit_price - self.entry_price) * self.shares
+
+    @property
+    def returns(self):
+        return self.exit_price / self.entry_price - 1
+
+    @property
+    def holding_bars(self):
+        return self.exit_index - self.entry_index
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'entry_index': self.entry_index,
+            'entry_price': self.entry_price,
+            'exit_index': self.exit_index,
+            'exit_price': self.exit_price,
+            'shares': self.shares,
+            'exit_reason': [TRADE_TYPES[r] for r in self.exit_reason.tolist()],
+            'pnl': self.pnl,
+        })
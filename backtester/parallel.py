@@ -0,0 +1,164 @@
+# backtester/parallel.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from utils.market_data import MarketData, as_market_data
+from utils.result_store import data_fingerprint, run_key
+
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# Shared memory blocks attached by this (worker) process, by block name
+_attached = {}
+
+
+class SharedPriceData:
+    """
+    Publishes OHLCV data into shared memory so pool workers can read it
+    without pickling. Each ticker becomes one float64 (columns x bars) block,
+    so every column is contiguous, plus one block for the date index.
+
+    Use as a context manager; the blocks are released on exit.
+    """
+    def __init__(self, data_by_ticker):
+        self._blocks = []
+        self.handles = {}
+        for ticker, data in data_by_ticker.items():
+            data = as_market_data(data)
+            columns = [c for c in PRICE_COLUMNS if c in data]
+            values = np.stack([data[c] for c in columns]) if columns else np.empty((0, len(data)))
+            index = data.index
+            datetime_index = isinstance(index, pd.DatetimeIndex)
+            tz = str(index.tz) if datetime_index and index.tz is not None else None
+            if tz is not None:
+                index = index.tz_convert('UTC').tz_localize(None)
+            # datetime64 keeps its own unit (pandas 2 uses ns, pandas 3 can use us)
+            index = np.asarray(index) if datetime_index else np.asarray(index, dtype=np.int64)
+
+            self.handles[ticker] = {
+                'values': self._publish(values),
+                'index': self._publish(index),
+                'columns': columns,
+                'datetime_index': datetime_index,
+                'tz': tz,
+            }
+
+    def _publish(self, array):
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        self._blocks.append(shm)
+        return shm.name, array.shape, array.dtype.str
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach_array(block):
+    name, shape, dtype = block
+    if name not in _attached:
+        _attached[name] = shared_memory.SharedMemory(name=name)
+    return np.ndarray(shape, dtype=dtype, buffer=_attached[name].buf)
+
+
+def attach_market_data(handle):
+    """
+    Rebuilds a read-only MarketData over a published ticker (no copy of the prices).
+    """
+    values = _attach_array(handle['values'])
+    index = pd.Index(_attach_array(handle['index']), copy=False)
+    if handle['datetime_index']:
+        index = pd.DatetimeIndex(index)
+        if handle['tz'] is not None:
+            index = index.tz_localize('UTC').tz_convert(handle['tz'])
+    return MarketData(dict(zip(handle['columns'], values)), index)
+
+
+def _run_job(handle, ticker, name, strategy_cls, params, backtest_kwargs):
+    from backtester.backtester import Backtester
+
+    results = Backtester(
+        data=attach_market_data(handle),
+        strategy_cls=strategy_cls,
+        strategy_kwargs=params,
+        **backtest_kwargs
+    ).run(metrics_only=True)
+
+    return {
+        'ticker': ticker,
+        'strategy': name,
+        'final_value': float(results['final_value']),
+        'total_return': float(results['total_return']),
+        'win_rate': float(results['win_rate']),
+        'sharpe_ratio': float(results['sharpe_ratio']),
+        'max_drawdown': float(results['max_drawdown']),
+        'profit_factor': float(results['profit_factor']),
+        'total_trades': results['trade_stats']['total_trades']
+    }
+
+
+def run_parallel(data_by_ticker, jobs, max_workers=None, on_result=None, store=None, **backtest_kwargs):
+    """
+    Run (ticker, strategy name, strategy class, params) backtests on a process pool.
+
+    Parameters:
+    - data_by_ticker: dict of ticker -> OHLCV DataFrame or MarketData (shared with workers via shared memory)
+    - jobs: list of (ticker, name, strategy_cls, params) tuples
+    - max_workers: number of worker processes (default: all cores)
+    - on_result: optional callback(job_index, result) called as each job completes
+    - store: optional utils.result_store.ResultStore; jobs already in it are not
+      rerun, and new results are saved to it as they complete
+    - backtest_kwargs: passed to every Backtester (initial_cash, stop_loss_pct, ...)
+
+    Returns:
+    - list of result dicts, in the same order as `jobs`
+    """
+    max_workers = max_workers or os.cpu_count()
+    results = [None] * len(jobs)
+    pending = list(range(len(jobs)))
+
+    if store is not None:
+        fingerprints = {ticker: data_fingerprint(data_by_ticker[ticker]) for ticker in {job[0] for job in jobs}}
+        keys = [run_key(fingerprints[ticker], strategy_cls, params, backtest_kwargs)
+                for ticker, _, strategy_cls, params in jobs]
+        cached = store.get_many(keys)
+        pending = [i for i in pending if keys[i] not in cached]
+        for i, (ticker, name, _, _) in enumerate(jobs):
+            if keys[i] in cached:
+                results[i] = {'ticker': ticker, 'strategy': name, **cached[keys[i]]}
+                if on_result is not None:
+                    on_result(i, results[i])
+
+    if not pending:
+        return results
+
+    tickers = {jobs[i][0] for i in pending}
+    shared_data = {ticker: data for ticker, data in data_by_ticker.items() if ticker in tickers}
+    with SharedPriceData(shared_data) as shared, ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_run_job, shared.handles[jobs[i][0]], *jobs[i], backtest_kwargs): i
+            for i in pending
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if store is not None:
+                ticker, name, strategy_cls, params = jobs[i]
+                store.put({**results[i], 'key': keys[i], 'strategy_cls': strategy_cls, 'params': params,
+                           'settings': backtest_kwargs, 'fingerprint': fingerprints[ticker]})
+            if on_result is not None:
+                on_result(i, results[i])
+
+    return results
@@ -0,0 +1,228 @@
+# backtester/portfolio.py
+
+import numpy as np
+import pandas as pd
+
+from backtester.engine import (
+    NUMBA_AVAILABLE, SIGNAL_BUY, SIGNAL_SELL, TRADE_BUY, TRADE_SELL, TRADE_STOP_LOSS,
+    TRADE_TAKE_PROFIT, TRADE_TYPES, as_price_array, njit
+)
+from backtester.ledger import TradeLedger
+from utils.metrics import (
+    calculate_sharpe_ratio,
+    calculate_max_drawdown,
+    calculate_trade_statistics
+)
+
+
+def _run_portfolio(prices, signals, t_start, cash, position, entry_price, mark,
+                   allocation_pct, stop_loss_pct, take_profit_pct,
+                   equity, position_history, record_positions,
+                   trade_type, trade_bar, trade_asset, trade_price, trade_shares):
+    """
+    Steps every asset on a shared timeline with one cash balance.
+
+    State lives in dense per-asset arrays (position, entry_price, mark) that are
+    updated in place. Each bar is handled with whole-row mask operations; only
+    the assets that actually trade are visited one by one (exits first, then
+    buys in column order, each taking allocation_pct of the cash left).
+
+    Stops early when the trade buffers could overflow on the next bar.
+    Returns (next bar to process, trades recorded, cash).
+    """
+    n_bars, n_assets = prices.shape
+    capacity = len(trade_type)
+    n_trades = 0
+
+    for t in range(t_start, n_bars):
+        if capacity - n_trades < 2 * n_assets:
+            return t, n_trades, cash
+
+        price = prices[t]
+        signal = signals[t]
+        valid = ~np.isnan(price)
+        held = valid & (position > 0)
+
+        # Stop-loss / take-profit first, then sell signals
+        stop = held & (price <= entry_price * (1 - stop_loss_pct))
+        take = held & ~stop & (price >= entry_price * (1 + take_profit_pct))
+        sell = held & ~stop & ~take & (signal == SIGNAL_SELL)
+        for a in np.nonzero(stop | take | sell)[0]:
+            cash += position[a] * price[a]
+            if stop[a]:
+                trade_type[n_trades] = TRADE_STOP_LOSS
+            elif take[a]:
+                trade_type[n_trades] = TRADE_TAKE_PROFIT
+            else:
+                trade_type[n_trades] = TRADE_SELL
+            trade_bar[n_trades] = t
+            trade_asset[n_trades] = a
+            trade_price[n_trades] = price[a]
+            trade_shares[n_trades] = position[a]
+            n_trades += 1
+            position[a] = 0.0
+
+        # New entries share the remaining cash, in asset order
+        for a in np.nonzero(valid & (position == 0) & (signal == SIGNAL_BUY))[0]:
+            if cash <= 0:
+                break
+            shares_to_buy = (cash * allocation_pct) // price[a]
+            if shares_to_buy > 0:
+                cash -= shares_to_buy * price[a]
+                position[a] = shares_to_buy
+                entry_price[a] = price[a]
+                trade_type[n_trades] = TRADE_BUY
+                trade_bar[n_trades] = t
+                trade_asset[n_trades] = a
+                trade_price[n_trades] = price[a]
+                trade_shares[n_trades] = shares_to_buy
+                n_trades += 1
+
+        # Mark to the last known price of every asset
+        for a in np.nonzero(valid)[0]:
+            mark[a] = price[a]
+        equity[t] = cash + np.sum(position * mark)
+        if record_positions:
+            position_history[t] = position
+
+    return n_bars, n_trades, cash
+
+
+_run_portfolio_jit = njit(cache=True)(_run_portfolio) if NUMBA_AVAILABLE else _run_portfolio
+
+
+def align_prices(data_by_ticker, column='Close'):
+    """
+    Aligns many tickers on the union of their dates.
+
+    Returns:
+    - (timeline DatetimeIndex, tickers, (time x asset) float64 array with NaN
+      where a ticker has no bar)
+    """
+    tickers = list(data_by_ticker)
+    timeline = pd.DatetimeIndex([])
+    for df in data_by_ticker.values():
+        timeline = timeline.union(df.index)
+
+    matrix = np.full((len(timeline), len(tickers)), np.nan)
+    for a, ticker in enumerate(tickers):
+        df = data_by_ticker[ticker]
+        matrix[timeline.get_indexer(df.index), a] = as_price_array(df[column])
+    return timeline, tickers, matrix
+
+
+class PortfolioBacktester:
+    """
+    Multi-asset backtester with a single cash pool.
+
+    Prices and signals are dense (time x asset) arrays; each asset has its own
+    position and stop-loss / take-profit, but all entries draw from the same
+    cash balance (allocation_pct of the cash available at the time).
+    """
+    def __init__(self, prices, signals, tickers=None, timeline=None, initial_cash=100000,
+                 allocation_pct=0.1, stop_loss_pct=0.05, take_profit_pct=0.1,
+                 record_positions=False, use_jit=True):
+        """
+        Parameters:
+        - prices: (time x asset) array of fill prices, NaN where an asset has no bar
+        - signals: (time x asset) int8 array of BUY (+1) / SELL (-1) / HOLD (0)
+        - tickers, timeline: optional labels for the asset and time axes
+        - initial_cash, allocation_pct, stop_loss_pct, take_profit_pct: same as Backtester
+        - record_positions: keep the full (time x asset) position history
+        - use_jit: run the step loop through Numba when it is installed
+        """
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.signals = np.ascontiguousarray(signals, dtype=np.int8)
+        if self.prices.shape != self.signals.shape:
+            raise ValueError("prices and signals must have the same (time x asset) shape")
+
+        n_bars, n_assets = self.prices.shape
+        self.tickers = list(tickers) if tickers is not None else list(range(n_assets))
+        self.timeline = timeline
+        self.initial_cash = initial_cash
+        self.allocation_pct = allocation_pct
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.record_positions = record_positions
+        self.use_jit = use_jit
+
+        self.cash = float(initial_cash)
+        self.position = np.zeros(n_assets)
+        self.entry_price = np.zeros(n_assets)
+        self.equity_curve = np.empty(n_bars)
+        self.position_history = np.zeros((n_bars, n_assets) if record_positions else (1, n_assets))
+        self.trades = None
+        self.ledger = None
+        self.ledger_assets = None  # asset index of each round trip in self.ledger
+
+    @classmethod
+    def from_strategy(cls, data_by_ticker, strategy_cls, strategy_kwargs={}, **kwargs):
+        """
+        Builds the price and signal matrices by running one strategy on every ticker.
+        Each ticker's signals are placed on the shared timeline ('hold' where
+        the ticker has no bar).
+        """
+        timeline, tickers, prices = align_prices(data_by_ticker)
+        signals = np.zeros(prices.shape, dtype=np.int8)
+        for a, ticker in enumerate(tickers):
+            df = data_by_ticker[ticker]
+            rows = timeline.get_indexer(df.index)
+            signals[rows, a] = strategy_cls(df, **strategy_kwargs).generate_signal_array()
+        return cls(prices, signals, tickers=tickers, timeline=timeline, **kwargs)
+
+    def run(self):
+        """
+        Execute the portfolio backtest and return its summary.
+        """
+        n_bars, n_assets = self.prices.shape
+        kernel = _run_portfolio_jit if self.use_jit else _run_portfolio
+        mark = np.zeros(n_assets)
+
+        capacity = max(4096, 4 * n_assets)
+        chunks = []
+        t = 0
+        while t < n_bars:
+            buffers = (np.empty(capacity, np.int8), np.empty(capacity, np.int64), np.empty(capacity, np.int64),
+                       np.empty(capacity), np.empty(capacity))
+            t, n_trades, self.cash = kernel(
+                self.prices, self.signals, t, self.cash, self.position, self.entry_price, mark,
+                float(self.allocation_pct), float(self.stop_loss_pct), float(self.take_profit_pct),
+                self.equity_curve, self.position_history, self.record_positions, *buffers
+            )
+            chunks.append(tuple(b[:n_trades] for b in buffers))
+            capacity *= 2
+
+        trade_type, trade_bar, trade_asset, trade_price, trade_shares = (
+            np.concatenate(column) for column in zip(*chunks)
+        )
+        self.trades = pd.DataFrame({
+            'type': np.array(TRADE_TYPES)[trade_type],
+            'bar': trade_bar,
+            'ticker': np.array(self.tickers, dtype=object)[trade_asset],
+            'price': trade_price,
+            'shares': trade_shares,
+        })
+
+        # Round trips: pair trades within each asset (stable sort keeps time order)
+        order = np.argsort(trade_asset, kind='stable')
+        self.ledger_assets = trade_asset[order][trade_type[order] != TRADE_BUY]
+        self.ledger = TradeLedger.from_trades(
+            trade_type[order], trade_bar[order], trade_price[order], trade_shares[order]
+        )
+        return self.get_summary()
+
+    def get_summary(self):
+        final_value = float(self.equity_curve[-1]) if len(self.equity_curve) else float(self.initial_cash)
+        trade_stats = calculate_trade_statistics(self.ledger)
+        return {
+            'initial_cash': float(self.initial_cash),
+            'final_value': final_value,
+            'total_return': (final_value - self.initial_cash) / self.initial_cash,
+            'trades': self.trades,
+            'equity_curve': self.equity_curve,
+            'sharpe_ratio': float(calculate_sharpe_ratio(self.equity_curve)),
+            'max_drawdown': float(calculate_max_drawdown(self.equity_curve)),
+            'win_rate': float(trade_stats['win_rate']),
+            'profit_factor': float(trade_stats['profit_factor']),
+            'trade_stats': trade_stats
+        }
@@ -0,0 +1,123 @@
+# backtester/streaming.py
+
+import numpy as np
+import pandas as pd
+
+from backtester.backtester import Backtester
+from backtester.engine import TRADE_BUY, TRADE_DTYPE, _simulate
+from backtester.ledger import TradeLedger
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class StreamingBacktester(Backtester):
+    """
+    Bar-by-bar version of Backtester for live feeds and paper trading.
+
+    Each call to `on_bar` asks the strategy for a signal (the strategy keeps
+    O(1)-update rolling state) and then applies exactly the same stop-loss,
+    take-profit and allocation rules as `Backtester.run`, so per-bar latency
+    does not grow with the length of the feed.
+    """
+    def __init__(self, strategy_cls, strategy_kwargs={}, initial_cash=100000, allocation_pct=0.1,
+                 stop_loss_pct=0.05, take_profit_pct=0.1):
+        super().__init__(pd.DataFrame(columns=PRICE_COLUMNS, dtype=float), strategy_cls, strategy_kwargs,
+                         initial_cash, allocation_pct, stop_loss_pct, take_profit_pct)
+        self.strategy.start_stream()
+        self.bar_index = 0
+        self.round_trips = []  # (entry_index, entry_price, exit_index, exit_price, shares, reason)
+
+        # Growable history buffers (doubled when full); bar_index / n_trades entries are used
+        self._price_buffer = np.empty(1024)
+        self._equity_buffer = np.empty(1024)
+        self._trade_buffer = np.empty(256, dtype=TRADE_DTYPE)
+        self.n_trades = 0
+
+        # One-bar buffers for the engine's execution step
+        self._price = np.empty(1)
+        self._signal = np.empty(1, dtype=np.int8)
+        self._equity = np.empty(1)
+        self._positions = np.empty(1)
+        self._no_cost = np.zeros(1)  # streaming fills are free, at the close
+        self._trade_type = np.empty(2, dtype=np.int8)
+        self._trade_index = np.empty(2, dtype=np.int64)
+        self._trade_price = np.empty(2)
+        self._trade_shares = np.empty(2)
+
+    def on_bar(self, bar):
+        """
+        Process one bar (mapping with 'Open', 'High', 'Low', 'Close', 'Volume').
+        Returns the strategy's signal for the bar.
+        """
+        signal = self.strategy.on_bar(bar)
+        price = float(bar['Close'])
+        self._price[0] = price
+        self._signal[0] = signal
+
+        cash, position, entry_price, portfolio_value, n_trades = _simulate(
+            self._price, self._signal, float(self.cash), float(self.position),
+            self.entry_price if self.entry_price is not None else 0.0, float(self.portfolio_value),
+            self.allocation_pct, self.stop_loss_pct, self.take_profit_pct,
+            self._price, self._no_cost, self._no_cost, 0.0, 0.0,
+            self._equity, self._positions,
+            self._trade_type, self._trade_index, self._trade_price, self._trade_shares
+        )
+
+        if self.bar_index == len(self._equity_buffer):
+            self._price_buffer = np.resize(self._price_buffer, 2 * self.bar_index)
+            self._equity_buffer = np.resize(self._equity_buffer, 2 * self.bar_index)
+        if self.n_trades + n_trades > len(self._trade_buffer):
+            self._trade_buffer = np.resize(self._trade_buffer, 2 * len(self._trade_buffer))
+
+        for k in range(n_trades):
+            trade_type = int(self._trade_type[k])
+            trade_price = float(self._trade_price[k])
+            shares = float(self._trade_shares[k])
+            if trade_type == TRADE_BUY:
+                self.entry_index = self.bar_index
+                self.entry_price = trade_price
+            else:
+                self.round_trips.append((self.entry_index, self.entry_price, self.bar_index,
+                                         trade_price, shares, trade_type))
+                self.entry_index = None
+                self.entry_price = None
+            self._trade_buffer[self.n_trades] = (trade_type, self.bar_index, trade_price, shares)
+            self.n_trades += 1
+
+        self.cash = cash
+        self.position = position
+        self.portfolio_value = portfolio_value
+        self._equity_buffer[self.bar_index] = self._equity[0]
+        self._price_buffer[self.bar_index] = price
+        self.bar_index += 1
+        return signal
+
+    def feed(self, bars):
+        """
+        Process an iterable of bars, or every row of an OHLCV DataFrame,
+        and return the summary.
+        """
+        if isinstance(bars, pd.DataFrame):
+            columns = [c for c in PRICE_COLUMNS if c in bars]
+            bars = ({c: v for c, v in zip(columns, row)}
+                    for row in np.column_stack([np.asarray(bars[c], dtype=float).reshape(len(bars), -1)[:, 0]
+                                                for c in columns]))
+        for bar in bars:
+            self.on_bar(bar)
+        return self.get_summary()
+
+    def run(self):
+        raise NotImplementedError("StreamingBacktester is driven by on_bar()/feed()")
+
+    def get_summary(self):
+        if self.round_trips:
+            columns = list(zip(*self.round_trips))
+            self.ledger = TradeLedger(
+                np.array(columns[0], dtype=np.int64), np.array(columns[1], dtype=np.float64),
+                np.array(columns[2], dtype=np.int64), np.array(columns[3], dtype=np.float64),
+                np.array(columns[4], dtype=np.float64), np.array(columns[5], dtype=np.int8)
+            )
+        self.prices = self._price_buffer[:self.bar_index]
+        self.equity_curve = self._equity_buffer[:self.bar_index]
+        self.trades = self._trade_buffer[:self.n_trades]
+        return super().get_summary()
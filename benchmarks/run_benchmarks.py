@@ -0,0 +1,197 @@
+# benchmarks/run_benchmarks.py
+#
+# Times the backtester, strategies, metrics and grid searches on synthetic data
+# and appends the results to a JSON history so runs can be compared between commits.
+#
+#   python -m benchmarks.run_benchmarks --sizes 1e3 1e4 1e5 --filter backtest
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from backtester.backtester import Backtester
+from backtester.engine import NUMBA_AVAILABLE
+from benchmarks.synthetic import generate_ohlcv
+from strategies.RSIBollingerStrategy import RSIBollingerStrategy
+from strategies.bollinger_breakout import BollingerBreakoutStrategy
+from strategies.high_low_breakout import HighLowBreakoutStrategy
+from strategies.macd_crossover import MACDCrossoverStrategy
+from strategies.rsi_divergence import RSIDivergenceStrategy
+from strategies.rsi_sma_combo import RSISMACrossoverStrategy
+from strategies.rsi_strategy import RSIStrategy
+from strategies.sma_crossover import SMACrossoverStrategy
+from tuning.sweep import run_sweep
+from utils import kernels, metrics
+from utils.indicators import get_cache
+
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), 'history.json')
+
+# Same strategies and parameters as strategy_tester.py
+STRATEGIES = [
+    ("SMA", SMACrossoverStrategy, {'short_window': 20, 'long_window': 50}),
+    ("RSI", RSIStrategy, {'rsi_window': 14}),
+    ("RSI+SMA", RSISMACrossoverStrategy, {'short_window': 20, 'long_window': 50, 'rsi_window': 14}),
+    ("Bollinger", BollingerBreakoutStrategy, {'window': 20, 'num_std': 2}),
+    ("MACD", MACDCrossoverStrategy, {'fast': 12, 'slow': 26, 'signal': 9}),
+    ("HighLow", HighLowBreakoutStrategy, {'lookback_window': 20, 'buffer_pct': 0.002}),
+    ("RSIDivergence", RSIDivergenceStrategy, {'rsi_window': 14, 'lookback': 5}),
+    ("RSIBollinger", RSIBollingerStrategy, {'lookback': 10, 'rsi_window': 14, 'window': 20, 'num_std': 2.0}),
+]
+
+# Same grids as the scripts in tuning/
+SWEEPS = [
+    ("grid_search", RSIDivergenceStrategy,
+     {'lookback': [10, 15, 20, 25], 'rsi_window': [10, 14, 20]}, None),
+    ("grid_search_macd", MACDCrossoverStrategy,
+     {'fast': [5, 8, 12], 'slow': [20, 26, 30], 'signal': [6, 9, 12]},
+     lambda params: params['fast'] < params['slow']),
+    ("grid_search_rsi_bollinger", RSIBollingerStrategy,
+     {'lookback': [5, 10, 15], 'rsi_window': [10, 14, 20], 'window': [10, 20], 'num_std': [1.5, 2.0, 2.5]}, None),
+]
+
+
+def build_benchmarks(df):
+    """
+    Returns (name, function) pairs to time on one synthetic dataset.
+    """
+    benchmarks = []
+    for name, cls, params in STRATEGIES:
+        benchmarks.append((f'signals:{name}', lambda cls=cls, params=params: cls(df, **params).generate_signals()))
+    for name, cls, params in STRATEGIES:
+        benchmarks.append((f'backtest:{name}', lambda cls=cls, params=params: Backtester(df, cls, params).run()))
+
+    # Metric inputs come from one MACD run
+    backtest = Backtester(df, MACDCrossoverStrategy, {'fast': 12, 'slow': 26, 'signal': 9})
+    summary = backtest.run()
+    equity_curve, trades = summary['equity_curve'], summary['trades']
+    benchmarks += [
+        ('metrics:calculate_sharpe_ratio', lambda: metrics.calculate_sharpe_ratio(equity_curve)),
+        ('metrics:calculate_max_drawdown', lambda: metrics.calculate_max_drawdown(equity_curve)),
+        ('metrics:calculate_win_rate', lambda: metrics.calculate_win_rate(trades)),
+        ('metrics:calculate_profit_factor', lambda: metrics.calculate_profit_factor(trades)),
+        ('metrics:calculate_trade_statistics',
+         lambda: metrics.calculate_trade_statistics(backtest.ledger, backtest.prices)),
+    ]
+
+    # Indicator kernels over the window ranges a sweep typically covers
+    close, windows = df['Close'].to_numpy(), list(range(5, 65, 5))
+    benchmarks += [
+        ('kernels:rolling_mean_std', lambda: kernels.rolling_mean_std(close, windows)),
+        # Low-variance prices (tiny moves next to the price level) with a long window
+        ('kernels:rolling_mean_std_flat', lambda: kernels.rolling_mean_std(1000 + close * 1e-4, [500])),
+        ('kernels:rolling_max', lambda: kernels.rolling_max(close, windows)),
+        ('kernels:rsi', lambda: kernels.rsi(close, windows)),
+        ('kernels:wilder_rsi', lambda: kernels.wilder_rsi(close, windows)),
+    ]
+
+    for name, cls, grid, constraint in SWEEPS:
+        benchmarks.append((f'sweep:{name}', lambda cls=cls, grid=grid, constraint=constraint:
+                           run_sweep(df, cls, grid, constraint=constraint)))
+    return benchmarks
+
+
+def time_call(func, repeat):
+    """
+    Best and mean wall time of `repeat` calls, each with a cold indicator cache.
+    """
+    timings = []
+    for _ in range(repeat):
+        get_cache().clear()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, previous, threshold):
+    """
+    Prints each result next to the previous run and returns the regressions.
+    """
+    regressions = []
+    for key, result in results.items():
+        line = f"{key:<50} {result['best']:>10.4f}s"
+        before = previous.get(key) if previous else None
+        if before:
+            ratio = result['best'] / before['best']
+            line += f"  {ratio:>6.2f}x vs {before['best']:.4f}s"
+            if ratio > 1 + threshold:
+                line += "  ⚠ REGRESSION"
+                regressions.append(key)
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtester benchmark suite")
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e4, 1e5, 1e6],
+                        help="numbers of bars to test (up to 1e8; 1e8 bars need ~8 GB of RAM)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed calls per benchmark (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model', choices=['gbm', 'random_walk'], default='gbm')
+    parser.add_argument('--filter', default='', help="only run benchmarks whose name contains this text")
+    parser.add_argument('--history', default=HISTORY_PATH, help="JSON history file")
+    parser.add_argument('--threshold', type=float, default=0.2, help="slowdown ratio reported as a regression")
+    parser.add_argument('--no-save', action='store_true', help="do not append this run to the history")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    # Compile the Numba kernels before timing anything
+    warmup = generate_ohlcv(100, seed=args.seed)
+    run_sweep(warmup, SMACrossoverStrategy, {'short_window': [5], 'long_window': [20]})
+    Backtester(warmup, SMACrossoverStrategy, {'short_window': 5, 'long_window': 20}).run()
+
+    results = {}
+    for size in args.sizes:
+        n_bars = int(size)
+        df = generate_ohlcv(n_bars, seed=args.seed, model=args.model)
+        for name, func in build_benchmarks(df):
+            if args.filter and args.filter not in name:
+                continue
+            best, mean = time_call(func, args.repeat)
+            results[f'{name}@{n_bars}'] = {'best': best, 'mean': mean}
+
+    history = load_history(args.history)
+    regressions = compare(results, history[-1]['results'] if history else None, args.threshold)
+
+    if not args.no_save:
+        history.append({
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'numba': NUMBA_AVAILABLE,
+            'seed': args.seed,
+            'model': args.model,
+            'results': results,
+        })
+        with open(args.history, 'w') as f:
+            json.dump(history, f, indent=2)
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/synthetic.py
+
+import numpy as np
+import pandas as pd
+
+
+def generate_ohlcv(n_bars, seed=0, model='gbm', start_price=100.0, drift=0.0, volatility=0.01,
+                   start='2000-01-01', freq='min'):
+    """
+    Generates a reproducible synthetic OHLCV DataFrame.
+
+    Parameters:
+    - n_bars: number of bars
+    - seed: random seed (same seed -> same data)
+    - model: 'gbm' (geometric Brownian motion) or 'random_walk' (arithmetic)
+    - start_price: first close
+    - drift, volatility: per-bar drift and volatility of the returns
+    - start, freq: date index of the bars
+
+    Returns:
+    - DataFrame with Open, High, Low, Close, Volume columns
+    """
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal(n_bars)
+
+    if model == 'gbm':
+        log_returns = (drift - 0.5 * volatility ** 2) + volatility * shocks
+        close = start_price * np.exp(np.cumsum(log_returns))
+    elif model == 'random_walk':
+        close = start_price + np.cumsum(drift + volatility * start_price * shocks)
+        close = np.maximum(close, 0.01)
+    else:
+        raise ValueError(f"Unknown model: {model}")
+
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+
+    # Intrabar range around the open/close body
+    wick = np.abs(rng.standard_normal((2, n_bars))) * volatility * 0.5
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    volume = rng.integers(1_000, 1_000_000, n_bars).astype(np.float64)
+
+    index = pd.date_range(start, periods=n_bars, freq=freq, name='Date')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume},
+                        index=index)
@@ -0,0 +1,255 @@
+# cli.py
+#
+# Single entry point for backtests, sweeps and the leaderboard:
+#
+#   python cli.py run macd --ticker NVDA -p fast=12 -p slow=26
+#   python cli.py sweep macd -g fast=5,8,12 -g slow=20,26,30 --top 5
+#   python cli.py leaderboard --tickers AAPL NVDA --workers 4
+#   python cli.py results --strategy macd --top 20
+#   python cli.py list
+#
+# Only argparse and the strategy registry are imported at startup; NumPy,
+# pandas, the engine, yfinance and matplotlib load inside the subcommand
+# that needs them.
+
+import argparse
+import ast
+import sys
+
+from strategies.registry import BUILTIN_STRATEGIES, available_strategies, default_params, get_strategy
+
+DEFAULT_TICKERS = ["AAPL", "NVDA", "TSLA", "GC=F", "PLTR"]
+
+
+def _parse_value(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _parse_params(items):
+    """
+    ['fast=12', 'num_std=2.5'] -> {'fast': 12, 'num_std': 2.5}
+    """
+    params = {}
+    for item in items or []:
+        name, _, value = item.partition('=')
+        params[name] = _parse_value(value)
+    return params
+
+
+def _parse_grid(items):
+    """
+    ['fast=5,8,12'] -> {'fast': [5, 8, 12]}
+    """
+    return {name: [_parse_value(v) for v in values.split(',')]
+            for name, _, values in (item.partition('=') for item in items)}
+
+
+def _cache(args):
+    from utils.data_cache import CSVSource, MarketDataCache, StubSource, YFinanceSource
+    sources = {'yfinance': YFinanceSource, 'csv': lambda: CSVSource(args.data_dir), 'stub': StubSource}
+    return MarketDataCache(sources[args.source]())
+
+
+def _load(args, ticker):
+    from utils.data_cache import load_prices
+    return load_prices(ticker, start=args.start, end=args.end, cache=_cache(args))
+
+
+def _backtest_kwargs(args):
+    kwargs = {
+        'initial_cash': args.cash,
+        'allocation_pct': args.allocation,
+        'stop_loss_pct': args.stop_loss,
+        'take_profit_pct': args.take_profit,
+    }
+    if args.commission or args.commission_pct or args.spread or args.slippage or args.impact or args.fill != 'close':
+        from backtester.costs import CostModel
+        kwargs['costs'] = CostModel(commission=args.commission, commission_pct=args.commission_pct,
+                                    spread_pct=args.spread, slippage_pct=args.slippage, impact=args.impact,
+                                    fill=args.fill)
+    return kwargs
+
+
+def _store(args):
+    if args.no_store:
+        return None
+    from utils.result_store import ResultStore
+    return ResultStore(args.store)
+
+
+def cmd_list(args):
+    for name in available_strategies():
+        spec = BUILTIN_STRATEGIES[name][0] if name in BUILTIN_STRATEGIES else ''
+        print(f"{name:<16} {spec:<60} {default_params(name)}")
+
+
+def cmd_run(args):
+    from backtester.backtester import Backtester
+
+    df = _load(args, args.ticker)
+    params = {**default_params(args.strategy), **_parse_params(args.param)}
+    backtest = Backtester(df, get_strategy(args.strategy), params, profile=args.profile, intrabar=args.intrabar,
+                          **_backtest_kwargs(args))
+    results = backtest.run()
+
+    print(f"\n--- {args.strategy} on {args.ticker} {params} ---")
+    print(f"Final Value: ${results['final_value']:.2f}")
+    print(f"Total Return: {results['total_return'] * 100:.2f}%")
+    print(f"Total Trades: {len(results['trades'])}")
+    print(f"Win Rate: {results['win_rate'] * 100:.2f}%")
+    print(f"Profit Factor: {results['profit_factor']:.2f}")
+    print(f"Max Drawdown: {results['max_drawdown'] * 100:.2f}%")
+    print(f"Sharpe Ratio: {results['sharpe_ratio']:.2f}")
+    if args.profile:
+        for phase, stats in results['profile']['phases'].items():
+            print(f"  {phase:<14} wall {stats['wall']:.4f}s  cpu {stats['cpu']:.4f}s")
+
+    if args.export:
+        from backtester.ledger import trades_to_frame
+        trades_to_frame(results['trades']).to_csv(args.export, index=False)
+        print(f"\n📁 Trades exported to: {args.export}")
+
+    if args.plot:
+        import matplotlib.pyplot as plt
+        from backtester.engine import TRADE_BUY
+
+        trades = results['trades']
+        buys = trades['index'][trades['type'] == TRADE_BUY]
+        sells = trades['index'][trades['type'] != TRADE_BUY]
+        plt.figure(figsize=(14, 6))
+        plt.plot(df.index, backtest.prices, label="Price")
+        plt.scatter(df.index[buys], backtest.prices[buys], marker='^', color='green', label='Buy', zorder=5)
+        plt.scatter(df.index[sells], backtest.prices[sells], marker='v', color='red', label='Sell', zorder=5)
+        plt.title(f"{args.ticker} - {args.strategy}")
+        plt.grid(True)
+        plt.legend()
+        plt.tight_layout()
+        plt.show()
+
+
+def cmd_sweep(args):
+    from tuning.sweep import run_sweep
+
+    df = _load(args, args.ticker)
+    results = run_sweep(df, get_strategy(args.strategy), _parse_grid(args.grid), store=_store(args),
+                        ticker=args.ticker, strategy_name=args.strategy, **_backtest_kwargs(args))
+    results = results.sort_values(by=args.sort, ascending=False)
+    print(results.head(args.top).to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+def cmd_leaderboard(args):
+    from utils.ingest import run_universe
+
+    names = args.strategies or sorted(BUILTIN_STRATEGIES)
+    strategies = [(name, get_strategy(name), default_params(name)) for name in names]
+    # Tickers download concurrently and are backtested as they arrive
+    results, failures = run_universe(args.tickers, strategies, args.start, args.end, max_workers=args.workers,
+                                     store=_store(args),
+                                     ingest_kwargs={'cache': _cache(args), 'max_concurrency': args.concurrency},
+                                     intrabar=args.intrabar, **_backtest_kwargs(args))
+    for ticker, error in failures.items():
+        print(f"✘ [{ticker}] could not be loaded: {error}")
+
+    leaderboard = [
+        res for res in sorted(results, key=lambda x: x['total_return'], reverse=True)
+        if res['total_trades'] >= args.min_trades and res['win_rate'] >= args.min_win_rate
+    ]
+    print(f"\n✅ Strategy Leaderboard (≥ {args.min_trades} Trades & Win Rate ≥ {args.min_win_rate * 100:.0f}%):")
+    for i, res in enumerate(leaderboard, 1):
+        print(f"{i}. [{res['ticker']}] {res['strategy']}: {res['total_return'] * 100:.2f}% return, "
+              f"Win Rate: {res['win_rate'] * 100:.2f}%, Sharpe: {res['sharpe_ratio']:.2f}, "
+              f"Trades: {res['total_trades']}")
+
+
+def cmd_results(args):
+    from utils.result_store import ResultStore
+
+    with ResultStore(args.store) as store:
+        results = store.query(ticker=args.ticker, strategy=args.strategy, min_trades=args.min_trades,
+                              min_win_rate=args.min_win_rate, order_by=args.sort, limit=args.top,
+                              current_only=not args.all)
+    print(results.drop(columns=['strategy_class', 'settings']).to_string(index=False))
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--start', default="2022-01-01")
+    common.add_argument('--end', default="2023-12-31")
+    common.add_argument('--source', choices=['yfinance', 'csv', 'stub'], default='yfinance',
+                        help="where prices come from (cached under data/cache)")
+    common.add_argument('--data-dir', default='data', help="folder of {ticker}.csv files for --source csv")
+    common.add_argument('--cash', type=float, default=100000)
+    common.add_argument('--allocation', type=float, default=0.1)
+    common.add_argument('--stop-loss', type=float, default=0.05)
+    common.add_argument('--take-profit', type=float, default=0.1)
+    common.add_argument('--commission', type=float, default=0.0, help="fixed commission per trade")
+    common.add_argument('--commission-pct', type=float, default=0.0, help="commission as a fraction of value")
+    common.add_argument('--spread', type=float, default=0.0, help="bid/ask spread as a fraction of price")
+    common.add_argument('--slippage', type=float, default=0.0, help="slippage per fill as a fraction of price")
+    common.add_argument('--impact', type=float, default=0.0, help="price impact per unit of volume participation")
+    common.add_argument('--fill', choices=['close', 'next_open'], default='close', help="when signals fill")
+
+    storage = argparse.ArgumentParser(add_help=False)
+    storage.add_argument('--store', default='data/results.sqlite', metavar='DB',
+                         help="result store; runs already in it are not recomputed")
+    storage.add_argument('--no-store', action='store_true', help="neither read nor save stored results")
+
+    parser = argparse.ArgumentParser(prog='backtest', description="Quant strategy backtester")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help="list registered strategies").set_defaults(func=cmd_list)
+
+    run = commands.add_parser('run', parents=[common], help="backtest one strategy on one ticker")
+    run.add_argument('strategy')
+    run.add_argument('--ticker', default="NVDA")
+    run.add_argument('-p', '--param', action='append', metavar='NAME=VALUE', help="strategy parameter")
+    run.add_argument('--export', metavar='CSV', help="write the trades to a CSV file")
+    run.add_argument('--plot', action='store_true', help="plot price and trades (needs matplotlib)")
+    run.add_argument('--profile', action='store_true', help="print per-phase timings")
+    run.add_argument('--intrabar', action='store_true', help="trigger stops on each bar's High/Low")
+    run.set_defaults(func=cmd_run)
+
+    sweep = commands.add_parser('sweep', parents=[common, storage], help="grid search one strategy")
+    sweep.add_argument('strategy')
+    sweep.add_argument('--ticker', default="GC=F")
+    sweep.add_argument('-g', '--grid', action='append', required=True, metavar='NAME=V1,V2,...')
+    sweep.add_argument('--sort', default='total_return')
+    sweep.add_argument('--top', type=int, default=10)
+    sweep.add_argument('--output', metavar='CSV', help="write all results to a CSV file")
+    sweep.set_defaults(func=cmd_sweep)
+
+    leaderboard = commands.add_parser('leaderboard', parents=[common, storage], help="every strategy on every ticker")
+    leaderboard.add_argument('--tickers', nargs='+', default=DEFAULT_TICKERS)
+    leaderboard.add_argument('--strategies', nargs='+', help="registered names (default: all built-ins)")
+    leaderboard.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    leaderboard.add_argument('--concurrency', type=int, default=8, help="tickers downloaded at the same time")
+    leaderboard.add_argument('--min-trades', type=int, default=3)
+    leaderboard.add_argument('--min-win-rate', type=float, default=0.5)
+    leaderboard.add_argument('--intrabar', action='store_true', help="trigger stops on each bar's High/Low")
+    leaderboard.set_defaults(func=cmd_leaderboard)
+
+    stored = commands.add_parser('results', help="query the result store")
+    stored.add_argument('--store', default='data/results.sqlite', metavar='DB')
+    stored.add_argument('--ticker')
+    stored.add_argument('--strategy', help="name the runs were saved under")
+    stored.add_argument('--sort', default='total_return')
+    stored.add_argument('--top', type=int, default=20)
+    stored.add_argument('--min-trades', type=int, default=0)
+    stored.add_argument('--min-win-rate', type=float, default=None)
+    stored.add_argument('--all', action='store_true', help="include runs made with older strategy code")
+    stored.set_defaults(func=cmd_results)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+# conftest.py
+#
+# Lets pytest import the project modules (utils, backtester, strategies, ...)
+# from the repository root, the same way cli.py and the scripts do.
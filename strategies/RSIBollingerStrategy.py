@@ -1,5 +1,6 @@
-from strategies.base_strategy import BaseStrategy
-import pandas as pd
+from strategies.base_strategy import BaseStrategy, BUY, SELL
+from utils.indicators import bollinger_bands, local_maxima, local_minima, pivot_pairs, rsi
+import numpy as np
 
 
 # df.rename(columns={
@@ -22,70 +23,25 @@ class RSIBollingerStrategy(BaseStrategy):
         self.window = window
         self.num_std = num_std
 
-    def calculate_rsi(self, prices):
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0).rolling(window=self.rsi_window).mean()
-        loss = -delta.where(delta < 0, 0).rolling(window=self.rsi_window).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
-
-    def is_local_min(self, series, i):
-        center = series.iloc[i].item()
-        left = series.iloc[i - 1].item()
-        right = series.iloc[i + 1].item()
-        return center < left and center < right
-
-    def is_local_max(self, series, i):
-        center = series.iloc[i].item()
-        left = series.iloc[i - 1].item()
-        right = series.iloc[i + 1].item()
-        return center > left and center > right
-
-    def generate_signals(self):
-        df = self.data.copy()
-
-        # Bollinger Bands
-        df['SMA'] = df['Close'].rolling(window=self.window).mean()
-        df['STD'] = df['Close'].rolling(window=self.window).std()
-        df['Upper'] = df['SMA'] + self.num_std * df['STD']
-        df['Lower'] = df['SMA'] - self.num_std * df['STD']
-
-        # RSI
-        df['RSI'] = self.calculate_rsi(df['Close'])
-
-        signals = ['hold'] * len(df)
-
-        for i in range(self.lookback + 1, len(df) - 1):
-            price_now = df['Close'].iloc[i].item()
-            upper = float(df['Upper'].iloc[i])
-            lower = float(df['Lower'].iloc[i])
-
-            for j in range(1, self.lookback + 1):
-                prev_idx = i - j
-
-                # ✅ Skip invalid index access BEFORE using prev_idx
-                if prev_idx <= 0 or i + 1 >= len(df):
-                    continue
-
-                price_prev = df['Close'].iloc[prev_idx].item()
-                rsi_now = df['RSI'].iloc[i].item()
-                rsi_prev = df['RSI'].iloc[prev_idx].item()
-
-                # Buy: Price below lower band and bullish RSI divergence
-                if (price_now < lower and
-                    self.is_local_min(df['Close'], prev_idx) and
-                    self.is_local_min(df['Close'], i) and
-                    price_now > price_prev and rsi_now > rsi_prev):
-                    signals[i] = 'buy'
-                    break
-
-                # Sell: Price above upper band and bearish RSI divergence
-                if (price_now > upper and
-                    self.is_local_max(df['Close'], prev_idx) and
-                    self.is_local_max(df['Close'], i) and
-                    price_now < price_prev and rsi_now < rsi_prev):
-                    signals[i] = 'sell'
-                    break
-
-        self.signals = signals
+    def generate_signal_array(self):
+        close = self.column('Close')
+        _, upper, lower = bollinger_bands(close, self.window, self.num_std)
+        rsi_values = rsi(close, self.rsi_window)
+        signals = np.zeros(len(close), dtype=np.int8)
+
+        # Buy: Price below lower band and bullish RSI divergence
+        # (two local lows within `lookback` bars, price and RSI both higher now)
+        now, prev = pivot_pairs(local_minima(close), self.lookback)
+        match = ((close[now] < lower[now]) &
+                 (close[now] > close[prev]) & (rsi_values[now] > rsi_values[prev]))
+        signals[now[match]] = BUY
+
+        # Sell: Price above upper band and bearish RSI divergence
+        now, prev = pivot_pairs(local_maxima(close), self.lookback)
+        match = ((close[now] > upper[now]) &
+                 (close[now] < close[prev]) & (rsi_values[now] < rsi_values[prev]))
+        signals[now[match]] = SELL
+
+        # Only bars with a full lookback window can signal
+        signals[:self.lookback + 1] = 0
         return signals
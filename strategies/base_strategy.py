@@ -1,20 +1,170 @@
 # strategies/base_strategy.py
 
+import inspect
+import numpy as np
+import pandas as pd
+
+from utils.market_data import as_market_data
+from utils.resample import resample
+
+# Signal codes used by the vectorized signal arrays
+BUY = 1
+SELL = -1
+HOLD = 0
+
+SIGNAL_LABELS = {BUY: 'buy', SELL: 'sell', HOLD: 'hold'}
+
+
+def get_column(data, name):
+    """
+    Returns a column of an OHLCV DataFrame or MarketData as a 1D float64
+    NumPy array. Handles the single-ticker MultiIndex columns yfinance
+    returns (where data['Close'] is a one-column DataFrame).
+    """
+    values = data[name]
+    if isinstance(values, pd.DataFrame):
+        values = values.iloc[:, 0]
+    return np.asarray(values, dtype=np.float64)
+
+
+def shift(values, periods=1):
+    """
+    Shifts an array forward by `periods` bars along its last axis, filling
+    the gap with NaN (same as pandas' Series.shift for float data).
+    """
+    shifted = np.empty_like(values, dtype=np.float64)
+    shifted[..., :periods] = np.nan
+    shifted[..., periods:] = values[..., :-periods]
+    return shifted
+
+
+def crosses_above(a, b):
+    """
+    True on bars where `a` moves from at/below `b` to above it.
+    NaN on either bar never counts as a cross.
+    """
+    return (a > b) & (shift(a) <= shift(b))
+
+
+def crosses_below(a, b):
+    """
+    True on bars where `a` moves from at/above `b` to below it.
+    """
+    return (a < b) & (shift(a) >= shift(b))
+
+
+def signals_from_masks(buy, sell):
+    """
+    Builds an int8 signal array from boolean buy/sell masks.
+    Buy wins if both are set on the same bar (same as the old if/elif loops).
+    """
+    return np.where(buy, BUY, np.where(sell, SELL, HOLD)).astype(np.int8)
+
+
+def signals_to_labels(signal_array):
+    """
+    Converts an int8 signal array (+1/-1/0) to a list of 'buy'/'sell'/'hold'.
+    """
+    labels = np.array(['hold', 'buy', 'sell'])
+    # HOLD=0 -> 0, BUY=1 -> 1, SELL=-1 -> 2 (negative index wraps)
+    return labels[np.asarray(signal_array, dtype=np.int64)].tolist()
+
+
+def labels_to_signals(signals):
+    """
+    Converts a list of 'buy'/'sell'/'hold' strings to an int8 signal array.
+    """
+    signals = np.asarray(signals)
+    signal_array = np.zeros(len(signals), dtype=np.int8)
+    signal_array[signals == 'buy'] = BUY
+    signal_array[signals == 'sell'] = SELL
+    return signal_array
+
+
 class BaseStrategy:
     """
     Base class for all strategies.
-    Every strategy must inherit this and implement `generate_signals`.
+    Every strategy must inherit this and implement `generate_signal_array`.
     """
     def __init__(self, data):
-        self.data = data.copy()  # DataFrame with OHLCV
+        self.data = as_market_data(data)  # read-only OHLCV, shared with the backtester
         self.signals = []
+        self.signal_array = None
 
-    def generate_signals(self):
+    def generate_signal_array(self):
         """
         To be implemented by strategy subclass.
-        Must return a list of 'buy', 'sell', or 'hold' signals.
+        Must return an int8 NumPy array with one entry per bar:
+        BUY (+1), SELL (-1) or HOLD (0).
+        """
+        raise NotImplementedError("You must implement generate_signal_array()")
+
+    def generate_signals(self):
+        """
+        Compatibility view of `generate_signal_array`.
+        Returns a list of 'buy', 'sell', or 'hold' signals.
+        """
+        self.signal_array = self.generate_signal_array()
+        self.signals = signals_to_labels(self.signal_array)
+        return self.signals
+
+    @classmethod
+    def with_defaults(cls, params):
+        """
+        Returns `params` completed with the strategy's default keyword arguments.
+        """
+        signature = inspect.signature(cls.__init__)
+        full = {
+            name: arg.default for name, arg in signature.parameters.items()
+            if arg.default is not inspect.Parameter.empty
+        }
+        full.update(params)
+        return full
+
+    @classmethod
+    def generate_signal_matrix(cls, data, param_sets):
+        """
+        Signals for many parameter sets at once.
+        Returns an int8 array of shape (len(param_sets), len(data)).
+
+        The default builds one strategy per parameter set. Strategies override
+        it to compute each distinct indicator once for the whole batch.
+        """
+        signals = np.zeros((len(param_sets), len(data)), dtype=np.int8)
+        for row, params in enumerate(param_sets):
+            signals[row] = cls(data, **params).generate_signal_array()
+        return signals
+
+    def start_stream(self):
+        """
+        Resets the rolling indicator state used by `on_bar`.
+        To be implemented by strategies that support streaming.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+
+    def on_bar(self, bar):
+        """
+        Consumes one bar (a mapping with 'Open', 'High', 'Low', 'Close',
+        'Volume') and returns its signal: BUY, SELL or HOLD.
+        Indicators are updated in O(1), so the cost per bar stays constant.
+        Call `start_stream` first.
         """
-        raise NotImplementedError("You must implement generate_signals()")
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
 
     def get_signals(self):
         return self.signals
+
+    def get_signal_array(self):
+        return self.signal_array
+
+    def column(self, name):
+        return get_column(self.data, name)
+
+    def resampled(self, rule):
+        """
+        The strategy's data on a higher timeframe (utils.resample.Timeframe).
+        Bars are aggregated once per (data, rule) and shared by every strategy;
+        use `.align(values)` to map higher-timeframe indicators back onto
+        this strategy's bars without lookahead.
+        """
+        return resample(self.data, rule)
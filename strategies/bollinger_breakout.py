@@ -1,7 +1,9 @@
 # strategies/bollinger_breakout.py
 
-import pandas as pd
-from strategies.base_strategy import BaseStrategy
+import numpy as np
+from strategies.base_strategy import BaseStrategy, BUY, SELL, HOLD, crosses_above, crosses_below, get_column, signals_from_masks
+from utils.indicators import bollinger_bands, rolling_mean_std_many
+from utils.streaming import Crossover, RollingMean, RollingStd
 
 class BollingerBreakoutStrategy(BaseStrategy):
     """
@@ -15,36 +17,54 @@ class BollingerBreakoutStrategy(BaseStrategy):
         self.window = window
         self.num_std = num_std
 
-    def generate_signals(self):
-        df = self.data.copy()
+    @staticmethod
+    def signals_from_indicators(close, upper, lower):
+        # NaN bands never compare true, so warm-up bars stay 'hold'
+        return signals_from_masks(
+            crosses_above(close, upper),
+            crosses_below(close, lower)
+        )
+
+    def generate_signal_array(self):
+        close = self.column('Close')
 
         # Calculate Bollinger Bands
-        df['SMA'] = df['Close'].rolling(window=self.window).mean()
-        df['STD'] = df['Close'].rolling(window=self.window).std()
-        df['Upper'] = df['SMA'] + self.num_std * df['STD']
-        df['Lower'] = df['SMA'] - self.num_std * df['STD']
-
-        signals = ['hold'] * len(df)
-
-        for i in range(1, len(df)):
-            # Safely extract scalar values
-            close_now = df['Close'].iloc[i].item()
-            close_prev = df['Close'].iloc[i - 1].item()
-            upper_now = df['Upper'].iloc[i].item()
-            upper_prev = df['Upper'].iloc[i - 1].item()
-            lower_now = df['Lower'].iloc[i].item()
-            lower_prev = df['Lower'].iloc[i - 1].item()
-
-            # Skip if any are NaN
-            if any(pd.isna([close_now, close_prev, upper_now, upper_prev, lower_now, lower_prev])):
-                continue
-
-            if close_now > upper_now and close_prev <= upper_prev:
-                signals[i] = 'buy'
-            elif close_now < lower_now and close_prev >= lower_prev:
-                signals[i] = 'sell'
-            else:
-                signals[i] = 'hold'
-
-        self.signals = signals
-        return signals
+        _, upper, lower = bollinger_bands(close, self.window, self.num_std)
+
+        return self.signals_from_indicators(close, upper, lower)
+
+    @classmethod
+    def generate_signal_matrix(cls, data, param_sets):
+        close = get_column(data, 'Close')
+        param_sets = [cls.with_defaults(p) for p in param_sets]
+
+        # Mean/std of every window come from one kernel call, shared by every num_std
+        rolling_mean_std_many(close, [p['window'] for p in param_sets])
+        bands = [bollinger_bands(close, p['window'], p['num_std']) for p in param_sets]
+        return cls.signals_from_indicators(
+            close,
+            np.stack([upper for _, upper, _ in bands]),
+            np.stack([lower for _, _, lower in bands])
+        )
+
+    def start_stream(self):
+        self.stream = {
+            'sma': RollingMean(self.window),
+            'std': RollingStd(self.window),
+            'upper_cross': Crossover(),
+            'lower_cross': Crossover(),
+        }
+
+    def on_bar(self, bar):
+        close = float(bar['Close'])
+        sma = self.stream['sma'].update(close)
+        std = self.stream['std'].update(close)
+
+        # Update both detectors every bar so their previous values stay current
+        upper_cross = self.stream['upper_cross'].update(close, sma + self.num_std * std)
+        lower_cross = self.stream['lower_cross'].update(close, sma - self.num_std * std)
+        if upper_cross == BUY:
+            return BUY
+        if lower_cross == SELL:
+            return SELL
+        return HOLD
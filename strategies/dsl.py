@@ -0,0 +1,508 @@
+# strategies/dsl.py
+#
+# Strategies written as expressions instead of classes:
+#
+#     from strategies.dsl import ExpressionStrategy, crosses_above, param, rsi, sma
+#
+#     buy = crosses_above(sma(param('short', 20)), sma(param('long', 50))) & (rsi(14) < 40)
+#     sell = crosses_below(sma(param('short', 20)), sma(param('long', 50)))
+#     Backtester(df, ExpressionStrategy, {'buy': buy, 'sell': sell, 'short': 10}).run()
+#
+# Expressions are bound to parameter values, then every distinct node (same
+# operation on the same inputs) is evaluated once as a NumPy array, whether
+# it appears twice in one rule, in several rules or in several parameter
+# sets of a sweep. Indicators come from utils.indicators, so they are also
+# cached across runs on the same prices.
+
+import numpy as np
+
+from strategies.base_strategy import BaseStrategy, crosses_above as _crosses_above, \
+    crosses_below as _crosses_below, get_column, shift as _shift, signals_from_masks
+from utils import indicators
+from utils.resample import resample
+
+
+class Expr:
+    """
+    Node of a strategy expression: an operation and its arguments (other
+    nodes or plain values such as windows).
+
+    Supports + - * / and unary -, comparisons (> < >= <=) that give
+    conditions, and & | ~ (AND / OR / NOT) on conditions. `==` is not
+    overloaded: nodes compare by identity.
+    """
+    __slots__ = ('op', 'args', 'key')
+
+    def __init__(self, op, *args):
+        self.op = op
+        self.args = args
+        # Structural key: equal keys are the same computation
+        self.key = (op,) + tuple(arg.key if isinstance(arg, Expr) else arg for arg in args)
+
+    def __repr__(self):
+        return _format(self)
+
+    def __reduce__(self):
+        return (Expr, (self.op,) + self.args)
+
+    def __add__(self, other):
+        return Expr('add', self, _wrap(other))
+
+    def __radd__(self, other):
+        return Expr('add', _wrap(other), self)
+
+    def __sub__(self, other):
+        return Expr('sub', self, _wrap(other))
+
+    def __rsub__(self, other):
+        return Expr('sub', _wrap(other), self)
+
+    def __mul__(self, other):
+        return Expr('mul', self, _wrap(other))
+
+    def __rmul__(self, other):
+        return Expr('mul', _wrap(other), self)
+
+    def __truediv__(self, other):
+        return Expr('div', self, _wrap(other))
+
+    def __rtruediv__(self, other):
+        return Expr('div', _wrap(other), self)
+
+    def __neg__(self):
+        return Expr('neg', self)
+
+    def __gt__(self, other):
+        return Expr('gt', self, _wrap(other))
+
+    def __lt__(self, other):
+        return Expr('lt', self, _wrap(other))
+
+    def __ge__(self, other):
+        return Expr('ge', self, _wrap(other))
+
+    def __le__(self, other):
+        return Expr('le', self, _wrap(other))
+
+    def __and__(self, other):
+        return Expr('and', self, _wrap(other))
+
+    def __rand__(self, other):
+        return Expr('and', _wrap(other), self)
+
+    def __or__(self, other):
+        return Expr('or', self, _wrap(other))
+
+    def __ror__(self, other):
+        return Expr('or', _wrap(other), self)
+
+    def __invert__(self):
+        return Expr('not', self)
+
+
+def _wrap(value):
+    return value if isinstance(value, Expr) else Expr('const', value)
+
+
+# Building blocks
+
+def param(name, default=None):
+    """
+    Placeholder filled from the strategy parameters (e.g. a window that a sweep varies).
+    """
+    return Expr('param', name, default)
+
+
+def const(value):
+    return Expr('const', value)
+
+
+def column(name='Close'):
+    return Expr('column', name)
+
+
+def sma(window, source='Close'):
+    return Expr('sma', window, source)
+
+
+def ema(span, source='Close'):
+    return Expr('ema', span, source)
+
+
+def rsi(window=14, source='Close'):
+    return Expr('rsi', window, source)
+
+
+def wilder_rsi(window=14, source='Close'):
+    return Expr('wilder_rsi', window, source)
+
+
+def rolling_std(window, source='Close'):
+    return Expr('std', window, source)
+
+
+def bollinger_upper(window=20, num_std=2, source='Close'):
+    return Expr('bollinger_upper', window, num_std, source)
+
+
+def bollinger_lower(window=20, num_std=2, source='Close'):
+    return Expr('bollinger_lower', window, num_std, source)
+
+
+def macd_line(fast=12, slow=26, signal=9, source='Close'):
+    return Expr('macd_line', fast, slow, signal, source)
+
+
+def macd_signal(fast=12, slow=26, signal=9, source='Close'):
+    return Expr('macd_signal', fast, slow, signal, source)
+
+
+def rolling_max(window, source='High'):
+    return Expr('rolling_max', window, source)
+
+
+def rolling_min(window, source='Low'):
+    return Expr('rolling_min', window, source)
+
+
+def shift(expr, periods=1):
+    """
+    Value `periods` bars ago: NaN for the first `periods` bars, or False when
+    `expr` is a condition.
+    """
+    return Expr('shift', _wrap(expr), periods)
+
+
+def threshold(expr, level, direction='below'):
+    """
+    Condition expr < level ('below') or expr > level ('above').
+    """
+    if direction not in ('below', 'above'):
+        raise ValueError("direction must be 'below' or 'above'")
+    return expr < level if direction == 'below' else expr > level
+
+
+def crosses_above(a, b):
+    return Expr('crosses_above', _wrap(a), _wrap(b))
+
+
+def crosses_below(a, b):
+    return Expr('crosses_below', _wrap(a), _wrap(b))
+
+
+def within(condition, bars):
+    """
+    True while `condition` was true on any of the last `bars` bars
+    (including this one), e.g. to confirm one event within N bars of another.
+    """
+    if not isinstance(bars, Expr):
+        _check_bars(bars)
+    return Expr('within', condition, bars)
+
+
+def _check_bars(bars):
+    if int(bars) != bars or bars < 1:
+        raise ValueError(f"within() needs bars >= 1, got {bars!r}")
+    return int(bars)
+
+
+def all_of(*conditions):
+    result = conditions[0]
+    for condition in conditions[1:]:
+        result = result & condition
+    return result
+
+
+def any_of(*conditions):
+    result = conditions[0]
+    for condition in conditions[1:]:
+        result = result | condition
+    return result
+
+
+def on_timeframe(rule, expr):
+    """
+    `expr` evaluated on higher-timeframe bars (utils.resample) and mapped
+    back onto the base bars, using only closed higher-timeframe bars.
+    """
+    return Expr('timeframe', rule, _wrap(expr))
+
+
+# Binding and evaluation
+
+def bind(expr, params):
+    """
+    Copy of `expr` with every param() replaced by its value from `params`
+    (or its default).
+    """
+    if not isinstance(expr, Expr):
+        return expr
+    if expr.op == 'param':
+        name, default = expr.args
+        if name in params:
+            return Expr('const', params[name])
+        if default is None:
+            raise ValueError(f"Missing value for parameter {name!r}")
+        return Expr('const', default)
+    if not any(isinstance(arg, Expr) for arg in expr.args):
+        return expr
+    args = [bind(arg, params) for arg in expr.args]
+    # Indicator windows and similar arguments are plain values once bound
+    if expr.op not in _ARRAY_ARGS:
+        args = [arg.args[0] if isinstance(arg, Expr) and arg.op == 'const' else arg for arg in args]
+    return Expr(expr.op, *args)
+
+
+# op -> function(values of the source column, *plain arguments)
+_INDICATORS = {
+    'sma': lambda values, window: indicators.sma(values, int(window)),
+    'ema': lambda values, span: indicators.ema(values, span),
+    'rsi': lambda values, window: indicators.rsi(values, int(window)),
+    'wilder_rsi': lambda values, window: indicators.wilder_rsi(values, int(window)),
+    'std': lambda values, window: indicators.rolling_std(values, int(window)),
+    'bollinger_upper': lambda values, window, num_std: indicators.bollinger_bands(values, int(window), num_std)[1],
+    'bollinger_lower': lambda values, window, num_std: indicators.bollinger_bands(values, int(window), num_std)[2],
+    'macd_line': lambda values, fast, slow, signal: indicators.macd(values, fast, slow, signal)[0],
+    'macd_signal': lambda values, fast, slow, signal: indicators.macd(values, fast, slow, signal)[1],
+    'rolling_max': lambda values, window: indicators.rolling_max(values, int(window)),
+    'rolling_min': lambda values, window: indicators.rolling_min(values, int(window)),
+}
+
+# Single-window indicators with a multi-window form, batched before evaluation
+_MANY = {
+    'sma': indicators.sma_many,
+    'rsi': indicators.rsi_many,
+    'std': indicators.rolling_mean_std_many,
+    'bollinger_upper': indicators.rolling_mean_std_many,
+    'bollinger_lower': indicators.rolling_mean_std_many,
+}
+
+# op -> function(*evaluated arguments)
+_OPERATORS = {
+    'add': np.add,
+    'sub': np.subtract,
+    'mul': np.multiply,
+    'div': lambda a, b: np.divide(a, b),
+    'neg': np.negative,
+    'gt': np.greater,
+    'lt': np.less,
+    'ge': np.greater_equal,
+    'le': np.less_equal,
+    'and': lambda a, b: np.logical_and(_as_condition(a), _as_condition(b)),
+    'or': lambda a, b: np.logical_or(_as_condition(a), _as_condition(b)),
+    'not': lambda a: np.logical_not(_as_condition(a)),
+    'crosses_above': _crosses_above,
+    'crosses_below': _crosses_below,
+}
+
+def _as_condition(values):
+    # Bool view of a condition; NaN (no value yet) counts as False
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return (values == values) & (values != 0)
+
+
+def _shift_condition(values, periods):
+    shifted = np.zeros_like(values)  # False before the first bar
+    shifted[..., periods:] = values[..., :-periods]
+    return shifted
+
+
+# Ops whose arguments are all expressions (the rest take plain values)
+_ARRAY_ARGS = set(_OPERATORS) | {'within', 'shift', 'timeframe'}
+
+_SYMBOLS = {'add': '+', 'sub': '-', 'mul': '*', 'div': '/', 'gt': '>', 'lt': '<', 'ge': '>=', 'le': '<=',
+            'and': '&', 'or': '|'}
+
+
+def _format(expr):
+    if expr.op == 'const':
+        return repr(expr.args[0])
+    if expr.op == 'column':
+        return f'column({expr.args[0]!r})'
+    if expr.op == 'param' and expr.args[1] is None:
+        return f'param({expr.args[0]!r})'
+    if expr.op in _SYMBOLS:
+        return f'({_format(expr.args[0])} {_SYMBOLS[expr.op]} {_format(expr.args[1])})'
+    if expr.op == 'neg':
+        return f'-{_format(expr.args[0])}'
+    if expr.op == 'not':
+        return f'~{_format(expr.args[0])}'
+    args = ', '.join(_format(arg) if isinstance(arg, Expr) else repr(arg) for arg in expr.args)
+    return f'{expr.op}({args})'
+
+
+def plan(*exprs):
+    """
+    The distinct nodes of bound expressions in evaluation order (children
+    first). Repeated subexpressions appear once.
+    """
+    order, seen = [], set()
+
+    def visit(expr):
+        if expr.key in seen:
+            return
+        seen.add(expr.key)
+        if expr.op != 'timeframe':  # evaluated on its own bars
+            for arg in expr.args:
+                if isinstance(arg, Expr):
+                    visit(arg)
+        order.append(expr)
+
+    for expr in exprs:
+        visit(expr)
+    return order
+
+
+class Evaluator:
+    """
+    Evaluates bound expressions on one dataset. Every node is computed once
+    per evaluator (keyed by its structure), so rules and parameter sets
+    evaluated through the same evaluator share their common parts.
+    """
+    def __init__(self, data):
+        self.data = data
+        self._values = {}
+        self._timeframes = {}
+
+    def column(self, name):
+        return get_column(self.data, name)
+
+    def _prefetch(self, nodes):
+        # Compute each indicator's missing windows in one kernel call
+        windows = {}
+        for node in nodes:
+            if node.op in _MANY:
+                windows.setdefault((_MANY[node.op], node.args[-1]), []).append(int(node.args[0]))
+        for (many, source), values in windows.items():
+            many(self.column(source), values)
+
+    def evaluate(self, *exprs):
+        """
+        Arrays for bound expressions (conditions are bool arrays, other nodes
+        float64 arrays or scalars for constants).
+        """
+        nodes = [node for node in plan(*exprs) if node.key not in self._values]
+        self._prefetch(nodes)
+        for node in nodes:
+            self._values[node.key] = self._compute(node)
+        results = [self._values[expr.key] for expr in exprs]
+        return results[0] if len(exprs) == 1 else results
+
+    def _compute(self, node):
+        op, args = node.op, node.args
+        if op == 'const':
+            return args[0]
+        if op == 'column':
+            return self.column(args[0])
+        if op in _INDICATORS:
+            return _INDICATORS[op](self.column(args[-1]), *args[:-1])
+        if op == 'param':
+            raise ValueError(f"Parameter {args[0]!r} is not bound; call bind() first")
+        if op == 'timeframe':
+            rule, expr = args
+            if rule not in self._timeframes:
+                timeframe = resample(self.data, rule)
+                self._timeframes[rule] = (timeframe, Evaluator(timeframe.bars))
+            timeframe, evaluator = self._timeframes[rule]
+            values = np.asarray(evaluator.evaluate(expr))
+            aligned = timeframe.align(values)
+            # Conditions come back as 0/1 floats with NaN before the first closed bar
+            return aligned == 1 if values.dtype == bool else aligned
+
+        values = [self._values[arg.key] if isinstance(arg, Expr) else arg for arg in args]
+        if op in _OPERATORS:
+            return _OPERATORS[op](*values)
+        if op == 'shift':
+            source = np.asarray(values[0])
+            if source.dtype == bool:  # conditions stay conditions
+                return _shift_condition(source, values[1])
+            return _shift(source.astype(np.float64), values[1])
+        if op == 'within':
+            bars = _check_bars(values[1])
+            hits = np.cumsum(_as_condition(values[0]), dtype=np.int64)
+            before = np.zeros_like(hits)
+            before[bars:] = hits[:-bars]
+            return hits > before
+        raise ValueError(f"Unknown operation {op!r}")
+
+    def signals(self, buy, sell):
+        """
+        int8 signal array from bound buy/sell conditions (buy wins on the same bar).
+        """
+        n_bars = len(self.data)
+        masks = []
+        for condition in (buy, sell):
+            if condition is None:
+                masks.append(np.zeros(n_bars, dtype=bool))
+            else:
+                masks.append(np.broadcast_to(_as_condition(self.evaluate(condition)), n_bars))
+        return signals_from_masks(*masks)
+
+
+def signal_matrix(data, rules, params=None):
+    """
+    Signals for many (buy, sell) rules on the same data, evaluated together
+    so shared indicators and conditions are computed once.
+
+    Parameters:
+    - data: OHLCV DataFrame or MarketData
+    - rules: list of (buy, sell) expressions (either may be None)
+    - params: values for param() placeholders, shared by all rules
+
+    Returns:
+    - int8 array of shape (len(rules), len(data))
+    """
+    evaluator = Evaluator(data)
+    params = params or {}
+    bound = [(bind(buy, params), bind(sell, params)) for buy, sell in rules]
+    evaluator.evaluate(*[expr for rule in bound for expr in rule if expr is not None])
+    signals = np.zeros((len(rules), len(data)), dtype=np.int8)
+    for row, (buy, sell) in enumerate(bound):
+        signals[row] = evaluator.signals(buy, sell)
+    return signals
+
+
+class ExpressionStrategy(BaseStrategy):
+    """
+    Strategy defined by `buy` and `sell` conditions (strategies.dsl expressions).
+
+    Use it directly with the conditions as parameters (they can then be swept
+    like any other parameter), or subclass it with `buy`/`sell` class
+    attributes and an __init__ that passes its parameters on. Parameters are
+    stored as attributes and fill the param() placeholders.
+    """
+    buy = None
+    sell = None
+
+    def __init__(self, data, buy=None, sell=None, **params):
+        super().__init__(data)
+        if buy is not None:
+            self.buy = buy
+        if sell is not None:
+            self.sell = sell
+        self.params = params
+        for name, value in params.items():
+            setattr(self, name, value)
+
+    def generate_signal_array(self):
+        evaluator = Evaluator(self.data)
+        return evaluator.signals(bind(self.buy, self.params), bind(self.sell, self.params))
+
+    @classmethod
+    def generate_signal_matrix(cls, data, param_sets):
+        # One evaluator for the batch: nodes shared between parameter sets are computed once
+        evaluator = Evaluator(data)
+        bound = []
+        for params in param_sets:
+            params = dict(cls.with_defaults(params))
+            buy = params.pop('buy', None)
+            sell = params.pop('sell', None)
+            bound.append((bind(cls.buy if buy is None else buy, params),
+                          bind(cls.sell if sell is None else sell, params)))
+        evaluator.evaluate(*[expr for rule in bound for expr in rule if expr is not None])
+        signals = np.zeros((len(param_sets), len(data)), dtype=np.int8)
+        for row, (buy, sell) in enumerate(bound):
+            signals[row] = evaluator.signals(buy, sell)
+        return signals
@@ -1,7 +1,6 @@
 # strategies/high_low_breakout.py
 
-import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, BUY, SELL, HOLD, shift, signals_from_masks
 
 class HighLowBreakoutStrategy(BaseStrategy):
     """
@@ -14,25 +13,41 @@ class HighLowBreakoutStrategy(BaseStrategy):
         self.lookback_window = lookback_window
         self.buffer_pct = buffer_pct
 
-    def generate_signals(self):
-        df = self.data.copy()
-        signals = ['hold'] * len(df)
-
-        df['RecentHigh'] = df['Close'].rolling(window=self.lookback_window).max()
-        df['RecentLow'] = df['Close'].rolling(window=self.lookback_window).min()
-
-        for i in range(self.lookback_window, len(df)):
-            prev_price = df['Close'].iloc[i - 1].item()
-            price = df['Close'].iloc[i].item()
-            high = df['High'].iloc[i - 1].item()
-            low = df['Low'].iloc[i - 1].item()
-
-            if prev_price <= high * (1 + self.buffer_pct) and price > high * (1 + self.buffer_pct):
-                signals[i] = 'buy'
-            elif prev_price >= low * (1 - self.buffer_pct) and price < low * (1 - self.buffer_pct):
-                signals[i] = 'sell'
-            else:
-                signals[i] = 'hold'
-
-        self.signals = signals
-        return signals
+    def generate_signal_array(self):
+        price = self.column('Close')
+        prev_price = shift(price)
+
+        # Breakout levels come from the previous bar's High/Low
+        high = shift(self.column('High')) * (1 + self.buffer_pct)
+        low = shift(self.column('Low')) * (1 - self.buffer_pct)
+
+        buy = (prev_price <= high) & (price > high)
+        sell = (prev_price >= low) & (price < low)
+        # No signals until a full lookback window is available
+        buy[:self.lookback_window] = sell[:self.lookback_window] = False
+
+        return signals_from_masks(buy, sell)
+
+    def start_stream(self):
+        nan = float('nan')
+        self.stream = {'bars': 0, 'prev_close': nan, 'prev_high': nan, 'prev_low': nan}
+
+    def on_bar(self, bar):
+        state = self.stream
+        price = float(bar['Close'])
+        high = state['prev_high'] * (1 + self.buffer_pct)
+        low = state['prev_low'] * (1 - self.buffer_pct)
+        prev_price = state['prev_close']
+
+        signal = HOLD
+        if state['bars'] >= self.lookback_window:
+            if prev_price <= high and price > high:
+                signal = BUY
+            elif prev_price >= low and price < low:
+                signal = SELL
+
+        state['bars'] += 1
+        state['prev_close'] = price
+        state['prev_high'] = float(bar['High'])
+        state['prev_low'] = float(bar['Low'])
+        return signal
@@ -1,7 +1,9 @@
 # strategies/macd_crossover.py
 
-import pandas as pd
-from strategies.base_strategy import BaseStrategy
+import numpy as np
+from strategies.base_strategy import BaseStrategy, crosses_above, crosses_below, get_column, signals_from_masks
+from utils.indicators import macd
+from utils.streaming import MACD, Crossover
 
 class MACDCrossoverStrategy(BaseStrategy):
     """
@@ -16,30 +18,38 @@ class MACDCrossoverStrategy(BaseStrategy):
         self.slow = slow
         self.signal = signal
 
-    def generate_signals(self):
-        df = self.data.copy()
+    @staticmethod
+    def signals_from_indicators(macd_line, signal_line):
+        return signals_from_masks(
+            crosses_above(macd_line, signal_line),
+            crosses_below(macd_line, signal_line)
+        )
 
+    def generate_signal_array(self):
         # Calculate MACD and Signal Line
-        df['EMA_fast'] = df['Close'].ewm(span=self.fast, adjust=False).mean()
-        df['EMA_slow'] = df['Close'].ewm(span=self.slow, adjust=False).mean()
-        df['MACD'] = df['EMA_fast'] - df['EMA_slow']
-        df['Signal'] = df['MACD'].ewm(span=self.signal, adjust=False).mean()
+        macd_line, signal_line = macd(self.column('Close'), self.fast, self.slow, self.signal)
 
         # Generate Buy/Sell Signals
-        signals = ['hold'] * len(df)
-
-        for i in range(1, len(df)):
-            prev_macd = df['MACD'].iloc[i - 1]
-            prev_signal = df['Signal'].iloc[i - 1]
-            curr_macd = df['MACD'].iloc[i]
-            curr_signal = df['Signal'].iloc[i]
-
-            if curr_macd > curr_signal and prev_macd <= prev_signal:
-                signals[i] = 'buy'
-            elif curr_macd < curr_signal and prev_macd >= prev_signal:
-                signals[i] = 'sell'
-            else:
-                signals[i] = 'hold'
-
-        self.signals = signals
-        return signals
+        return self.signals_from_indicators(macd_line, signal_line)
+
+    @classmethod
+    def generate_signal_matrix(cls, data, param_sets):
+        close = get_column(data, 'Close')
+        param_sets = [cls.with_defaults(p) for p in param_sets]
+
+        # EMAs are cached per span and shared between parameter sets
+        lines = [macd(close, p['fast'], p['slow'], p['signal']) for p in param_sets]
+        return cls.signals_from_indicators(
+            np.stack([line for line, _ in lines]),
+            np.stack([signal_line for _, signal_line in lines])
+        )
+
+    def start_stream(self):
+        self.stream = {
+            'macd': MACD(self.fast, self.slow, self.signal),
+            'cross': Crossover(),
+        }
+
+    def on_bar(self, bar):
+        macd_line, signal_line = self.stream['macd'].update(float(bar['Close']))
+        return self.stream['cross'].update(macd_line, signal_line)
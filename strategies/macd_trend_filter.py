@@ -0,0 +1,38 @@
+# strategies/macd_trend_filter.py
+
+from strategies.base_strategy import BaseStrategy, crosses_above, crosses_below, signals_from_masks
+from utils.indicators import macd, sma
+
+class MACDTrendFilterStrategy(BaseStrategy):
+    """
+    MACD crossover filtered by a higher-timeframe SMA trend:
+    Buy when the MACD line crosses above its signal line while the short SMA
+    of the higher-timeframe closes is above the long one
+    Sell when the MACD line crosses below its signal line (exits are not filtered)
+
+    The trend only uses higher-timeframe bars that are complete at each bar
+    (see utils.resample), e.g. a 5-minute MACD with timeframe='1D' follows
+    the trend of the previous full days.
+    """
+
+    def __init__(self, data, timeframe='W', fast=12, slow=26, signal=9, trend_short=10, trend_long=30):
+        super().__init__(data)
+        self.timeframe = timeframe
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self.trend_short = trend_short
+        self.trend_long = trend_long
+
+    def generate_signal_array(self):
+        macd_line, signal_line = macd(self.column('Close'), self.fast, self.slow, self.signal)
+
+        # Trend SMAs are computed on the higher-timeframe bars, then mapped back
+        higher = self.resampled(self.timeframe)
+        higher_close = higher.column('Close')
+        uptrend = higher.align(sma(higher_close, self.trend_short)) > higher.align(sma(higher_close, self.trend_long))
+
+        return signals_from_masks(
+            crosses_above(macd_line, signal_line) & uptrend,
+            crosses_below(macd_line, signal_line)
+        )
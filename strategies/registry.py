@@ -0,0 +1,97 @@
+# strategies/registry.py
+#
+# Strategies by name, imported only when they are used. Kept free of
+# NumPy/pandas imports so listing strategies (or a CLI's --help) stays fast.
+
+import importlib
+
+ENTRY_POINT_GROUP = 'quant_bot.strategies'
+
+# Built-in strategies: name -> ('module:Class', default parameters used by the leaderboard)
+BUILTIN_STRATEGIES = {
+    'sma': ('strategies.sma_crossover:SMACrossoverStrategy',
+            {'short_window': 20, 'long_window': 50}),
+    'rsi': ('strategies.rsi_strategy:RSIStrategy',
+            {'rsi_window': 14}),
+    'rsi_sma': ('strategies.rsi_sma_combo:RSISMACrossoverStrategy',
+                {'short_window': 20, 'long_window': 50, 'rsi_window': 14}),
+    'bollinger': ('strategies.bollinger_breakout:BollingerBreakoutStrategy',
+                  {'window': 20, 'num_std': 2}),
+    'macd': ('strategies.macd_crossover:MACDCrossoverStrategy',
+             {'fast': 12, 'slow': 26, 'signal': 9}),
+    'high_low': ('strategies.high_low_breakout:HighLowBreakoutStrategy',
+                 {'lookback_window': 20, 'buffer_pct': 0.002}),
+    'rsi_divergence': ('strategies.rsi_divergence:RSIDivergenceStrategy',
+                       {'rsi_window': 14, 'lookback': 5}),
+    'rsi_bollinger': ('strategies.RSIBollingerStrategy:RSIBollingerStrategy',
+                      {'lookback': 10, 'rsi_window': 14, 'window': 20, 'num_std': 2.0}),
+    'macd_trend': ('strategies.macd_trend_filter:MACDTrendFilterStrategy',
+                   {'timeframe': 'W', 'fast': 12, 'slow': 26, 'signal': 9, 'trend_short': 10, 'trend_long': 30}),
+}
+
+# name -> class, 'module:Class' string or entry point, plus default parameters
+_registry = {name: list(entry) for name, entry in BUILTIN_STRATEGIES.items()}
+_entry_points_loaded = False
+
+
+def register(name, default_params=None):
+    """
+    Class decorator that registers a BaseStrategy subclass under `name`:
+
+        @register('my_strategy', {'window': 30})
+        class MyStrategy(BaseStrategy): ...
+
+    The strategy is available once its module has been imported. Installed
+    packages can instead expose strategies lazily through the
+    'quant_bot.strategies' entry point group (name = 'module:Class').
+    """
+    def decorator(cls):
+        _registry[name] = [cls, dict(default_params or {})]
+        return cls
+    return decorator
+
+
+def _load_entry_points():
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        _registry.setdefault(entry_point.name, [entry_point, {}])
+
+
+def available_strategies():
+    """
+    Registered strategy names (nothing is imported).
+    """
+    _load_entry_points()
+    return sorted(_registry)
+
+
+def get_strategy(name):
+    """
+    Returns the strategy class registered as `name`, importing its module on first use.
+    """
+    if name not in _registry:
+        _load_entry_points()
+    if name not in _registry:
+        raise KeyError(f"Unknown strategy {name!r}; available: {', '.join(sorted(_registry))}")
+
+    target = _registry[name][0]
+    if isinstance(target, str):
+        module, _, attribute = target.partition(':')
+        target = getattr(importlib.import_module(module), attribute)
+    elif not isinstance(target, type):
+        target = target.load()  # entry point
+    _registry[name][0] = target
+    return target
+
+
+def default_params(name):
+    """
+    Default parameters registered with a strategy (a copy).
+    """
+    if name not in _registry:
+        _load_entry_points()
+    return dict(_registry[name][1])
@@ -1,6 +1,6 @@
-import pandas as pd
 import numpy as np
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, BUY, SELL
+from utils.indicators import local_maxima, local_minima, pivot_pairs, rsi
 
 class RSIDivergenceStrategy(BaseStrategy):
     """
@@ -14,54 +14,22 @@ class RSIDivergenceStrategy(BaseStrategy):
         self.rsi_window = rsi_window
         self.lookback = lookback
 
-    def calculate_rsi(self, prices):
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0).rolling(window=self.rsi_window).mean()
-        loss = -delta.where(delta < 0, 0).rolling(window=self.rsi_window).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+    def generate_signal_array(self):
+        close = self.column('Close')
+        rsi_values = rsi(close, self.rsi_window)
+        signals = np.zeros(len(close), dtype=np.int8)
 
-    def is_local_min(self, series, i):
-        val = series.iloc[i].item()
-        left = series.iloc[i - 1].item()
-        right = series.iloc[i + 1].item()
-        return val < left and val < right
+        # Bullish divergence: two local lows within `lookback` bars,
+        # price lower now but RSI higher
+        now, prev = pivot_pairs(local_minima(close), self.lookback)
+        match = (close[now] < close[prev]) & (rsi_values[now] > rsi_values[prev])
+        signals[now[match]] = BUY
 
-    def is_local_max(self, series, i):
-        val = series.iloc[i].item()
-        left = series.iloc[i - 1].item()
-        right = series.iloc[i + 1].item()
-        return val > left and val > right
+        # Bearish divergence: two local highs, price higher now but RSI lower
+        now, prev = pivot_pairs(local_maxima(close), self.lookback)
+        match = (close[now] > close[prev]) & (rsi_values[now] < rsi_values[prev])
+        signals[now[match]] = SELL
 
-    def generate_signals(self):
-        df = self.data.copy()
-        df['RSI'] = self.calculate_rsi(df['Close'])
-        signals = ['hold'] * len(df)
-
-        for i in range(self.lookback + 1, len(df) - 1):
-            price_now = df['Close'].iloc[i]
-            rsi_now = df['RSI'].iloc[i]
-
-            # Look for divergence in the past `lookback` bars
-            for j in range(1, self.lookback + 1):
-                prev_idx = i - j  # Define prev_idx
-
-                price_prev = df['Close'].iloc[prev_idx].item()
-                rsi_prev = df['RSI'].iloc[prev_idx].item()
-                price_now = df['Close'].iloc[i].item()
-                rsi_now = df['RSI'].iloc[i].item()
-
-                # Bullish divergence
-                if self.is_local_min(df['Close'], prev_idx) and self.is_local_min(df['Close'], i):
-                    if price_now < price_prev and rsi_now > rsi_prev:
-                        signals[i] = 'buy'
-                        break
-
-                # Bearish divergence
-                if self.is_local_max(df['Close'], prev_idx) and self.is_local_max(df['Close'], i):
-                    if price_now > price_prev and rsi_now < rsi_prev:
-                        signals[i] = 'sell'
-                        break
-
-        self.signals = signals
+        # Only bars with a full lookback window can signal
+        signals[:self.lookback + 1] = 0
         return signals
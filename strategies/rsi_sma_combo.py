@@ -1,54 +1,41 @@
 # strategies/rsi_sma_combo.py
 
-import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BUY, SELL, HOLD
+from strategies.dsl import ExpressionStrategy, crosses_above, crosses_below, param, rsi, sma
+from utils.streaming import RSI, Crossover, RollingMean
 
-class RSISMACrossoverStrategy(BaseStrategy):
+class RSISMACrossoverStrategy(ExpressionStrategy):
     """
     RSI + SMA Crossover Strategy:
-    Buy only when RSI < 30 AND short SMA crosses above long SMA
-    Sell only when RSI > 70 AND short SMA crosses below long SMA
+    Buy only when RSI < 40 AND short SMA crosses above long SMA
+    Sell only when RSI > 60 AND short SMA crosses below long SMA
     """
+    buy = (crosses_above(sma(param('short_window')), sma(param('long_window')))
+           & (rsi(param('rsi_window')) < 40))
+    sell = (crosses_below(sma(param('short_window')), sma(param('long_window')))
+            & (rsi(param('rsi_window')) > 60))
 
     def __init__(self, data, short_window=20, long_window=50, rsi_window=14):
-        super().__init__(data)
-        self.short_window = short_window
-        self.long_window = long_window
-        self.rsi_window = rsi_window
-
-    def calculate_rsi(self, prices):
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0).rolling(window=self.rsi_window).mean()
-        loss = -delta.where(delta < 0, 0).rolling(window=self.rsi_window).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
-
-    def generate_signals(self):
-        df = self.data.copy()
-
-        df['SMA_short'] = df['Close'].rolling(window=self.short_window).mean()
-        df['SMA_long'] = df['Close'].rolling(window=self.long_window).mean()
-        df['RSI'] = self.calculate_rsi(df['Close'])
-
-        signals = ['hold'] * len(df)
-
-        for i in range(1, len(df)):
-            sma_cross_up = (
-                df['SMA_short'].iloc[i] > df['SMA_long'].iloc[i] and
-                df['SMA_short'].iloc[i - 1] <= df['SMA_long'].iloc[i - 1]
-            )
-            sma_cross_down = (
-                df['SMA_short'].iloc[i] < df['SMA_long'].iloc[i] and
-                df['SMA_short'].iloc[i - 1] >= df['SMA_long'].iloc[i - 1]
-            )
-            rsi = df['RSI'].iloc[i]
-
-            if sma_cross_up and rsi < 40:
-                signals[i] = 'buy'
-            elif sma_cross_down and rsi > 60:
-                signals[i] = 'sell'
-            else:
-                signals[i] = 'hold'
-
-        self.signals = signals
-        return signals
+        super().__init__(data, short_window=short_window, long_window=long_window, rsi_window=rsi_window)
+
+    def start_stream(self):
+        self.stream = {
+            'sma_short': RollingMean(self.short_window),
+            'sma_long': RollingMean(self.long_window),
+            'rsi': RSI(self.rsi_window),
+            'cross': Crossover(),
+        }
+
+    def on_bar(self, bar):
+        close = float(bar['Close'])
+        cross = self.stream['cross'].update(
+            self.stream['sma_short'].update(close),
+            self.stream['sma_long'].update(close)
+        )
+        rsi_value = self.stream['rsi'].update(close)
+
+        if cross == BUY and rsi_value < 40:
+            return BUY
+        if cross == SELL and rsi_value > 60:
+            return SELL
+        return HOLD
@@ -1,7 +1,9 @@
 # strategies/rsi_strategy.py
 
-import pandas as pd
-from strategies.base_strategy import BaseStrategy
+import numpy as np
+from strategies.base_strategy import BaseStrategy, BUY, SELL, HOLD, get_column, signals_from_masks
+from utils.indicators import rsi, rsi_many
+from utils.streaming import RSI
 
 class RSIStrategy(BaseStrategy):
     """
@@ -14,33 +16,38 @@ class RSIStrategy(BaseStrategy):
         super().__init__(data)
         self.rsi_window = rsi_window
 
-    def calculate_rsi(self, prices):
-        delta = prices.diff()
+    @staticmethod
+    def signals_from_indicators(rsi_values):
+        buy = rsi_values < 30
+        sell = rsi_values > 70
+        # The first bar is always 'hold'
+        buy[..., :1] = sell[..., :1] = False
 
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_window).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-
-    def generate_signals(self):
-        df = self.data.copy()
+        return signals_from_masks(buy, sell)
 
+    def generate_signal_array(self):
         # Calculate RSI from Close prices
-        df['RSI'] = self.calculate_rsi(df['Close'])
-
-        signals = ['hold'] * len(df)
-
-        for i in range(1, len(df)):
-            rsi = df['RSI'].iloc[i]
-
-            if rsi < 30:
-                signals[i] = 'buy'
-            elif rsi > 70:
-                signals[i] = 'sell'
-            else:
-                signals[i] = 'hold'
-
-        self.signals = signals
-        return signals
+        return self.signals_from_indicators(rsi(self.column('Close'), self.rsi_window))
+
+    @classmethod
+    def generate_signal_matrix(cls, data, param_sets):
+        close = get_column(data, 'Close')
+        param_sets = [cls.with_defaults(p) for p in param_sets]
+
+        return cls.signals_from_indicators(np.stack(rsi_many(close, [p['rsi_window'] for p in param_sets])))
+
+    def start_stream(self):
+        self.stream = {'rsi': RSI(self.rsi_window), 'bars': 0}
+
+    def on_bar(self, bar):
+        rsi_value = self.stream['rsi'].update(float(bar['Close']))
+        self.stream['bars'] += 1
+
+        # The first bar is always 'hold'
+        if self.stream['bars'] == 1:
+            return HOLD
+        if rsi_value < 30:
+            return BUY
+        if rsi_value > 70:
+            return SELL
+        return HOLD
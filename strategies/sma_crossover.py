@@ -1,7 +1,9 @@
 # strategies/sma_crossover.py
 
-import pandas as pd
-from strategies.base_strategy import BaseStrategy
+import numpy as np
+from strategies.base_strategy import BaseStrategy, crosses_above, crosses_below, get_column, signals_from_masks
+from utils.indicators import sma, sma_many
+from utils.streaming import Crossover, RollingMean
 
 class SMACrossoverStrategy(BaseStrategy):
     """
@@ -15,29 +17,43 @@ class SMACrossoverStrategy(BaseStrategy):
         self.short_window = short_window
         self.long_window = long_window
 
-    def generate_signals(self):
-        df = self.data.copy()
+    @staticmethod
+    def signals_from_indicators(sma_short, sma_long):
+        # Buy when short SMA crosses above long SMA, sell when it crosses below
+        return signals_from_masks(
+            crosses_above(sma_short, sma_long),
+            crosses_below(sma_short, sma_long)
+        )
 
-        # Calculate short-term and long-term SMAs
-        df['SMA_short'] = df['Close'].rolling(window=self.short_window).mean()
-        df['SMA_long'] = df['Close'].rolling(window=self.long_window).mean()
-
-        # Initialize signal list with 'hold'
-        signals = ['hold'] * len(df)
-
-        for i in range(1, len(df)):
-            # If short SMA crosses above long SMA => BUY
-            if df['SMA_short'].iloc[i] > df['SMA_long'].iloc[i] and df['SMA_short'].iloc[i - 1] <= df['SMA_long'].iloc[
-                i - 1]:
-                signals[i] = 'buy'
+    def generate_signal_array(self):
+        close = self.column('Close')
 
-            # If short SMA crosses below long SMA => SELL
-            elif df['SMA_short'].iloc[i] < df['SMA_long'].iloc[i] and df['SMA_short'].iloc[i - 1] >= df['SMA_long'].iloc[i - 1]:
-                signals[i] = 'sell'
-
-            # Else, keep holding
-            else:
-                signals[i] = 'hold'
-
-        self.signals = signals
-        return signals
+        # Calculate short-term and long-term SMAs
+        return self.signals_from_indicators(
+            sma(close, self.short_window),
+            sma(close, self.long_window)
+        )
+
+    @classmethod
+    def generate_signal_matrix(cls, data, param_sets):
+        close = get_column(data, 'Close')
+        param_sets = [cls.with_defaults(p) for p in param_sets]
+
+        # Every distinct window is computed in one kernel call and cached
+        n = len(param_sets)
+        smas = sma_many(close, [p['short_window'] for p in param_sets] + [p['long_window'] for p in param_sets])
+        return cls.signals_from_indicators(np.stack(smas[:n]), np.stack(smas[n:]))
+
+    def start_stream(self):
+        self.stream = {
+            'sma_short': RollingMean(self.short_window),
+            'sma_long': RollingMean(self.long_window),
+            'cross': Crossover(),
+        }
+
+    def on_bar(self, bar):
+        close = float(bar['Close'])
+        return self.stream['cross'].update(
+            self.stream['sma_short'].update(close),
+            self.stream['sma_long'].update(close)
+        )
@@ -0,0 +1,29 @@
+# tests/test_backtester.py
+
+import numpy as np
+
+from backtester.backtester import Backtester
+from benchmarks.synthetic import generate_ohlcv
+from strategies.sma_crossover import SMACrossoverStrategy
+
+
+def test_repeated_run_with_open_position():
+    df = generate_ohlcv(300, seed=1, volatility=0.002)
+    backtest = Backtester(df, SMACrossoverStrategy, {'short_window': 5, 'long_window': 20},
+                          stop_loss_pct=0.5, take_profit_pct=0.5)
+    backtest.run()
+    assert backtest.position > 0  # carried into the second run
+
+    summary = backtest.run()
+    ledger = backtest.ledger
+    closes = backtest.prices
+    assert len(closes) == len(summary['equity_curve']) == 2 * len(df)
+    assert np.all(ledger.entry_index <= ledger.exit_index)
+
+    # Excursions are measured over the bars each round trip was open, across both runs
+    mae = [closes[entry:exit_ + 1].min() / price - 1
+           for entry, exit_, price in zip(ledger.entry_index, ledger.exit_index, ledger.entry_price)]
+    mfe = [closes[entry:exit_ + 1].max() / price - 1
+           for entry, exit_, price in zip(ledger.entry_index, ledger.exit_index, ledger.entry_price)]
+    assert np.isclose(summary['trade_stats']['avg_mae'], np.mean(mae))
+    assert np.isclose(summary['trade_stats']['avg_mfe'], np.mean(mfe))
@@ -0,0 +1,64 @@
+# tests/test_costs.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester.backtester import Backtester
+from backtester.costs import CostModel
+from backtester.engine import TRADE_TYPES
+from strategies.base_strategy import BaseStrategy
+
+
+class _FixedSignals(BaseStrategy):
+    def __init__(self, data, signals):
+        super().__init__(data)
+        self.signals = signals
+
+    def generate_signal_array(self):
+        return np.asarray(self.signals, dtype=np.int8)
+
+
+def _bars():
+    return pd.DataFrame({'Open': [100, 102, 103, 106, 107], 'High': [101, 105, 104, 107, 108],
+                         'Low': [99, 101, 102, 105, 106], 'Close': [100, 104, 103, 106, 107]}, dtype=float,
+                        index=pd.date_range('2024-01-01', periods=5, freq='D'))
+
+
+def _run(signals, costs, use_jit=True):
+    return Backtester(_bars(), _FixedSignals, {'signals': signals}, initial_cash=10000, allocation_pct=1.0,
+                      stop_loss_pct=0.5, take_profit_pct=0.5, costs=costs, use_jit=use_jit).run()
+
+
+@pytest.mark.parametrize('use_jit', [True, False])
+def test_next_open_fills_with_commission_and_spread(use_jit):
+    costs = CostModel(commission=5, commission_pct=0.001, spread_pct=0.002, fill='next_open')
+    summary = _run([1, 0, -1, 0, 0], costs, use_jit)
+
+    # Buy on bar 0 at bar 1's Open plus half the spread; the fee is folded into the entry price
+    unit_price = 102 * 1.001
+    shares = (10000 - 5) // (unit_price * 1.001)
+    buy_fee = 5 + 0.001 * shares * unit_price
+    # Sell on bar 2 at bar 3's Open minus half the spread
+    sell_price = 106 * 0.999
+    sell_fee = 5 + 0.001 * shares * sell_price
+    cash = 10000 - shares * unit_price - buy_fee + shares * sell_price - sell_fee
+
+    trades = summary['trades']
+    assert [TRADE_TYPES[t] for t in trades['type']] == ['buy', 'sell']
+    assert list(trades['index']) == [0, 2]
+    assert list(trades['shares']) == [shares, shares]
+    np.testing.assert_allclose(trades['price'], [unit_price + buy_fee / shares, sell_price - sell_fee / shares])
+    assert summary['final_value'] == pytest.approx(cash)
+
+
+def test_close_fills_with_commission():
+    summary = _run([1, 0, -1, 0, 0], CostModel(commission=5))
+    shares = (10000 - 5) // 100
+    assert summary['final_value'] == pytest.approx(10000 + shares * (103 - 100) - 10)
+
+
+def test_next_open_signal_on_the_last_bar_does_not_fill():
+    summary = _run([0, 0, 0, 0, 1], CostModel(fill='next_open'))
+    assert len(summary['trades']) == 0
+    assert summary['final_value'] == 10000
@@ -0,0 +1,49 @@
+# tests/test_data_cache.py
+
+import pandas as pd
+
+from utils.data_cache import MarketDataCache, StubSource
+
+
+class _RecordingSource(StubSource):
+    # Stub prices available only before `today`; an empty frame while `down` is set
+    def __init__(self, today):
+        super().__init__()
+        self.today = pd.Timestamp(today)
+        self.down = False
+        self.calls = []
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        if self.down:
+            return pd.DataFrame()
+        return super().fetch(ticker, start, min(pd.Timestamp(end), self.today))
+
+
+def test_short_fetch_is_completed_on_reload(tmp_path):
+    source = _RecordingSource('2022-03-01')
+    cache = MarketDataCache(source, cache_dir=str(tmp_path))
+    assert cache.load('AAPL', '2022-01-01', '2022-06-01').index[-1] == pd.Timestamp('2022-02-28')
+    assert cache.coverage('AAPL') == (pd.Timestamp('2022-01-03'), pd.Timestamp('2022-03-01'))
+
+    source.today = pd.Timestamp('2022-04-01')
+    df = cache.load('AAPL', '2022-01-01', '2022-06-01')
+    assert df.index[-1] == pd.Timestamp('2022-03-31')
+    pd.testing.assert_frame_equal(df, source.fetch('AAPL', '2022-01-01', '2022-06-01'), check_freq=False,
+                                  check_names=False)
+
+    # The Saturday before the first bar is not fetched again
+    calls = len(source.calls)
+    cache.load('AAPL', '2022-01-01', '2022-03-31')
+    assert len(source.calls) == calls
+
+
+def test_empty_fetch_is_not_cached(tmp_path):
+    source = _RecordingSource('2022-06-01')
+    cache = MarketDataCache(source, cache_dir=str(tmp_path))
+    source.down = True
+    assert len(cache.load('AAPL', '2022-01-01', '2022-06-01')) == 0
+    assert cache.coverage('AAPL') is None
+
+    source.down = False
+    assert len(cache.load('AAPL', '2022-01-01', '2022-06-01')) > 0
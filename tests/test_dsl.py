@@ -0,0 +1,23 @@
+# tests/test_dsl.py
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv
+from strategies.dsl import ExpressionStrategy, crosses_above, shift, sma, within
+
+
+def test_shifted_condition_is_false_before_the_first_bar():
+    df = generate_ohlcv(300)
+    cross = crosses_above(sma(5), sma(20))
+    plain = ExpressionStrategy(df, buy=cross).generate_signal_array()
+    shifted = ExpressionStrategy(df, buy=shift(cross)).generate_signal_array()
+    assert shifted[0] == 0
+    np.testing.assert_array_equal(shifted[1:], plain[:-1])
+    np.testing.assert_array_equal(ExpressionStrategy(df, buy=~shift(cross) & shift(cross, 3)).generate_signal_array()[:3],
+                                  [0, 0, 0])
+
+
+def test_within_needs_at_least_one_bar():
+    with pytest.raises(ValueError, match="bars >= 1"):
+        within(sma(5) > sma(20), 0)
@@ -0,0 +1,74 @@
+# tests/test_engine.py
+
+import numpy as np
+import pytest
+
+from backtester.backtester import Backtester
+from backtester.engine import TRADE_TYPES, simulate
+from benchmarks.synthetic import generate_ohlcv
+from strategies.macd_crossover import MACDCrossoverStrategy
+
+
+def _reference_run(prices, signals, initial_cash, allocation_pct, stop_loss_pct, take_profit_pct):
+    # The original bar loop of Backtester.run, before the array engine
+    cash, position, entry_price, portfolio_value = initial_cash, 0, None, initial_cash
+    trades, equity_curve = [], []
+    for i, signal in enumerate(signals):
+        price = prices[i]
+        if np.isnan(price):
+            equity_curve.append(portfolio_value)
+            continue
+        if position > 0 and entry_price is not None:
+            if price <= entry_price * (1 - stop_loss_pct):
+                cash += position * price
+                trades.append(('stop_loss', i, price, position))
+                position, entry_price = 0, None
+            elif price >= entry_price * (1 + take_profit_pct):
+                cash += position * price
+                trades.append(('take_profit', i, price, position))
+                position, entry_price = 0, None
+        if signal == 1 and cash > 0 and position == 0:
+            shares_to_buy = (cash * allocation_pct) // price
+            if shares_to_buy > 0:
+                cash -= shares_to_buy * price
+                position += shares_to_buy
+                entry_price = price
+                trades.append(('buy', i, price, shares_to_buy))
+        elif signal == -1 and position > 0:
+            cash += position * price
+            trades.append(('sell', i, price, position))
+            position, entry_price = 0, None
+        portfolio_value = cash + position * price
+        equity_curve.append(portfolio_value)
+    return trades, np.array(equity_curve)
+
+
+def _trade_tuples(result):
+    return [(TRADE_TYPES[t], int(i), float(p), float(s)) for t, i, p, s in
+            zip(result.trade_type, result.trade_index, result.trade_price, result.trade_shares)]
+
+
+@pytest.mark.parametrize('use_jit', [True, False])
+@pytest.mark.parametrize('seed', range(15))
+def test_engine_matches_reference_loop(seed, use_jit):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+    prices[rng.integers(0, 400, 5)] = np.nan
+    signals = rng.choice(np.array([-1, 0, 1], dtype=np.int8), 400, p=[0.1, 0.8, 0.1])
+    settings = [(100000, 0.1, 0.05, 0.1), (5000, 0.5, 0.02, 0.03), (100000, 1.0, 0.5, 0.5)][seed % 3]
+
+    trades, equity = _reference_run(prices, signals, *settings)
+    result = simulate(prices, signals, *settings, use_jit=use_jit)
+    assert _trade_tuples(result) == trades
+    np.testing.assert_array_equal(result.equity, equity)
+
+
+def test_backtester_matches_reference_loop():
+    df = generate_ohlcv(1000, volatility=0.02)
+    summary = Backtester(df, MACDCrossoverStrategy, {'fast': 12, 'slow': 26, 'signal': 9}).run()
+    signals = MACDCrossoverStrategy(df, fast=12, slow=26, signal=9).generate_signal_array()
+    trades, equity = _reference_run(df['Close'].to_numpy(), signals, 100000, 0.1, 0.05, 0.1)
+
+    assert [(TRADE_TYPES[t], int(i), float(p), float(s)) for t, i, p, s in summary['trades']] == trades
+    np.testing.assert_array_equal(summary['equity_curve'], equity)
+    assert summary['final_value'] == equity[-1]
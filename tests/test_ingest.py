@@ -0,0 +1,50 @@
+# tests/test_ingest.py
+
+import pandas as pd
+
+from strategies.base_strategy import BaseStrategy
+from strategies.sma_crossover import SMACrossoverStrategy
+from utils.data_cache import StubSource
+from utils.ingest import FetchError, HTTPSource, LocalPriceServer, RetryPolicy, load_universe, run_universe
+
+
+def test_transient_errors_are_retried():
+    with LocalPriceServer(failure_rate=0.3, seed=1) as server:
+        prices, failures = load_universe(['AAPL', 'NVDA', 'TSLA'], '2022-01-01', '2022-06-30', cache=False,
+                                         source=HTTPSource(server.url),
+                                         retry=RetryPolicy(attempts=10, base_delay=0.001))
+    assert not failures
+    assert sorted(prices) == ['AAPL', 'NVDA', 'TSLA']
+
+
+def test_client_errors_fail_at_once():
+    with LocalPriceServer() as server:
+        prices, failures = load_universe(['AAPL'], '2022-01-01', '2022-06-30', cache=False,
+                                         source=HTTPSource(server.url + '/missing'),
+                                         retry=RetryPolicy(attempts=4, base_delay=0.001))
+        assert server.requests == 1
+    assert not prices
+    assert isinstance(failures['AAPL'], FetchError)
+
+
+class _PartialSource(StubSource):
+    # Like yfinance for an unknown ticker: an empty frame instead of an error
+    def fetch(self, ticker, start, end):
+        if ticker == 'GONE':
+            return pd.DataFrame()
+        return super().fetch(ticker, start, end)
+
+
+class _BrokenStrategy(BaseStrategy):
+    def generate_signal_array(self):
+        raise KeyError('Close')
+
+
+def test_failed_tickers_do_not_stop_the_universe():
+    strategies = [('sma', SMACrossoverStrategy, {'short_window': 5, 'long_window': 20}),
+                  ('broken', _BrokenStrategy, {})]
+    results, failures = run_universe(['AAPL', 'GONE'], strategies, '2022-01-01', '2022-06-30', max_workers=2,
+                                     ingest_kwargs={'cache': False, 'source': _PartialSource()})
+    assert isinstance(failures['GONE'], FetchError)
+    assert isinstance(failures['AAPL'], KeyError)
+    assert [(res['ticker'], res['strategy']) for res in results] == [('AAPL', 'sma')]
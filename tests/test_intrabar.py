@@ -0,0 +1,54 @@
+# tests/test_intrabar.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester.backtester import Backtester
+from backtester.engine import TRADE_TYPES
+from strategies.base_strategy import BaseStrategy
+
+
+class _BuyFirstBar(BaseStrategy):
+    def generate_signal_array(self):
+        signals = np.zeros(len(self.data), dtype=np.int8)
+        signals[0] = 1
+        return signals
+
+
+def _bars(second_bar):
+    # Bought at 100 on bar 0: stop at 95, target at 110
+    rows = [(100, 100, 100, 100), second_bar, (100, 100, 100, 100)]
+    return pd.DataFrame(rows, columns=['Open', 'High', 'Low', 'Close'], dtype=float,
+                        index=pd.date_range('2024-01-01', periods=3, freq='D'))
+
+
+def _exit(df, **kwargs):
+    summary = Backtester(df, _BuyFirstBar, initial_cash=10000, allocation_pct=1.0, stop_loss_pct=0.05,
+                         take_profit_pct=0.1, **kwargs).run()
+    exits = [(TRADE_TYPES[t], int(i), round(float(p), 9)) for t, i, p, _ in summary['trades'][1:]]
+    return exits[0] if exits else None
+
+
+@pytest.mark.parametrize('use_jit', [True, False])
+@pytest.mark.parametrize('second_bar, expected', [
+    ((99, 101, 94, 96), ('stop_loss', 1, 95.0)),        # Low crosses the stop
+    ((90, 92, 89, 91), ('stop_loss', 1, 90.0)),         # gap below the stop fills at the Open
+    ((101, 112, 100, 105), ('take_profit', 1, 110.0)),  # High crosses the target
+    ((115, 116, 114, 115), ('take_profit', 1, 115.0)),  # gap above the target fills at the Open
+    ((100, 112, 94, 100), ('stop_loss', 1, 95.0)),      # both in one bar: the stop is assumed first
+])
+def test_levels_fill_inside_the_bar(second_bar, expected, use_jit):
+    assert _exit(_bars(second_bar), intrabar=True, use_jit=use_jit) == expected
+
+
+def test_close_based_stops_ignore_the_range():
+    assert _exit(_bars((99, 101, 94, 96))) is None
+
+
+@pytest.mark.parametrize('use_jit', [True, False])
+def test_sub_bars_decide_which_level_comes_first(use_jit):
+    df = _bars((100, 112, 94, 100))
+    minutes = pd.DataFrame({'Open': [100, 108, 100], 'High': [108, 111, 101], 'Low': [99, 107, 94]}, dtype=float,
+                           index=pd.date_range('2024-01-02 09:30', periods=3, freq='min'))
+    assert _exit(df, intrabar=minutes, use_jit=use_jit) == ('take_profit', 1, 110.0)
@@ -0,0 +1,55 @@
+# tests/test_kernels.py
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_ohlcv
+from utils import kernels
+
+
+def _exact_std(values, window):
+    exact = np.full(len(values), np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(values.astype(np.longdouble), window)
+    exact[window - 1:] = windows.std(axis=1, ddof=1)
+    return exact
+
+
+def test_rolling_std_accuracy_on_long_series():
+    closes = generate_ohlcv(300_000, volatility=0.002)['Close'].to_numpy()
+    windows = [2, 3, 5, 20, 100]
+    _, std = kernels.rolling_mean_std(closes, windows)
+    for row, window in enumerate(windows):
+        exact = _exact_std(closes, window)
+        assert np.array_equal(np.isnan(std[row]), np.isnan(exact))
+        np.testing.assert_allclose(std[row], exact, rtol=1e-9, atol=0)
+
+
+def test_rolling_mean_std_matches_pandas():
+    rng = np.random.default_rng(0)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+    values[[10, 11, 200]] = np.nan
+    windows = [1, 2, 7, 30]
+    mean, std = kernels.rolling_mean_std(values, windows)
+    for row, window in enumerate(windows):
+        rolling = pd.Series(values).rolling(window)
+        np.testing.assert_array_equal(mean[row], rolling.mean().to_numpy())
+        np.testing.assert_allclose(std[row], rolling.std().to_numpy(), rtol=1e-9)
+
+
+def test_rolling_std_stays_linear_on_low_variance_prices():
+    # Tiny moves next to the price level must not make every bar recompute its window
+    closes = generate_ohlcv(300_000, volatility=0.00001)['Close'].to_numpy()
+    kernels.rolling_mean_std(closes[:1000], [500])
+
+    start = time.perf_counter()
+    std = kernels.rolling_mean_std(closes, [500])[1][0]
+    kernel_time = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = pd.Series(closes).rolling(500).std().to_numpy()
+    pandas_time = time.perf_counter() - start
+
+    assert kernel_time < 10 * pandas_time
+    np.testing.assert_allclose(std, _exact_std(closes, 500), rtol=1e-8)
+    np.testing.assert_allclose(std, expected, rtol=1e-4)
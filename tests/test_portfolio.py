@@ -0,0 +1,43 @@
+# tests/test_portfolio.py
+
+import numpy as np
+import pytest
+
+from backtester.backtester import Backtester
+from backtester.engine import TRADE_TYPES
+from backtester.portfolio import PortfolioBacktester
+from benchmarks.synthetic import generate_ohlcv
+from strategies.macd_crossover import MACDCrossoverStrategy
+from strategies.rsi_strategy import RSIStrategy
+
+SETTINGS = {'initial_cash': 100000, 'allocation_pct': 0.25, 'stop_loss_pct': 0.03, 'take_profit_pct': 0.06}
+
+
+@pytest.mark.parametrize('use_jit', [True, False])
+@pytest.mark.parametrize('strategy_cls', [MACDCrossoverStrategy, RSIStrategy])
+@pytest.mark.parametrize('seed', range(5))
+def test_one_asset_portfolio_matches_backtester(seed, strategy_cls, use_jit):
+    df = generate_ohlcv(1500, seed=seed)
+    single = Backtester(df, strategy_cls, use_jit=use_jit, **SETTINGS).run()
+    portfolio = PortfolioBacktester.from_strategy({'AAA': df}, strategy_cls, use_jit=use_jit, **SETTINGS)
+    summary = portfolio.run()
+
+    np.testing.assert_allclose(summary['equity_curve'], single['equity_curve'], rtol=1e-12)
+    trades = summary['trades']
+    assert list(trades['type']) == [TRADE_TYPES[t] for t in single['trades']['type']]
+    np.testing.assert_array_equal(trades['bar'], single['trades']['index'])
+    np.testing.assert_allclose(trades['price'], single['trades']['price'], rtol=1e-12)
+    np.testing.assert_allclose(trades['shares'], single['trades']['shares'], rtol=1e-12)
+    assert set(trades['ticker']) <= {'AAA'}
+
+    assert len(portfolio.ledger_assets) == len(portfolio.ledger)
+    assert not portfolio.ledger_assets.any()
+    for name in ('final_value', 'total_return', 'sharpe_ratio', 'max_drawdown', 'win_rate', 'profit_factor'):
+        assert summary[name] == pytest.approx(single[name], rel=1e-12, nan_ok=True), name
+
+
+def test_result_attributes_exist_before_run():
+    portfolio = PortfolioBacktester(np.ones((3, 2)), np.zeros((3, 2)))
+    assert portfolio.trades is None
+    assert portfolio.ledger is None
+    assert portfolio.ledger_assets is None
@@ -0,0 +1,39 @@
+# tests/test_resample.py
+
+import numpy as np
+
+from benchmarks.synthetic import generate_ohlcv
+from strategies.macd_trend_filter import MACDTrendFilterStrategy
+from utils.resample import resample
+
+
+def _prefix_consistent(df, rule, cuts):
+    full = resample(df, rule)
+    for cut in cuts:
+        part = resample(df.iloc[:cut], rule)
+        np.testing.assert_array_equal(part.available, full.available[:cut])
+        complete = part.available[-1]
+        if complete >= 0:
+            # Bars that are complete in the prefix are final
+            np.testing.assert_array_equal(part.bars['Close'][:complete + 1], full.bars['Close'][:complete + 1])
+
+
+def test_offset_rule_is_prefix_consistent():
+    df = generate_ohlcv(400, freq='B', start='2019-01-01')
+    for rule in ('W', 'ME', '3D'):
+        _prefix_consistent(df, rule, range(1, len(df) + 1, 7))
+
+
+def test_int_rule_is_prefix_consistent():
+    df = generate_ohlcv(200)
+    _prefix_consistent(df, 5, range(1, len(df) + 1))
+    assert resample(df.iloc[:12], 5).available[-1] == 1  # the third group has 2 of 5 bars
+
+
+def test_trend_filter_signals_do_not_depend_on_later_bars():
+    df = generate_ohlcv(500, seed=2, freq='B', start='2019-01-01', drift=0.0005)
+    params = {'timeframe': 'ME', 'trend_short': 3, 'trend_long': 6}
+    full = MACDTrendFilterStrategy(df, **params).generate_signal_array()
+    for cut in range(150, len(df)):
+        part = MACDTrendFilterStrategy(df.iloc[:cut], **params).generate_signal_array()
+        np.testing.assert_array_equal(part, full[:cut])
@@ -0,0 +1,80 @@
+# tests/test_result_store.py
+
+import os
+import shutil
+
+import pytest
+
+from backtester.costs import CostModel
+from benchmarks.synthetic import generate_ohlcv
+from strategies.macd_crossover import MACDCrossoverStrategy
+from strategies.sma_crossover import SMACrossoverStrategy
+from tuning import sweep
+from tuning.sweep import run_sweep
+from utils import result_store
+from utils.result_store import ENGINE_FILES, ResultStore, code_version, data_fingerprint, run_key
+
+
+@pytest.fixture
+def project_copy(tmp_path, monkeypatch):
+    # code_version hashes the engine files of a copy of the project that the test can edit
+    for path in ENGINE_FILES:
+        os.makedirs(tmp_path / os.path.dirname(path), exist_ok=True)
+        shutil.copy(os.path.join(result_store.PROJECT_ROOT, path), tmp_path / path)
+    monkeypatch.setattr(result_store, 'PROJECT_ROOT', str(tmp_path))
+    monkeypatch.setattr(result_store, '_code_versions', {})
+    return tmp_path
+
+
+@pytest.mark.parametrize('path', ENGINE_FILES)
+def test_editing_an_engine_file_changes_the_code_version(project_copy, path):
+    before = code_version(SMACrossoverStrategy)
+    with open(project_copy / path, 'a') as f:
+        f.write('\n# edited\n')
+    result_store._code_versions.clear()
+    assert code_version(SMACrossoverStrategy) != before
+
+
+def test_run_key_covers_data_params_settings_and_strategy():
+    fingerprint = data_fingerprint(generate_ohlcv(300))
+    params = {'short_window': 5, 'long_window': 20}
+    key = run_key(fingerprint, SMACrossoverStrategy, params, {})
+
+    # Defaults and settings that do not change results give the same key
+    assert run_key(fingerprint, SMACrossoverStrategy, params, {'initial_cash': 100000, 'use_jit': False}) == key
+    assert run_key(fingerprint, SMACrossoverStrategy, dict(reversed(list(params.items()))), {}) == key
+
+    others = [
+        run_key(data_fingerprint(generate_ohlcv(300, seed=1)), SMACrossoverStrategy, params, {}),
+        run_key(fingerprint, SMACrossoverStrategy, {**params, 'short_window': 6}, {}),
+        run_key(fingerprint, SMACrossoverStrategy, params, {'stop_loss_pct': 0.02}),
+        run_key(fingerprint, SMACrossoverStrategy, params, {'costs': CostModel(commission=1)}),
+        run_key(fingerprint, SMACrossoverStrategy, params, {'intrabar': True}),
+        run_key(fingerprint, MACDCrossoverStrategy, params, {}),
+    ]
+    assert len({key, *others}) == len(others) + 1
+
+
+def test_sweep_reuses_stored_runs_until_the_code_changes(tmp_path, project_copy, monkeypatch):
+    df = generate_ohlcv(500)
+    grid = {'fast': [5, 12], 'slow': [26], 'signal': [9]}
+    evaluated = []
+    original = sweep.evaluate_param_sets
+
+    def counting(data, strategy_cls, param_sets, **kwargs):
+        evaluated.append(len(param_sets))
+        return original(data, strategy_cls, param_sets, **kwargs)
+
+    monkeypatch.setattr(sweep, 'evaluate_param_sets', counting)
+    with ResultStore(str(tmp_path / 'results.sqlite')) as store:
+        first = run_sweep(df, MACDCrossoverStrategy, grid, store=store)
+        second = run_sweep(df, MACDCrossoverStrategy, grid, store=store)
+        assert second.equals(first)
+        assert evaluated == [2, 0]
+
+        with open(project_copy / 'backtester/engine.py', 'a') as f:
+            f.write('\n# edited\n')
+        result_store._code_versions.clear()
+        run_sweep(df, MACDCrossoverStrategy, grid, store=store)
+        assert evaluated == [2, 0, 2]
+
@@ -0,0 +1,38 @@
+# tests/test_sweep.py
+
+import numpy as np
+import pytest
+
+from backtester.backtester import Backtester
+from backtester.costs import CostModel
+from benchmarks.synthetic import generate_ohlcv
+from strategies.bollinger_breakout import BollingerBreakoutStrategy
+from strategies.macd_crossover import MACDCrossoverStrategy
+from strategies.rsi_strategy import RSIStrategy
+from strategies.sma_crossover import SMACrossoverStrategy
+from tuning.sweep import run_sweep
+
+SWEEPS = [
+    (SMACrossoverStrategy, {'short_window': [5, 10], 'long_window': [20, 50]}),
+    (MACDCrossoverStrategy, {'fast': [5, 12], 'slow': [20, 26], 'signal': [6, 9]}),
+    (RSIStrategy, {'rsi_window': [7, 14, 21]}),
+    (BollingerBreakoutStrategy, {'window': [10, 20], 'num_std': [1.5, 2.0]}),
+]
+
+
+@pytest.mark.parametrize('costs', [None, CostModel(commission=1, spread_pct=0.001, fill='next_open')])
+@pytest.mark.parametrize('strategy_cls, grid', SWEEPS)
+def test_sweep_matches_backtester(strategy_cls, grid, costs):
+    df = generate_ohlcv(1500, seed=4, volatility=0.02)
+    results = run_sweep(df, strategy_cls, grid, stop_loss_pct=0.04, take_profit_pct=0.08, costs=costs)
+    assert len(results) == np.prod([len(values) for values in grid.values()])
+
+    for _, row in results.iterrows():
+        params = {name: type(grid[name][0])(row[name]) for name in grid}
+        summary = Backtester(df, strategy_cls, params, stop_loss_pct=0.04, take_profit_pct=0.08,
+                             costs=costs).run()
+        assert row['final_value'] == round(summary['final_value'], 2)
+        assert row['total_return'] == round(summary['total_return'] * 100, 2)
+        assert row['win_rate'] == round(summary['win_rate'] * 100, 2)
+        assert row['sharpe_ratio'] == round(summary['sharpe_ratio'], 2)
+        assert row['total_trades'] == summary['trade_stats']['total_trades']
@@ -0,0 +1,44 @@
+# tests/test_walk_forward.py
+
+import pytest
+
+from benchmarks.synthetic import generate_ohlcv
+from strategies.sma_crossover import SMACrossoverStrategy
+from tuning.walk_forward import make_folds, walk_forward
+
+
+def test_make_folds_rejects_overlapping_or_empty_windows():
+    with pytest.raises(ValueError, match="step"):
+        make_folds(1000, 200, 100, step=50)
+    with pytest.raises(ValueError, match="train_bars"):
+        make_folds(1000, 0, 100)
+
+
+def test_stitched_equity_covers_each_bar_once():
+    df = generate_ohlcv(1000)
+    result = walk_forward(df, SMACrossoverStrategy, {'short_window': [5, 10], 'long_window': [20, 40]},
+                          train_bars=200, test_bars=100, step=150)
+    assert result.equity_curve.index.is_unique
+    assert result.equity_curve.index.is_monotonic_increasing
+
+
+def test_folds_without_a_qualifying_parameter_set_stay_in_cash():
+    df = generate_ohlcv(1000)
+    grid = {'short_window': [5, 10], 'long_window': [20, 40]}
+    result = walk_forward(df, SMACrossoverStrategy, grid, train_bars=200, test_bars=100, min_trades=10 ** 6)
+
+    folds = result.folds
+    assert folds['skipped'].all()
+    assert folds['train_score'].isna().all()
+    assert folds[['short_window', 'long_window']].isna().all().all()
+    assert (folds['test_trades'] == 0).all()
+    assert (result.equity_curve == 100000).all()
+    assert result.summary['total_return'] == 0.0
+
+
+def test_qualifying_folds_are_not_skipped():
+    df = generate_ohlcv(1000)
+    result = walk_forward(df, SMACrossoverStrategy, {'short_window': [5, 10], 'long_window': [20, 40]},
+                          train_bars=200, test_bars=100)
+    assert not result.folds['skipped'].any()
+    assert result.folds['train_score'].notna().all()
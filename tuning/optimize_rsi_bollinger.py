@@ -0,0 +1,35 @@
+from strategies.RSIBollingerStrategy import RSIBollingerStrategy
+from tuning.optimizers import tpe_search
+from utils.data_cache import load_prices
+import pandas as pd
+pd.set_option("display.expand_frame_repr", False)  # Print wide frames in one line
+
+# Continuous search space: (low, high) ranges instead of a fixed grid
+space = {
+    'lookback': (3, 30),
+    'rsi_window': (5, 30),
+    'window': (10, 50),
+    'num_std': (1.0, 3.0)
+}
+
+df = load_prices("GC=F", start="2022-01-01", end="2023-12-31")
+
+# Bayesian (TPE) search: 100 evaluations instead of the full 28 x 26 x 41 x N grid
+result = tpe_search(
+    df,
+    RSIBollingerStrategy,
+    space,
+    n_iter=100,
+    objective='sharpe_ratio',
+    min_trades=3,
+    seed=42,
+    max_workers=None,
+    initial_cash=100000,
+    allocation_pct=0.1,
+    stop_loss_pct=0.05,
+    take_profit_pct=0.1
+)
+
+print(f"Best parameters: {result.best_params} (Sharpe {result.best_score:.2f}, "
+      f"{result.n_evaluations} evaluations)")
+print(result.leaderboard(10))
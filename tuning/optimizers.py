@@ -0,0 +1,398 @@
+# tuning/optimizers.py
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from backtester.engine import BATCH_METRICS
+from backtester.parallel import SharedPriceData, attach_market_data
+from tuning.sweep import evaluate_param_sets
+from utils.market_data import as_market_data
+
+# Search spaces are dicts of parameter name -> spec:
+# - list of values: pick one of them (e.g. [1.5, 2.0, 2.5])
+# - (low, high) ints: any integer in [low, high]
+# - (low, high) floats: any float in [low, high]
+
+
+def _is_range(spec):
+    return isinstance(spec, tuple) and len(spec) == 2
+
+
+def _is_int_range(spec):
+    return _is_range(spec) and all(isinstance(v, (int, np.integer)) for v in spec)
+
+
+def _cast(spec, value):
+    return int(round(value)) if _is_int_range(spec) else float(value)
+
+
+def _space_size(space):
+    """
+    Number of distinct parameter sets, or inf for a continuous space.
+    """
+    size = 1
+    for spec in space.values():
+        if _is_int_range(spec):
+            size *= spec[1] - spec[0] + 1
+        elif _is_range(spec):
+            return math.inf
+        else:
+            size *= len(spec)
+    return size
+
+
+def _key(params):
+    return tuple(params.values())
+
+
+def sample_params(space, n, rng, constraint=None, seen=None):
+    """
+    Draws up to `n` distinct random parameter sets from a search space,
+    skipping ones that fail `constraint` or are already in `seen`.
+    """
+    seen = set() if seen is None else seen
+    samples = []
+    for _ in range(50 * n):
+        if len(samples) == n:
+            break
+        params = {}
+        for name, spec in space.items():
+            if _is_int_range(spec):
+                params[name] = int(rng.integers(spec[0], spec[1] + 1))
+            elif _is_range(spec):
+                params[name] = float(rng.uniform(spec[0], spec[1]))
+            else:
+                params[name] = spec[rng.integers(len(spec))]
+        if _key(params) in seen or (constraint is not None and not constraint(params)):
+            continue
+        seen.add(_key(params))
+        samples.append(params)
+    return samples
+
+
+def score_metrics(metrics, objective='sharpe_ratio', min_trades=0):
+    """
+    Objective values for a (params x BATCH_METRICS) metrics array.
+    NaN scores and parameter sets with fewer than `min_trades` closed
+    trades get -inf.
+    """
+    columns = dict(zip(BATCH_METRICS, metrics.T))
+    if callable(objective):
+        scores = np.asarray(objective(columns), dtype=np.float64)
+    else:
+        scores = columns[objective].copy()
+    scores[np.isnan(scores) | (columns['total_trades'] < min_trades)] = -np.inf
+    return scores
+
+
+def _evaluate_chunk(handle, strategy_cls, param_sets, n_bars, backtest_kwargs):
+    data = attach_market_data(handle)
+    return evaluate_param_sets(data.slice(len(data) - n_bars), strategy_cls, param_sets, **backtest_kwargs)
+
+
+class Evaluator:
+    """
+    Shared objective for all optimizers: backtests parameter sets on the
+    most recent `n_bars` of the data and scores them.
+
+    With max_workers > 1 the batches are split over a process pool that reads
+    the prices from shared memory; the pool is kept for the evaluator's
+    lifetime (use it as a context manager).
+    """
+    def __init__(self, data, strategy_cls, objective='sharpe_ratio', min_trades=0, max_workers=1,
+                 **backtest_kwargs):
+        """
+        Parameters:
+        - data: OHLCV DataFrame or MarketData
+        - strategy_cls: strategy class to tune
+        - objective: metric to maximize ('sharpe_ratio', 'total_return', 'profit_factor'
+          or any name in BATCH_METRICS), or a function(metrics dict of arrays) -> scores
+        - min_trades: parameter sets with fewer closed trades score -inf
+        - max_workers: worker processes (1 = evaluate in this process, None = all cores)
+        - backtest_kwargs: initial_cash, allocation_pct, stop_loss_pct, take_profit_pct, use_jit
+        """
+        if isinstance(objective, str) and objective not in BATCH_METRICS:
+            raise ValueError(f"Unknown objective {objective!r}; choose from {BATCH_METRICS}")
+        self.data = as_market_data(data)
+        self.strategy_cls = strategy_cls
+        self.objective = objective
+        self.min_trades = min_trades
+        self.max_workers = max_workers or os.cpu_count()
+        self.backtest_kwargs = backtest_kwargs
+        self.n_evaluations = 0
+        self.records = []
+
+        self._shared = None
+        self._pool = None
+        if self.max_workers > 1:
+            self._shared = SharedPriceData({'data': self.data})
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._shared.close()
+            self._pool = self._shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def score(self, metrics):
+        return score_metrics(metrics, self.objective, self.min_trades)
+
+    def evaluate(self, param_sets, n_bars=None):
+        """
+        Backtests `param_sets` on the last `n_bars` bars (default: all) and
+        records them. Returns the scores.
+        """
+        n_bars = len(self.data) if n_bars is None else min(int(n_bars), len(self.data))
+        if not param_sets:
+            return np.empty(0)
+
+        if self._pool is None:
+            metrics = evaluate_param_sets(self.data.slice(len(self.data) - n_bars), self.strategy_cls,
+                                          param_sets, **self.backtest_kwargs)
+        else:
+            chunks = [list(chunk) for chunk in np.array_split(np.array(param_sets, dtype=object), self.max_workers)
+                      if len(chunk)]
+            futures = [
+                self._pool.submit(_evaluate_chunk, self._shared.handles['data'], self.strategy_cls,
+                                  chunk, n_bars, self.backtest_kwargs)
+                for chunk in chunks
+            ]
+            metrics = np.concatenate([future.result() for future in futures])
+
+        scores = self.score(metrics)
+        for params, row, score in zip(param_sets, metrics, scores):
+            self.records.append({**params, **dict(zip(BATCH_METRICS, row)), 'score': score, 'bars': n_bars})
+        self.n_evaluations += len(param_sets)
+        return scores
+
+
+class OptimizationResult:
+    """
+    Every evaluation an optimizer made, plus the best parameter set
+    (highest score among those evaluated on the longest history).
+    """
+    def __init__(self, records, param_names):
+        self.history = pd.DataFrame(records)
+        self.param_names = list(param_names)
+        self.n_evaluations = len(self.history)
+
+        if self.n_evaluations:
+            full = self.history[self.history['bars'] == self.history['bars'].max()]
+            best = full['score'].idxmax() if np.isfinite(full['score']).any() else full.index[0]
+            self.best_params = {name: records[best][name] for name in self.param_names}
+            self.best_score = float(self.history.at[best, 'score'])
+        else:
+            self.best_params = None
+            self.best_score = -np.inf
+
+    def leaderboard(self, n=10):
+        """
+        Top `n` full-history evaluations by score.
+        """
+        full = self.history[self.history['bars'] == self.history['bars'].max()]
+        return full.sort_values('score', ascending=False).head(n)
+
+
+def random_search(data, strategy_cls, space, n_iter=50, constraint=None, seed=None, **evaluator_kwargs):
+    """
+    Evaluates `n_iter` random parameter sets from `space` on the full history.
+
+    Parameters:
+    - data, strategy_cls: as for Evaluator
+    - space: dict of parameter name -> list of values or (low, high) range
+    - n_iter: number of parameter sets to evaluate
+    - constraint: optional function(params) -> bool to skip invalid combos
+    - seed: random seed
+    - evaluator_kwargs: objective, min_trades, max_workers and Backtester arguments
+    """
+    rng = np.random.default_rng(seed)
+    with Evaluator(data, strategy_cls, **evaluator_kwargs) as evaluator:
+        evaluator.evaluate(sample_params(space, min(n_iter, _space_size(space)), rng, constraint))
+    return OptimizationResult(evaluator.records, space)
+
+
+def _budgets(n_bars, min_bars, eta):
+    """
+    Increasing history lengths min_bars, min_bars * eta, ..., n_bars.
+    """
+    rounds = max(1, int(math.floor(math.log(n_bars / min_bars, eta) + 1e-9)) + 1)
+    return [int(n_bars * eta ** (k - rounds + 1)) for k in range(rounds)]
+
+
+def _halving(evaluator, candidates, budgets, eta):
+    """
+    Evaluates every candidate on the first budget and keeps the best
+    1/eta for each following (longer) budget.
+    """
+    for k, n_bars in enumerate(budgets):
+        scores = evaluator.evaluate(candidates, n_bars)
+        if k < len(budgets) - 1:
+            keep = max(1, len(candidates) // eta)
+            order = np.argsort(-scores, kind='stable')[:keep]
+            candidates = [candidates[i] for i in order]
+    return candidates
+
+
+def successive_halving(data, strategy_cls, space, n_candidates=81, eta=3, min_bars=None, constraint=None,
+                       seed=None, **evaluator_kwargs):
+    """
+    Successive halving: all candidates are backtested on a short recent window,
+    and the best 1/eta are promoted to an eta times longer history, until the
+    survivors run on the full history.
+
+    Parameters:
+    - n_candidates: number of random parameter sets to start with
+    - eta: promotion ratio between rounds
+    - min_bars: shortest history (default: enough rounds to leave about one survivor)
+    - remaining arguments: same as random_search
+    """
+    rng = np.random.default_rng(seed)
+    with Evaluator(data, strategy_cls, **evaluator_kwargs) as evaluator:
+        n_bars = len(evaluator.data)
+        candidates = sample_params(space, min(n_candidates, _space_size(space)), rng, constraint)
+        if min_bars is None:
+            rounds = max(1, int(math.log(max(len(candidates), 1), eta)) + 1)
+            min_bars = n_bars / eta ** (rounds - 1)
+        _halving(evaluator, candidates, _budgets(n_bars, min_bars, eta), eta)
+    return OptimizationResult(evaluator.records, space)
+
+
+def hyperband(data, strategy_cls, space, min_bars=None, eta=3, constraint=None, seed=None, **evaluator_kwargs):
+    """
+    Hyperband: several successive-halving brackets, from many candidates
+    starting on short windows to a few candidates run on the full history,
+    which hedges against rankings on short windows being misleading.
+
+    Parameters:
+    - min_bars: shortest history used by the most aggressive bracket (default: 1/27 of the data)
+    - eta: promotion ratio between rounds
+    - remaining arguments: same as random_search
+    """
+    rng = np.random.default_rng(seed)
+    seen = set()
+    with Evaluator(data, strategy_cls, **evaluator_kwargs) as evaluator:
+        n_bars = len(evaluator.data)
+        min_bars = min_bars or n_bars / eta ** 3
+        s_max = len(_budgets(n_bars, min_bars, eta)) - 1
+        for s in range(s_max, -1, -1):
+            n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            candidates = sample_params(space, n, rng, constraint, seen)
+            if candidates:
+                _halving(evaluator, candidates, _budgets(n_bars, n_bars / eta ** s, eta), eta)
+    return OptimizationResult(evaluator.records, space)
+
+
+def _parzen(spec, values, candidates):
+    """
+    Log density of `candidates` under a Parzen estimator fitted to `values`
+    (one Gaussian per observation plus a uniform prior for ranges, smoothed
+    counts for lists of values).
+    """
+    n = len(values)
+    if not _is_range(spec):
+        choices = list(spec)
+        counts = np.bincount([choices.index(v) for v in values], minlength=len(choices)) + 1.0
+        probs = counts / counts.sum()
+        return np.log(probs[[choices.index(v) for v in candidates]])
+
+    low, high = spec
+    width = high - low
+    sigma = max(width * n ** -0.2 / 4, width * 1e-3) if n else width
+    values = np.asarray(values, dtype=np.float64)
+    candidates = np.asarray(candidates, dtype=np.float64)[:, None]
+    kernels = np.exp(-0.5 * ((candidates - values) / sigma) ** 2) / (sigma * math.sqrt(2 * math.pi))
+    density = (kernels.sum(axis=1) + 1 / width) / (n + 1)
+    return np.log(density)
+
+
+def _sample_parzen(spec, values, size, rng):
+    """
+    Draws from the same Parzen estimator as `_parzen`.
+    """
+    if not _is_range(spec):
+        choices = list(spec)
+        counts = np.bincount([choices.index(v) for v in values], minlength=len(choices)) + 1.0
+        return [choices[i] for i in rng.choice(len(choices), size=size, p=counts / counts.sum())]
+
+    low, high = spec
+    width = high - low
+    n = len(values)
+    sigma = max(width * n ** -0.2 / 4, width * 1e-3) if n else width
+    picks = rng.integers(n + 1, size=size)  # n -> uniform prior
+    centers = np.asarray(list(values) + [0.0], dtype=np.float64)[picks]
+    draws = np.where(picks == n, rng.uniform(low, high, size), centers + rng.normal(0, sigma, size))
+    return [_cast(spec, v) for v in np.clip(draws, low, high)]
+
+
+def tpe_search(data, strategy_cls, space, n_iter=50, n_startup=10, batch_size=None, gamma=0.25,
+               n_ei_candidates=24, constraint=None, seed=None, **evaluator_kwargs):
+    """
+    Bayesian optimization with a Tree-structured Parzen Estimator (TPE).
+
+    After `n_startup` random evaluations, the scored parameter sets are split
+    into the best `gamma` fraction and the rest; new candidates are drawn from
+    a density fitted to the good ones and the ones most likely to be good
+    (highest good/bad density ratio) are evaluated next.
+
+    Parameters:
+    - n_iter: total number of evaluations
+    - n_startup: random evaluations before the model is used
+    - batch_size: parameter sets proposed per round (default: one per worker),
+      evaluated together in one batch
+    - gamma: fraction of evaluations treated as good
+    - n_ei_candidates: candidates drawn per proposal
+    - remaining arguments: same as random_search
+    """
+    rng = np.random.default_rng(seed)
+    seen = set()
+    names = list(space)
+    n_iter = min(n_iter, _space_size(space))
+
+    with Evaluator(data, strategy_cls, **evaluator_kwargs) as evaluator:
+        batch_size = batch_size or evaluator.max_workers
+        observed = sample_params(space, min(n_startup, n_iter), rng, constraint, seen)
+        scores = list(evaluator.evaluate(observed))
+
+        while len(observed) < n_iter:
+            order = np.argsort(-np.asarray(scores), kind='stable')
+            n_good = max(1, int(math.ceil(gamma * len(observed))))
+            good = [observed[i] for i in order[:n_good]]
+            bad = [observed[i] for i in order[n_good:]]
+
+            n_draw = n_ei_candidates * batch_size
+            columns = {name: _sample_parzen(space[name], [p[name] for p in good], n_draw, rng) for name in names}
+            candidates = [dict(zip(names, values)) for values in zip(*columns.values())]
+            ratio = sum(
+                _parzen(space[name], [p[name] for p in good], columns[name])
+                - _parzen(space[name], [p[name] for p in bad], columns[name])
+                for name in names
+            )
+
+            batch = []
+            for i in np.argsort(-ratio, kind='stable'):
+                params = candidates[i]
+                if _key(params) in seen or (constraint is not None and not constraint(params)):
+                    continue
+                seen.add(_key(params))
+                batch.append(params)
+                if len(batch) == min(batch_size, n_iter - len(observed)):
+                    break
+            if not batch:
+                # Every proposal was already tried; fall back to random sets
+                batch = sample_params(space, min(batch_size, n_iter - len(observed)), rng, constraint, seen)
+                if not batch:
+                    break
+
+            observed += batch
+            scores += list(evaluator.evaluate(batch))
+
+    return OptimizationResult(evaluator.records, space)
@@ -0,0 +1,122 @@
+# tuning/sweep.py
+
+import itertools
+import numpy as np
+import pandas as pd
+from backtester.costs import prepare_costs
+from backtester.engine import BATCH_METRICS, as_price_array, simulate_batch
+from utils.market_data import as_market_data
+from utils.result_store import data_fingerprint, run_key
+
+# Upper bound on the size of one (params x bars) signal batch
+MAX_BATCH_BYTES = 256 * 1024 * 1024
+
+
+def expand_grid(param_grid, constraint=None):
+    """
+    Expands {'param': [values, ...]} into a list of parameter dicts,
+    in the same order as itertools.product.
+
+    Parameters:
+    - param_grid: dict of parameter name -> list of values
+    - constraint: optional function(params) -> bool to skip invalid combos
+    """
+    names = list(param_grid)
+    param_sets = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+    if constraint is not None:
+        param_sets = [params for params in param_sets if constraint(params)]
+    return param_sets
+
+
+def evaluate_param_sets(data, strategy_cls, param_sets, initial_cash=100000, allocation_pct=0.1,
+                        stop_loss_pct=0.05, take_profit_pct=0.1, use_jit=True, costs=None):
+    """
+    Backtests a list of parameter dicts in (params x bars) signal batches.
+    The cost model's arrays (see backtester.costs) are built once and shared by every batch.
+
+    Returns:
+    - float64 array of shape (len(param_sets), len(BATCH_METRICS)), raw values
+      (returns and win rates as decimals)
+    """
+    data = as_market_data(data)
+    prices = as_price_array(data['Close'])
+    costs = prepare_costs(costs, data)
+
+    batch_size = max(1, MAX_BATCH_BYTES // max(1, len(prices)))
+    metrics = []
+    for start in range(0, len(param_sets), batch_size):
+        batch = param_sets[start:start + batch_size]
+        signal_matrix = strategy_cls.generate_signal_matrix(data, batch)
+        metrics.append(simulate_batch(
+            prices, signal_matrix,
+            initial_cash=initial_cash,
+            allocation_pct=allocation_pct,
+            stop_loss_pct=stop_loss_pct,
+            take_profit_pct=take_profit_pct,
+            use_jit=use_jit,
+            costs=costs
+        ))
+    return np.concatenate(metrics) if metrics else np.empty((0, len(BATCH_METRICS)))
+
+
+def run_sweep(data, strategy_cls, param_grid, constraint=None, initial_cash=100000, allocation_pct=0.1,
+              stop_loss_pct=0.05, take_profit_pct=0.1, use_jit=True, costs=None, store=None, ticker=None,
+              strategy_name=None):
+    """
+    Backtest every combination of a parameter grid in batches.
+
+    Signals for a batch of parameter sets are built as one (params x bars)
+    int8 matrix (strategies share indicator work through
+    `generate_signal_matrix`) and then run through the compiled batch engine.
+    No per-combination Backtester or DataFrame copy is created.
+
+    Parameters:
+    - data: OHLCV DataFrame or MarketData (wrapped once and shared by every batch)
+    - strategy_cls: strategy class to sweep
+    - param_grid: dict of parameter name -> list of values
+    - constraint: optional function(params) -> bool to skip invalid combos
+    - initial_cash, allocation_pct, stop_loss_pct, take_profit_pct, use_jit, costs: same as Backtester
+    - store: optional utils.result_store.ResultStore; combinations already in it
+      are not rerun, and new ones are saved
+    - ticker, strategy_name: labels saved with the results (strategy_name
+      defaults to the class name)
+
+    Returns:
+    - DataFrame with one row per combination: the parameters, then
+      final_value, total_return (%), win_rate (%), sharpe_ratio, total_trades
+      (the same columns the grid search scripts build)
+    """
+    data = as_market_data(data)
+    param_sets = expand_grid(param_grid, constraint)
+    settings = dict(initial_cash=initial_cash, allocation_pct=allocation_pct,
+                    stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct, costs=costs)
+
+    metrics = np.empty((len(param_sets), len(BATCH_METRICS)))
+    missing = list(range(len(param_sets)))
+    if store is not None:
+        fingerprint = data_fingerprint(data)
+        keys = [run_key(fingerprint, strategy_cls, params, settings) for params in param_sets]
+        cached = store.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        for i, key in enumerate(keys):
+            if key in cached:
+                metrics[i] = [cached[key][name] for name in BATCH_METRICS]
+
+    metrics[missing] = evaluate_param_sets(
+        data, strategy_cls, [param_sets[i] for i in missing], use_jit=use_jit, **settings
+    )
+    if store is not None and missing:
+        store.put_many(
+            {'key': keys[i], 'ticker': ticker, 'strategy': strategy_name or strategy_cls.__name__,
+             'strategy_cls': strategy_cls, 'params': param_sets[i], 'settings': settings,
+             'fingerprint': fingerprint, **dict(zip(BATCH_METRICS, metrics[i]))}
+            for i in missing
+        )
+
+    results_df = pd.DataFrame(param_sets, columns=list(param_grid))
+    results_df['final_value'] = np.round(metrics[:, 0], 2)
+    results_df['total_return'] = np.round(metrics[:, 1] * 100, 2)  # Convert to %
+    results_df['win_rate'] = np.round(metrics[:, 4] * 100, 2)  # Convert to %
+    results_df['sharpe_ratio'] = np.round(metrics[:, 2], 2)
+    results_df['total_trades'] = metrics[:, 6].astype(int)
+    return results_df
@@ -0,0 +1,179 @@
+# tuning/walk_forward.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from backtester.costs import prepare_costs
+from backtester.engine import TRADE_BUY, as_price_array, simulate, simulate_batch
+from tuning.optimizers import score_metrics
+from tuning.sweep import expand_grid
+from utils.market_data import as_market_data
+from utils.metrics import calculate_max_drawdown, calculate_sharpe_ratio
+
+
+def make_folds(n_bars, train_bars, test_bars, step=None, anchored=False):
+    """
+    Splits bar positions into consecutive train/test folds.
+
+    Parameters:
+    - n_bars: length of the history
+    - train_bars: bars in each training window (the first window when anchored)
+    - test_bars: bars in each out-of-sample window (the last one may be shorter)
+    - step: bars between fold starts (default: test_bars, so test windows tile the history);
+      must be at least test_bars so that no bar is tested twice
+    - anchored: every training window starts at bar 0 and grows (otherwise it rolls)
+
+    Returns:
+    - list of (train_start, train_end, test_start, test_end) half-open ranges
+    """
+    step = step or test_bars
+    if train_bars < 1 or test_bars < 1:
+        raise ValueError("train_bars and test_bars must be >= 1")
+    if step < test_bars:
+        raise ValueError(f"step ({step}) must be >= test_bars ({test_bars}); overlapping test windows "
+                         "would count bars twice in the stitched equity curve")
+    folds = []
+    test_start = train_bars
+    while test_start < n_bars:
+        train_start = 0 if anchored else test_start - train_bars
+        folds.append((train_start, test_start, test_start, min(test_start + test_bars, n_bars)))
+        test_start += step
+    return folds
+
+
+def _train_folds(prices, signals, costs, folds, backtest_kwargs):
+    """
+    Metrics of every parameter set on each fold's training window.
+    """
+    return [simulate_batch(prices[a:b], signals[:, a:b], costs=costs.slice(a, b) if costs is not None else None,
+                           **backtest_kwargs)
+            for a, b, _, _ in folds]
+
+
+class WalkForwardResult:
+    """
+    Output of `walk_forward`:
+    - folds: one row per fold with its windows, chosen parameters, training
+      score and out-of-sample metrics (skipped=True where no parameter set
+      qualified and the test window stayed in cash)
+    - equity_curve: stitched out-of-sample equity (Series over the test bars)
+    - summary: total return, Sharpe and max drawdown of the stitched curve
+    """
+    def __init__(self, folds, equity_curve, initial_cash):
+        self.folds = folds
+        self.equity_curve = equity_curve
+        final_value = float(equity_curve.iloc[-1]) if len(equity_curve) else float(initial_cash)
+        self.summary = {
+            'initial_cash': float(initial_cash),
+            'final_value': final_value,
+            'total_return': (final_value - initial_cash) / initial_cash,
+            'sharpe_ratio': float(calculate_sharpe_ratio(equity_curve.to_numpy())) if len(equity_curve) > 1 else 0.0,
+            'max_drawdown': float(calculate_max_drawdown(equity_curve.to_numpy())) if len(equity_curve) else 0.0,
+            'n_folds': len(folds),
+        }
+
+
+def walk_forward(data, strategy_cls, param_grid, train_bars, test_bars, step=None, anchored=False,
+                 constraint=None, objective='sharpe_ratio', min_trades=0, max_workers=1,
+                 initial_cash=100000, allocation_pct=0.1, stop_loss_pct=0.05, take_profit_pct=0.1, use_jit=True,
+                 costs=None):
+    """
+    Walk-forward optimization: on each fold, pick the parameter set with the
+    best training score, then trade it on the following test window.
+
+    Signals for every parameter set are generated once on the full history
+    and sliced per fold, so indicators are not recomputed for overlapping
+    windows (and early test bars get their warm-up from earlier data).
+    Each test window starts flat with the capital the previous one ended
+    with; a position still open at the end of a window is valued at its
+    last close. A fold where no parameter set passes min_trades (or every
+    score is NaN) is skipped: its test window stays in cash and its row has
+    skipped=True with no parameters or training score.
+
+    Parameters:
+    - data: OHLCV DataFrame or MarketData
+    - strategy_cls: strategy class to tune
+    - param_grid: dict of parameter name -> list of values (as for run_sweep)
+    - train_bars, test_bars, step, anchored: fold layout (see make_folds)
+    - constraint: optional function(params) -> bool to skip invalid combos
+    - objective, min_trades: training objective (see tuning.optimizers.Evaluator)
+    - max_workers: processes used for the training folds (1 = in this process, None = all cores)
+    - remaining arguments: same as Backtester
+
+    Returns:
+    - WalkForwardResult
+    """
+    data = as_market_data(data)
+    prices = as_price_array(data['Close'])
+    param_sets = expand_grid(param_grid, constraint)
+    folds = make_folds(len(prices), train_bars, test_bars, step, anchored)
+    if not param_sets or not folds:
+        raise ValueError("walk_forward needs at least one parameter set and one fold")
+
+    signals = strategy_cls.generate_signal_matrix(data, param_sets)
+    costs = prepare_costs(costs, data)  # built on the full history, sliced per window
+    backtest_kwargs = dict(allocation_pct=allocation_pct, stop_loss_pct=stop_loss_pct,
+                           take_profit_pct=take_profit_pct, use_jit=use_jit)
+
+    # Training windows are independent: split consecutive folds over the workers,
+    # sending each worker only the bars its folds cover
+    max_workers = max_workers or os.cpu_count()
+    train_kwargs = dict(backtest_kwargs, initial_cash=initial_cash)
+    if max_workers > 1 and len(folds) > 1:
+        futures = []
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for chunk in np.array_split(np.arange(len(folds)), min(max_workers, len(folds))):
+                lo = min(folds[i][0] for i in chunk)
+                hi = max(folds[i][1] for i in chunk)
+                local = [(folds[i][0] - lo, folds[i][1] - lo, 0, 0) for i in chunk]
+                futures.append(pool.submit(_train_folds, prices[lo:hi], signals[:, lo:hi],
+                                           costs.slice(lo, hi) if costs is not None else None, local, train_kwargs))
+            train_metrics = [metrics for future in futures for metrics in future.result()]
+    else:
+        train_metrics = _train_folds(prices, signals, costs, folds, train_kwargs)
+
+    # Out-of-sample: each test window continues from the previous one's capital
+    capital = float(initial_cash)
+    rows = []
+    equity = []
+    for k, ((train_start, train_end, test_start, test_end), metrics) in enumerate(zip(folds, train_metrics)):
+        row = {
+            'fold': k,
+            'train_start': data.index[train_start],
+            'train_end': data.index[train_end - 1],
+            'test_start': data.index[test_start],
+            'test_end': data.index[test_end - 1],
+        }
+        scores = score_metrics(metrics, objective, min_trades)
+        if np.all(scores == -np.inf):
+            # No parameter set qualified: argmax would pick set 0 for no reason, so stay in cash
+            equity.append(np.full(test_end - test_start, capital))
+            rows.append({**row, **dict.fromkeys(param_sets[0], np.nan), 'train_score': np.nan,
+                         'test_return': 0.0, 'test_sharpe': 0.0, 'test_max_drawdown': 0.0, 'test_trades': 0,
+                         'skipped': True})
+            continue
+
+        best = int(np.argmax(scores))
+        result = simulate(prices[test_start:test_end], signals[best, test_start:test_end], initial_cash=capital,
+                          costs=costs.slice(test_start, test_end) if costs is not None else None,
+                          **backtest_kwargs)
+        equity.append(result.equity)
+
+        test_equity = np.concatenate(([capital], result.equity))
+        rows.append({
+            **row,
+            **param_sets[best],
+            'train_score': float(scores[best]),
+            'test_return': (result.portfolio_value - capital) / capital,
+            'test_sharpe': float(calculate_sharpe_ratio(test_equity)),
+            'test_max_drawdown': float(calculate_max_drawdown(test_equity)),
+            'test_trades': int(np.count_nonzero(result.trade_type != TRADE_BUY)),
+            'skipped': False,
+        })
+        capital = result.portfolio_value
+
+    test_bars_used = np.concatenate([np.arange(a, b) for _, _, a, b in folds])
+    equity_curve = pd.Series(np.concatenate(equity), index=data.index[test_bars_used], name='equity')
+    return WalkForwardResult(pd.DataFrame(rows), equity_curve, initial_cash)
@@ -0,0 +1,29 @@
+from strategies.macd_crossover import MACDCrossoverStrategy
+from tuning.walk_forward import walk_forward
+from utils.data_cache import load_prices
+import pandas as pd
+pd.set_option("display.precision", 2)  # Round floats to 2 decimals
+pd.set_option("display.expand_frame_repr", False)  # Print wide frames in one line
+
+df = load_prices("GC=F", start="2018-01-01", end="2023-12-31")
+
+# Tune on one year (~252 bars), trade the next quarter (~63 bars), roll forward
+result = walk_forward(
+    df,
+    MACDCrossoverStrategy,
+    {'fast': [5, 8, 12], 'slow': [20, 26, 30], 'signal': [6, 9, 12]},
+    train_bars=252,
+    test_bars=63,
+    constraint=lambda params: params['fast'] < params['slow'],
+    objective='sharpe_ratio',
+    max_workers=None,
+    initial_cash=100000,
+    allocation_pct=0.1,
+    stop_loss_pct=0.05,
+    take_profit_pct=0.1
+)
+
+print(result.folds)
+print(f"\nOut-of-sample return: {result.summary['total_return'] * 100:.2f}%, "
+      f"Sharpe: {result.summary['sharpe_ratio']:.2f}, Max Drawdown: {result.summary['max_drawdown'] * 100:.2f}%")
+result.equity_curve.to_csv("walk_forward_macd_equity.csv")
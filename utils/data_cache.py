@@ -0,0 +1,233 @@
+# utils/data_cache.py
+
+import json
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Parquet schema metadata key holding the date range a cache file covers
+COVERAGE_KEY = b'quant_bot.coverage'
+
+
+def _normalize(df):
+    """
+    Flattens yfinance-style MultiIndex columns, keeps the OHLCV columns as
+    float64 and names the (sorted, de-duplicated) index 'Date'.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    df = df[[c for c in PRICE_COLUMNS if c in df.columns]].astype(np.float64)
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.rename('Date')
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+class YFinanceSource:
+    """
+    Downloads daily OHLCV from Yahoo Finance (yfinance is imported on first use).
+    Uses the per-ticker history API: yf.download keeps shared global state and
+    is not safe to call from several threads (see utils.ingest).
+    """
+    def fetch(self, ticker, start, end):
+        import yfinance as yf
+        return yf.Ticker(ticker).history(start=start, end=end, auto_adjust=True)
+
+
+class CSVSource:
+    """
+    Reads OHLCV from CSV files like data/sample_data.csv
+    (a Date column followed by Open, High, Low, Close, Volume).
+
+    Parameters:
+    - directory: folder holding the files
+    - filename: file name pattern, formatted with the ticker
+    """
+    def __init__(self, directory='data', filename='{ticker}.csv'):
+        self.directory = directory
+        self.filename = filename
+
+    def fetch(self, ticker, start, end):
+        path = os.path.join(self.directory, self.filename.format(ticker=ticker))
+        df = pd.read_csv(path, index_col='Date', parse_dates=True)
+        return df.loc[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+
+class StubSource:
+    """
+    Offline source: a reproducible random walk per ticker on business days.
+    Useful for tests and for running the scripts without network access.
+    """
+    def __init__(self, start_price=100.0, volatility=0.02):
+        self.start_price = start_price
+        self.volatility = volatility
+
+    def fetch(self, ticker, start, end):
+        dates = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+        # Log prices are a fixed function of (ticker, day number),
+        # so overlapping ranges return identical bars
+        days = dates.values.astype('datetime64[D]').astype(np.int64) % 100_000
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        steps = rng.normal(0, self.volatility, 100_000)
+        log_prices = np.cumsum(steps)[days]
+        close = self.start_price * np.exp(log_prices)
+        step = steps[days]
+        spread = np.abs(step) * close
+        return pd.DataFrame({
+            'Open': close * (1 - step / 2),
+            'High': close + spread,
+            'Low': close - spread,
+            'Close': close,
+            'Volume': np.full(len(dates), 1_000_000.0),
+        }, index=dates)
+
+
+def _fetched_range(df, start, end):
+    """
+    Dates a download covers: its first bar through the day after its last,
+    within the requested [start, end). None when it came back empty.
+    """
+    if len(df) == 0:
+        return None
+    return max(start, df.index[0]), min(end, df.index[-1] + pd.Timedelta(days=1))
+
+
+def _has_business_days(start, end):
+    # Gaps of only a weekend (e.g. a request starting on a Saturday) hold no daily bars
+    return len(pd.bdate_range(start, end - pd.Timedelta(days=1))) > 0
+
+
+class MarketDataCache:
+    """
+    Local Parquet cache of OHLCV per ticker in front of a data source.
+
+    Each ticker is one Parquet file that records the date range it covers:
+    the dates the source actually returned, not the dates requested, so a
+    short or empty download (future end date, listing after the start, a
+    failed request) is fetched again next time. A request outside that
+    range only fetches the missing part and merges it in. Reads are
+    memory-mapped and can be limited to the needed columns.
+
+    Parameters:
+    - source: object with fetch(ticker, start, end) -> DataFrame (default: YFinanceSource)
+    - cache_dir: folder for the Parquet files
+    """
+    def __init__(self, source=None, cache_dir=os.path.join('data', 'cache')):
+        self.source = source if source is not None else YFinanceSource()
+        self.cache_dir = cache_dir
+
+    def path(self, ticker):
+        safe = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in ticker)
+        return os.path.join(self.cache_dir, f'{safe}.parquet')
+
+    def coverage(self, ticker):
+        """
+        Returns the (start, end) Timestamps cached for `ticker`, or None.
+        """
+        import pyarrow.parquet as pq
+
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None
+        metadata = pq.read_schema(path).metadata or {}
+        if COVERAGE_KEY not in metadata:
+            return None
+        covered = json.loads(metadata[COVERAGE_KEY])
+        return pd.Timestamp(covered['start']), pd.Timestamp(covered['end'])
+
+    def load(self, ticker, start, end, columns=None):
+        """
+        Returns OHLCV for [start, end) (end exclusive, like yf.download),
+        topping the cache up from the source when the range is not covered.
+
+        Parameters:
+        - ticker: symbol
+        - start, end: dates (strings or Timestamps)
+        - columns: optional list of columns to read (default: all)
+        """
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        covered = self.coverage(ticker)
+
+        if covered is None:
+            df = _normalize(self.source.fetch(ticker, start, end))
+            fetched = _fetched_range(df, start, end)
+            if fetched is None:
+                # Nothing to cache (unknown ticker, future dates, failed download)
+                return df if columns is None else df[columns]
+            self._write(ticker, df, *fetched)
+        else:
+            new_start, new_end = covered
+            parts = []
+            if start < covered[0] and _has_business_days(start, covered[0]):
+                df = _normalize(self.source.fetch(ticker, start, covered[0]))
+                fetched = _fetched_range(df, start, covered[0])
+                if fetched is not None:
+                    parts.append(df)
+                    new_start = fetched[0]
+            if end > covered[1] and _has_business_days(covered[1], end):
+                df = _normalize(self.source.fetch(ticker, covered[1], end))
+                fetched = _fetched_range(df, covered[1], end)
+                if fetched is not None:
+                    parts.append(df)
+                    new_end = fetched[1]
+            if parts:
+                merged = _normalize(pd.concat([self._read(ticker, None, None, None)] + parts))
+                self._write(ticker, merged, new_start, new_end)
+
+        return self._read(ticker, start, end, columns)
+
+    def _write(self, ticker, df, start, end):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        coverage = json.dumps({'start': start.isoformat(), 'end': end.isoformat()})
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), COVERAGE_KEY: coverage})
+
+        # Write then rename so readers never see a half-written file
+        path = self.path(ticker)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _read(self, ticker, start, end, columns):
+        import pyarrow.parquet as pq
+
+        filters = []
+        if start is not None:
+            filters.append(('Date', '>=', start))
+        if end is not None:
+            filters.append(('Date', '<', end))
+
+        table = pq.read_table(
+            self.path(ticker),
+            columns=columns,
+            filters=filters or None,
+            memory_map=True,
+            use_pandas_metadata=True
+        )
+        return table.to_pandas()
+
+
+_default_cache = None
+
+
+def load_prices(ticker, start, end, columns=None, cache=None):
+    """
+    Shortcut used by the scripts: loads `ticker` through a shared
+    MarketDataCache (Yahoo Finance source, data/cache folder by default).
+    """
+    global _default_cache
+    if cache is None:
+        if _default_cache is None:
+            _default_cache = MarketDataCache()
+        cache = _default_cache
+    return cache.load(ticker, start, end, columns=columns)
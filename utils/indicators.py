@@ -0,0 +1,284 @@
+# utils/indicators.py
+
+import hashlib
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils import kernels
+from utils.profiling import active
+
+# Default memory budget for cached indicator arrays
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator arrays keyed by (data fingerprint, indicator, params).
+    Least recently used entries are evicted once the stored arrays exceed
+    `max_bytes`.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, compute):
+        """
+        Returns the cached value for `key`, calling `compute()` on a miss.
+        Values are arrays or tuples of arrays; they are made read-only
+        because every caller shares them.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        value = compute()
+        arrays = value if isinstance(value, tuple) else (value,)
+        for array in arrays:
+            array.flags.writeable = False
+
+        self._entries[key] = value
+        self.nbytes += sum(array.nbytes for array in arrays)
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            evicted = evicted if isinstance(evicted, tuple) else (evicted,)
+            self.nbytes -= sum(array.nbytes for array in evicted)
+        return value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = IndicatorCache()
+
+# Fingerprints already computed for live array objects, by id()
+_fingerprints = {}
+
+
+def get_cache():
+    return _cache
+
+
+def set_cache_budget(max_bytes):
+    _cache.max_bytes = max_bytes
+
+
+def fingerprint(values):
+    """
+    Content hash of a price array. Equal data gives equal fingerprints,
+    so copies of the same DataFrame share cache entries.
+    The hash is remembered for as long as the array object is alive.
+    """
+    key = id(values)
+    if key in _fingerprints:
+        return _fingerprints[key][1]
+
+    data = np.ascontiguousarray(values, dtype=np.float64)
+    digest = hashlib.blake2b(data.view(np.uint8), digest_size=16).hexdigest()
+    result = f'{digest}:{len(data)}'
+    try:
+        ref = weakref.ref(values, lambda _, key=key: _fingerprints.pop(key, None))
+        _fingerprints[key] = (ref, result)
+    except TypeError:  # lists and other objects without weakref support
+        pass
+    return result
+
+
+def _cached(values, name, params, compute):
+    with active().phase('indicators'):
+        return _cache.get((fingerprint(values), name) + params, compute)
+
+
+def _cached_many(values, name, windows, compute_many):
+    """
+    Cached values of a one-window indicator for several windows. The windows
+    not cached yet are computed together by `compute_many(windows)`, which
+    returns one row per window (or a tuple of such arrays), and each row is
+    cached under its own window.
+    """
+    with active().phase('indicators'):
+        key = fingerprint(values)
+        windows = [int(window) for window in windows]
+        missing = [window for window in dict.fromkeys(windows) if (key, name, window) not in _cache]
+        computed = {}
+        if missing:
+            rows = compute_many(missing)
+            for i, window in enumerate(missing):
+                computed[window] = tuple(row[i] for row in rows) if isinstance(rows, tuple) else rows[i]
+
+        def single(window):
+            if window in computed:
+                return computed[window]
+            rows = compute_many([window])
+            return tuple(row[0] for row in rows) if isinstance(rows, tuple) else rows[0]
+
+        return [_cache.get((key, name, window), lambda window=window: single(window)) for window in windows]
+
+
+def sma(values, window):
+    """
+    Simple moving average (NaN until `window` bars are available).
+    """
+    return sma_many(values, [window])[0]
+
+
+def sma_many(values, windows):
+    """
+    Simple moving averages for several windows, computed in one kernel call.
+
+    Returns:
+    - list of arrays, one per window
+    """
+    return _cached_many(values, 'sma', windows, lambda missing: kernels.rolling_mean(values, missing))
+
+
+def rolling_mean_std(values, window):
+    """
+    Rolling mean and sample standard deviation (ddof=1), from one pass.
+    """
+    return rolling_mean_std_many(values, [window])[0]
+
+
+def rolling_mean_std_many(values, windows):
+    """
+    (mean, std) pairs for several windows, computed in one kernel call.
+    """
+    return _cached_many(values, 'mean_std', windows, lambda missing: kernels.rolling_mean_std(values, missing))
+
+
+def rolling_std(values, window):
+    """
+    Rolling sample standard deviation (ddof=1, same as pandas).
+    """
+    return rolling_mean_std(values, window)[1]
+
+
+def rolling_max(values, window):
+    """
+    Highest value of the last `window` bars (monotonic-deque kernel).
+    """
+    return _cached_many(values, 'max', [window], lambda missing: kernels.rolling_max(values, missing))[0]
+
+
+def rolling_min(values, window):
+    """
+    Lowest value of the last `window` bars.
+    """
+    return _cached_many(values, 'min', [window], lambda missing: kernels.rolling_min(values, missing))[0]
+
+
+def bollinger_bands(values, window, num_std):
+    """
+    Returns (middle, upper, lower) Bollinger Bands.
+    Mean and std are cached per window and shared by every num_std.
+    """
+    def compute():
+        middle, std = rolling_mean_std(values, window)
+        return middle, middle + num_std * std, middle - num_std * std
+
+    return _cached(values, 'bollinger', (window, num_std), compute)
+
+
+def ema(values, span):
+    """
+    Exponential moving average (pandas ewm with adjust=False).
+    """
+    return _cached(values, 'ema', (span,),
+                   lambda: pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy())
+
+
+def macd(values, fast, slow, signal):
+    """
+    Returns (macd line, signal line).
+    """
+    def compute():
+        line = ema(values, fast) - ema(values, slow)
+        return line, pd.Series(line).ewm(span=signal, adjust=False).mean().to_numpy()
+
+    return _cached(values, 'macd', (fast, slow, signal), compute)
+
+
+def rsi(values, window):
+    """
+    Relative Strength Index using simple rolling means of gains and losses.
+    """
+    return rsi_many(values, [window])[0]
+
+
+def rsi_many(values, windows):
+    """
+    RSI for several windows; gains and losses are computed once for all of them.
+    """
+    return _cached_many(values, 'rsi', windows, lambda missing: kernels.rsi(values, missing))
+
+
+def wilder_rsi(values, window):
+    """
+    Relative Strength Index with Wilder's smoothing (NaN for the first `window` bars).
+    """
+    return _cached_many(values, 'wilder_rsi', [window], lambda missing: kernels.wilder_rsi(values, missing))[0]
+
+
+def local_minima(values):
+    """
+    Boolean mask of strict local minima (lower than both neighbours).
+    The first and last bars are never pivots.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mask = np.zeros(len(values), dtype=bool)
+    mask[1:-1] = (values[1:-1] < values[:-2]) & (values[1:-1] < values[2:])
+    return mask
+
+
+def local_maxima(values):
+    """
+    Boolean mask of strict local maxima (higher than both neighbours).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    mask = np.zeros(len(values), dtype=bool)
+    mask[1:-1] = (values[1:-1] > values[:-2]) & (values[1:-1] > values[2:])
+    return mask
+
+
+def pivot_pairs(pivots, lookback):
+    """
+    All (current, previous) pairs of pivots at most `lookback` bars apart.
+
+    Works on the pivot indices only: for each offset m it pairs every pivot
+    with the m-th pivot before it. Strict pivots of one kind are at least
+    two bars apart, so at most lookback // 2 offsets are needed.
+
+    Returns:
+    - (current indices, previous indices) as int arrays
+    """
+    pivot_index = np.flatnonzero(pivots)
+    current, previous = [], []
+    for m in range(1, lookback // 2 + 2):
+        if m >= len(pivot_index):
+            break
+        gap = pivot_index[m:] - pivot_index[:-m]
+        keep = gap <= lookback
+        if not keep.any():
+            break
+        current.append(pivot_index[m:][keep])
+        previous.append(pivot_index[:-m][keep])
+
+    if not current:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(current), np.concatenate(previous)
@@ -0,0 +1,393 @@
+# utils/ingest.py
+#
+# Concurrent price ingestion for large ticker universes. Downloads run on a
+# bounded number of threads driven by asyncio (sources such as yfinance are
+# blocking), failed fetches are retried with exponential backoff, and
+# tickers are handed on as soon as they arrive, so backtests of the first
+# tickers run while the rest are still downloading.
+
+import asyncio
+import io
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from utils.data_cache import MarketDataCache, StubSource, _normalize
+
+# HTTP statuses worth retrying (rate limited / server-side failures)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryableError(Exception):
+    """
+    A fetch failed in a way that may succeed later (rate limit, server error).
+    """
+
+
+class FetchError(Exception):
+    """
+    A fetch failed in a way that retrying will not fix (unknown ticker, bad request).
+    """
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: the wait before retry k is uniform
+    in [0, min(max_delay, base_delay * 2**k)].
+
+    Parameters:
+    - attempts: total tries per ticker (1 = no retry)
+    - base_delay, max_delay: backoff bounds in seconds
+    - retry_on: exception types that are retried (others fail the ticker at once)
+    """
+    def __init__(self, attempts=4, base_delay=0.5, max_delay=10.0, retry_on=(RetryableError, OSError)):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class HTTPSource:
+    """
+    Fetches OHLCV CSV (a Date column followed by Open, High, Low, Close,
+    Volume) from `{base_url}/prices/{ticker}?start=...&end=...`, e.g. a
+    LocalPriceServer. Rate limits and server errors raise RetryableError,
+    other HTTP errors FetchError (not retried).
+
+    Parameters:
+    - base_url: server address
+    - timeout: seconds per request
+    """
+    def __init__(self, base_url, timeout=30.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def fetch(self, ticker, start, end):
+        query = urllib.parse.urlencode({'start': pd.Timestamp(start).date().isoformat(),
+                                        'end': pd.Timestamp(end).date().isoformat()})
+        url = f"{self.base_url}/prices/{urllib.parse.quote(ticker, safe='')}?{query}"
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                body = response.read()
+        except urllib.error.HTTPError as error:
+            # HTTPError is an OSError, which the default policy retries
+            if error.code in RETRY_STATUSES:
+                raise RetryableError(f"{ticker}: HTTP {error.code}") from error
+            raise FetchError(f"{ticker}: HTTP {error.code}") from error
+        return pd.read_csv(io.BytesIO(body), index_col='Date', parse_dates=True)
+
+
+class LocalPriceServer:
+    """
+    Local HTTP stand-in for a price API, for tests and offline runs. Serves
+    CSV from a data source (StubSource by default) at /prices/{ticker}, with
+    optional latency and random 503 failures to exercise retries.
+
+    Use as a context manager; `url` is the address to give HTTPSource.
+
+    Parameters:
+    - source: object with fetch(ticker, start, end) -> DataFrame
+    - latency: seconds each request takes
+    - failure_rate: fraction of requests answered with 503
+    - seed: random seed for the failures
+    """
+    def __init__(self, source=None, latency=0.0, failure_rate=0.0, seed=None):
+        self.source = source if source is not None else StubSource()
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def _handle(self, handler):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self._rng.random() < self.failure_rate
+            self.failures += fail
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            url = urllib.parse.urlparse(handler.path)
+            prefix = '/prices/'
+            if not url.path.startswith(prefix):
+                handler.send_error(404)
+                return
+            if fail:
+                handler.send_error(503)
+                return
+            ticker = urllib.parse.unquote(url.path[len(prefix):])
+            query = urllib.parse.parse_qs(url.query)
+            df = self.source.fetch(ticker, query['start'][0], query['end'][0])
+            body = df.to_csv(index_label='Date').encode()
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/csv')
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+async def _fetch_with_retry(loop, threads, load, ticker, retry, semaphore):
+    for attempt in range(retry.attempts):
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(threads, load, ticker)
+            except retry.retry_on:
+                if attempt == retry.attempts - 1:
+                    raise
+        # Back off outside the semaphore so other tickers keep downloading
+        await asyncio.sleep(retry.delay(attempt))
+
+
+async def stream_prices(tickers, start, end, cache=None, source=None, max_concurrency=8, prefetch=16,
+                        retry=None):
+    """
+    Downloads tickers concurrently and yields them as they arrive.
+
+    At most `max_concurrency` fetches run at once, and at most `prefetch`
+    tickers are downloading or downloaded but not yet taken by the consumer,
+    so a slow consumer pauses the downloads instead of filling memory.
+
+    Parameters:
+    - tickers: symbols to load
+    - start, end: date range (end exclusive, like yf.download)
+    - cache: MarketDataCache to load through (default: a Parquet cache in
+      front of `source`); pass cache=False to skip the Parquet cache
+    - source: data source used without a cache, or for the default cache
+      (default: YFinanceSource)
+    - max_concurrency: simultaneous fetches
+    - prefetch: tickers fetched ahead of the consumer
+    - retry: RetryPolicy (default: 4 attempts)
+
+    Yields:
+    - (ticker, DataFrame or None, exception or None), in completion order;
+      a ticker with no price data fails with FetchError
+    """
+    retry = retry or RetryPolicy()
+    if cache is None:
+        cache = MarketDataCache(source)
+    if cache is False:
+        if source is None:
+            raise ValueError("cache=False needs a source")
+
+        def fetch(ticker):
+            return _normalize(source.fetch(ticker, start, end))
+    else:
+        def fetch(ticker):
+            return cache.load(ticker, start, end)
+
+    def load(ticker):
+        df = fetch(ticker)
+        # Unknown or delisted tickers come back empty (yfinance does not raise)
+        if len(df) == 0 or 'Close' not in df.columns:
+            raise FetchError(f"{ticker}: no price data between {start} and {end}")
+        return df
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # A slot is taken before a fetch starts and freed when the consumer takes the result
+    slots = asyncio.Semaphore(max(1, prefetch))
+    queue = asyncio.Queue()
+    tickers = list(dict.fromkeys(tickers))
+
+    async def produce(ticker):
+        await slots.acquire()
+        try:
+            item = (ticker, await _fetch_with_retry(loop, threads, load, ticker, retry, semaphore), None)
+        except Exception as error:
+            item = (ticker, None, error)
+        queue.put_nowait(item)
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as threads:
+        producers = [asyncio.ensure_future(produce(ticker)) for ticker in tickers]
+        try:
+            for _ in tickers:
+                item = await queue.get()
+                slots.release()
+                yield item
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+
+def load_universe(tickers, start, end, **kwargs):
+    """
+    Blocking wrapper of stream_prices.
+
+    Returns:
+    - (dict of ticker -> DataFrame in `tickers` order, dict of ticker -> exception)
+    """
+    async def collect():
+        loaded, failures = {}, {}
+        async for ticker, df, error in stream_prices(tickers, start, end, **kwargs):
+            if error is None:
+                loaded[ticker] = df
+            else:
+                failures[ticker] = error
+        return loaded, failures
+
+    loaded, failures = asyncio.run(collect())
+    return {ticker: loaded[ticker] for ticker in tickers if ticker in loaded}, failures
+
+
+async def _backtest_ticker(loop, pool, ticker, data, strategies, store, on_result, backtest_kwargs):
+    from backtester.parallel import SharedPriceData, _run_job
+    from utils.result_store import data_fingerprint, run_key
+
+    """
+    Results of every strategy on one ticker (None for jobs that failed) and
+    the first exception raised by a job, or None.
+    """
+    results = [None] * len(strategies)
+    error = None
+    pending = list(range(len(strategies)))
+    if store is not None:
+        fingerprint = data_fingerprint(data)
+        keys = [run_key(fingerprint, strategy_cls, params, backtest_kwargs) for _, strategy_cls, params in strategies]
+        cached = store.get_many(keys)
+        pending = [i for i in pending if keys[i] not in cached]
+        for i, (name, _, _) in enumerate(strategies):
+            if keys[i] in cached:
+                results[i] = {'ticker': ticker, 'strategy': name, **cached[keys[i]]}
+                if on_result is not None:
+                    on_result(ticker, results[i])
+    if not pending:
+        return results, error
+
+    with SharedPriceData({ticker: data}) as shared:
+        futures = {
+            asyncio.ensure_future(loop.run_in_executor(
+                pool, _run_job, shared.handles[ticker], ticker, *strategies[i], backtest_kwargs)): i
+            for i in pending
+        }
+        remaining = set(futures)
+        while remaining:
+            done, remaining = await asyncio.wait(remaining, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as job_error:
+                    # One bad ticker must not stop the rest of the universe
+                    error = error or job_error
+                    continue
+                if store is not None:
+                    name, strategy_cls, params = strategies[i]
+                    store.put({**results[i], 'key': keys[i], 'strategy_cls': strategy_cls, 'params': params,
+                               'settings': backtest_kwargs, 'fingerprint': fingerprint})
+                if on_result is not None:
+                    on_result(ticker, results[i])
+    return results, error
+
+
+async def run_universe_async(tickers, strategies, start, end, max_workers=None, store=None, on_result=None,
+                             on_error=None, ingest_kwargs=None, **backtest_kwargs):
+    """
+    Async version of run_universe (for callers that already run an event loop).
+    """
+    loop = asyncio.get_running_loop()
+    by_ticker, failures, tasks = {}, {}, []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        async for ticker, data, error in stream_prices(tickers, start, end, **(ingest_kwargs or {})):
+            if error is not None:
+                failures[ticker] = error
+                if on_error is not None:
+                    on_error(ticker, error)
+                continue
+            # Backtests of this ticker start now; the loop goes back to waiting for downloads
+            task = asyncio.ensure_future(_backtest_ticker(loop, pool, ticker, data, strategies, store,
+                                                          on_result, backtest_kwargs))
+            tasks.append((ticker, task))
+        for ticker, task in tasks:
+            by_ticker[ticker], error = await task
+            if error is not None:
+                failures[ticker] = error
+                if on_error is not None:
+                    on_error(ticker, error)
+
+    results = [result for ticker in tickers if ticker in by_ticker for result in by_ticker[ticker]
+               if result is not None]
+    return results, failures
+
+
+def run_universe(tickers, strategies, start, end, max_workers=None, store=None, on_result=None, on_error=None,
+                 ingest_kwargs=None, **backtest_kwargs):
+    """
+    Downloads a ticker universe and backtests it in one pipeline: each
+    ticker's backtests go to the process pool as soon as its prices arrive,
+    while the next tickers are still downloading (see stream_prices).
+
+    Parameters:
+    - tickers: symbols
+    - strategies: list of (name, strategy class, params), run on every ticker
+    - start, end: date range
+    - max_workers: backtest worker processes (default: all cores)
+    - store: optional utils.result_store.ResultStore (stored runs are not recomputed)
+    - on_result: optional callback(ticker, result) as each backtest completes
+    - on_error: optional callback(ticker, exception) for tickers that failed to load
+      or whose backtests raised
+    - ingest_kwargs: stream_prices options (cache, source, max_concurrency, prefetch, retry)
+    - backtest_kwargs: passed to every Backtester (initial_cash, stop_loss_pct, ...)
+
+    Returns:
+    - (list of result dicts in (ticker, strategy) order, dict of ticker -> exception
+      for the tickers that could not be loaded or backtested; the other
+      strategies of a ticker whose backtest raised are still returned)
+    """
+    return asyncio.run(run_universe_async(tickers, strategies, start, end, max_workers=max_workers, store=store,
+                                          on_result=on_result, on_error=on_error, ingest_kwargs=ingest_kwargs,
+                                          **backtest_kwargs))
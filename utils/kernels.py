@@ -0,0 +1,375 @@
+# utils/kernels.py
+
+# Rolling-window kernels behind utils.indicators.
+#
+# Every kernel takes a 1-D float64 series and a list of window lengths and
+# returns a (windows x bars) array, one row per window, so a sweep computes
+# all of its windows in one call. Windows follow pandas rolling(window):
+# NaN until `window` bars are available, and NaN while a NaN is inside the
+# window.
+#
+# The mean and variance use Kahan-compensated add/remove updates like
+# pandas (a running sum for the mean, Welford for the variance) and come out
+# of a single pass: the mean is bit-for-bit equal to rolling().mean(). The
+# variance is recomputed from the window once per window length (every bar
+# for short windows), so the standard deviation stays within about 1e-9 of
+# the exact value on series of any length, closer than rolling().std(). Rolling max/min use
+# a monotonic deque (O(n) per window whatever its length). Without Numba the
+# kernels fall back to pandas.
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # pandas fallback, one rolling pass per window
+    NUMBA_AVAILABLE = False
+
+
+# Windows this short are recomputed on every bar (as cheap as the sliding update)
+EXACT_WINDOW = 8
+
+
+def _as_windows(windows):
+    windows = np.atleast_1d(np.asarray(windows, dtype=np.int64))
+    if len(windows) and windows.min() < 1:
+        raise ValueError("windows must be >= 1")
+    return windows
+
+
+def _rolling_mean_std_loop(values, windows, with_std, mean_out, std_out):
+    """
+    Sliding add/remove updates for every window, following pandas roll_mean /
+    roll_var (min_periods=window, ddof=1): separate Kahan compensations for
+    added and removed values, zero-sign checks for the mean and a run length
+    of equal values that returns the exact value (and zero variance) when
+    the whole window is constant.
+
+    Sliding updates of the variance lose precision over a long series, so
+    once every `window` bars the mean and sum of squared deviations are
+    recomputed from the bars in the window (compensated two-pass, amortized
+    O(1) per bar). The error never builds up over more than one window of
+    updates. Windows of up to EXACT_WINDOW bars, where a single update can
+    cancel out, are recomputed on every bar; a window left with one value
+    restarts from that value exactly.
+    """
+    n = len(values)
+    for row in range(len(windows)):
+        window = windows[row]
+        nobs = 0
+        neg_ct = 0
+        sum_x = 0.0
+        sum_add = 0.0
+        sum_remove = 0.0
+        mean_x = 0.0
+        ssqdm_x = 0.0
+        var_add = 0.0
+        var_remove = 0.0
+        same = 0
+        prev_value = 0.0
+        since_anchor = 0
+
+        for i in range(n):
+            if i == 0 or window == 1:
+                # A new window only ever adds (pandas restarts when windows do not overlap)
+                nobs = 0
+                neg_ct = 0
+                sum_x = 0.0
+                sum_add = 0.0
+                sum_remove = 0.0
+                mean_x = 0.0
+                ssqdm_x = 0.0
+                var_add = 0.0
+                var_remove = 0.0
+                same = 0
+                prev_value = values[i]
+            elif i >= window:
+                val = values[i - window]
+                if val == val:
+                    nobs -= 1
+                    y = -val - sum_remove
+                    t = sum_x + y
+                    sum_remove = t - sum_x - y
+                    sum_x = t
+                    if np.signbit(val):
+                        neg_ct -= 1
+                    if with_std:
+                        if nobs == 1:
+                            # One value left: its mean is exact (window=2 never drifts)
+                            for j in range(i - window + 1, i):
+                                if values[j] == values[j]:
+                                    mean_x = values[j]
+                            ssqdm_x = 0.0
+                            var_add = 0.0
+                            var_remove = 0.0
+                        elif nobs:
+                            prev_mean = mean_x - var_remove
+                            y = val - var_remove
+                            t = y - mean_x
+                            var_remove = t + mean_x - y
+                            mean_x = mean_x - t / nobs
+                            ssqdm_x = ssqdm_x - (val - prev_mean) * (val - mean_x)
+                        else:
+                            mean_x = 0.0
+                            ssqdm_x = 0.0
+
+            val = values[i]
+            if val == val:
+                nobs += 1
+                y = val - sum_add
+                t = sum_x + y
+                sum_add = t - sum_x - y
+                sum_x = t
+                if np.signbit(val):
+                    neg_ct += 1
+                if val == prev_value:
+                    same += 1
+                else:
+                    same = 1
+                prev_value = val
+                if with_std:
+                    prev_mean = mean_x - var_add
+                    y = val - var_add
+                    t = y - mean_x
+                    var_add = t + mean_x - y
+                    mean_x = mean_x + t / nobs
+                    ssqdm_x = ssqdm_x + (val - prev_mean) * (val - mean_x)
+
+            if with_std and window > 1:
+                since_anchor += 1
+                if (since_anchor >= window or window <= EXACT_WINDOW) and nobs > 1 and same < nobs:
+                    since_anchor = 0
+                    first = i - window + 1 if i >= window else 0
+                    total = 0.0
+                    for j in range(first, i + 1):
+                        if values[j] == values[j]:
+                            total += values[j]
+                    anchor_mean = total / nobs
+                    ssq = 0.0
+                    residual = 0.0
+                    for j in range(first, i + 1):
+                        if values[j] == values[j]:
+                            d = values[j] - anchor_mean
+                            ssq += d * d
+                            residual += d
+                    mean_x = anchor_mean + residual / nobs
+                    ssqdm_x = max(ssq - residual * residual / nobs, 0.0)
+                    var_add = 0.0
+                    var_remove = 0.0
+
+            if nobs >= window:
+                mean = sum_x / nobs
+                if same >= nobs:
+                    mean = prev_value
+                elif neg_ct == 0 and mean < 0:
+                    mean = 0.0
+                elif neg_ct == nobs and mean > 0:
+                    mean = 0.0
+                mean_out[row, i] = mean
+            else:
+                mean_out[row, i] = np.nan
+
+            if with_std:
+                if nobs >= window and nobs > 1:
+                    var = 0.0 if same >= nobs else ssqdm_x / (nobs - 1)
+                    std_out[row, i] = np.sqrt(var) if var > 0 else 0.0
+                else:
+                    std_out[row, i] = np.nan
+
+
+def _rolling_extreme_loop(values, windows, sign, out):
+    """
+    Rolling max (sign=1) or min (sign=-1) with a monotonic deque of bar
+    indices (head/tail pointers into one array): each bar is pushed and popped at most
+    once, so a window costs O(n) whatever its length.
+    """
+    n = len(values)
+    queue = np.empty(max(n, 1), dtype=np.int64)
+    for row in range(len(windows)):
+        window = windows[row]
+        head = 0
+        tail = 0
+        nan_count = 0
+        for i in range(n):
+            val = values[i]
+            if i >= window and values[i - window] != values[i - window]:
+                nan_count -= 1
+            if head < tail and queue[head] <= i - window:
+                head += 1
+
+            if val != val:
+                nan_count += 1
+            else:
+                while head < tail and sign * values[queue[tail - 1]] <= sign * val:
+                    tail -= 1
+                queue[tail] = i
+                tail += 1
+
+            if i + 1 >= window and nan_count == 0:
+                out[row, i] = values[queue[head]]
+            else:
+                out[row, i] = np.nan
+
+
+def _wilder_rsi_loop(gain, loss, windows, out):
+    """
+    Wilder's RSI: the first average gain/loss is the simple mean of the first
+    `window` changes, then avg = (avg * (window - 1) + change) / window.
+    """
+    n = len(gain)
+    for row in range(len(windows)):
+        window = windows[row]
+        avg_gain = 0.0
+        avg_loss = 0.0
+        for i in range(n):
+            if i <= window:
+                avg_gain += gain[i]
+                avg_loss += loss[i]
+                if i < window:
+                    out[row, i] = np.nan
+                    continue
+                avg_gain /= window
+                avg_loss /= window
+            else:
+                avg_gain = (avg_gain * (window - 1) + gain[i]) / window
+                avg_loss = (avg_loss * (window - 1) + loss[i]) / window
+
+            if avg_loss == 0:
+                out[row, i] = 100.0 if avg_gain > 0 else np.nan
+            else:
+                out[row, i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+if NUMBA_AVAILABLE:
+    _rolling_mean_std_jit = njit(cache=True)(_rolling_mean_std_loop)
+    _rolling_extreme_jit = njit(cache=True)(_rolling_extreme_loop)
+    _wilder_rsi_jit = njit(cache=True)(_wilder_rsi_loop)
+
+
+def _rolling_mean_std(values, windows, with_std):
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    windows = _as_windows(windows)
+    mean = np.empty((len(windows), len(values)))
+    std = np.empty((len(windows), len(values))) if with_std else mean
+    if NUMBA_AVAILABLE:
+        _rolling_mean_std_jit(values, windows, with_std, mean, std)
+    else:
+        series = pd.Series(values)
+        for row, window in enumerate(windows):
+            rolling = series.rolling(window=int(window))
+            mean[row] = rolling.mean().to_numpy()
+            if with_std:
+                std[row] = rolling.std().to_numpy()
+    return mean, std
+
+
+def rolling_mean(values, windows):
+    """
+    Rolling mean for every window (pandas rolling().mean()).
+
+    Returns:
+    - (windows x bars) float64 array
+    """
+    return _rolling_mean_std(values, windows, False)[0]
+
+
+def rolling_mean_std(values, windows):
+    """
+    Rolling mean and sample standard deviation (ddof=1) for every window,
+    from one fused pass per window.
+
+    Returns:
+    - (mean, std), each a (windows x bars) float64 array
+    """
+    return _rolling_mean_std(values, windows, True)
+
+
+def _rolling_extreme(values, windows, sign):
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    windows = _as_windows(windows)
+    out = np.empty((len(windows), len(values)))
+    if NUMBA_AVAILABLE:
+        _rolling_extreme_jit(values, windows, sign, out)
+    else:
+        series = pd.Series(values)
+        for row, window in enumerate(windows):
+            rolling = series.rolling(window=int(window))
+            out[row] = (rolling.max() if sign > 0 else rolling.min()).to_numpy()
+    return out
+
+
+def rolling_max(values, windows):
+    """
+    Rolling maximum for every window (pandas rolling().max()).
+    """
+    return _rolling_extreme(values, windows, 1)
+
+
+def rolling_min(values, windows):
+    """
+    Rolling minimum for every window (pandas rolling().min()).
+    """
+    return _rolling_extreme(values, windows, -1)
+
+
+def gains_losses(values):
+    """
+    Close-to-close gains and losses (both >= 0); the first bar and changes
+    next to a NaN count as 0, as in the pandas RSI.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    delta = np.full(len(values), np.nan)
+    delta[1:] = np.diff(values)
+    with np.errstate(invalid='ignore'):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = -np.where(delta < 0, delta, 0.0)
+    return gain, loss
+
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def rsi(values, windows):
+    """
+    RSI from simple rolling means of gains and losses, for every window.
+    Gains and losses are computed once and shared by all windows.
+
+    Returns:
+    - (windows x bars) float64 array
+    """
+    gain, loss = gains_losses(values)
+    return _rsi_from_averages(rolling_mean(gain, windows), rolling_mean(loss, windows))
+
+
+def wilder_rsi(values, windows):
+    """
+    RSI with Wilder's smoothing (the textbook RSI), for every window.
+    NaN for the first `window` bars.
+
+    Returns:
+    - (windows x bars) float64 array
+    """
+    gain, loss = gains_losses(values)
+    windows = _as_windows(windows)
+    out = np.empty((len(windows), len(gain)))
+    if NUMBA_AVAILABLE:
+        _wilder_rsi_jit(gain, loss, windows, out)
+    else:
+        for row, window in enumerate(windows):
+            window = int(window)
+            avg_gain = np.full(len(gain), np.nan)
+            avg_loss = np.full(len(gain), np.nan)
+            if len(gain) > window:
+                # Seeded with the simple mean, then alpha = 1 / window
+                seed_gain = gain[1:window + 1].mean()
+                seed_loss = loss[1:window + 1].mean()
+                smoothed_gain = pd.Series(np.concatenate([[seed_gain], gain[window + 1:]]))
+                smoothed_loss = pd.Series(np.concatenate([[seed_loss], loss[window + 1:]]))
+                avg_gain[window:] = smoothed_gain.ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+                avg_loss[window:] = smoothed_loss.ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+            out[row] = _rsi_from_averages(avg_gain, avg_loss)
+            out[row][(avg_loss == 0) & (avg_gain > 0)] = 100.0
+    return out
@@ -0,0 +1,95 @@
+# utils/market_data.py
+
+import numpy as np
+import pandas as pd
+
+
+class MarketData:
+    """
+    Read-only OHLCV container shared by the backtester and strategies.
+
+    Each column is a contiguous float64 array with the WRITEABLE flag off,
+    and all columns share one date index. Building it from a DataFrame takes
+    views of the frame's columns where pandas allows (float64 columns), so
+    passing the same data to many runs does not copy the prices. Derived
+    indicators are kept elsewhere (utils.indicators) instead of being added
+    as columns.
+    """
+    def __init__(self, columns, index=None):
+        """
+        Parameters:
+        - columns: dict of column name -> 1D array of equal length
+        - index: date index shared by the columns (default: RangeIndex)
+        """
+        self._columns = {}
+        for name, values in columns.items():
+            array = np.ascontiguousarray(values, dtype=np.float64)
+            if array.ndim != 1:
+                raise ValueError(f"column {name!r} must be 1D")
+            view = array.view()
+            view.flags.writeable = False
+            self._columns[name] = view
+
+        lengths = {len(values) for values in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("all columns must have the same length")
+        n_bars = lengths.pop() if lengths else (len(index) if index is not None else 0)
+        self.index = index if index is not None else pd.RangeIndex(n_bars)
+        if len(self.index) != n_bars:
+            raise ValueError("index length does not match the columns")
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Wraps an OHLCV DataFrame. Non-numeric columns are skipped. Handles the
+        single-ticker MultiIndex columns yfinance returns (the first column
+        under each name is used).
+        """
+        columns = {}
+        for name in dict.fromkeys(df.columns.get_level_values(0)):
+            values = df[name]
+            if isinstance(values, pd.DataFrame):
+                values = values.iloc[:, 0]
+            if pd.api.types.is_numeric_dtype(values):
+                columns[name] = values.to_numpy(dtype=np.float64)
+        return cls(columns, df.index)
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __len__(self):
+        return len(self.index)
+
+    def slice(self, start=None, stop=None):
+        """
+        MarketData over bars [start:stop] (views, no copy).
+        """
+        return MarketData({name: values[start:stop] for name, values in self._columns.items()},
+                          self.index[start:stop])
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self._columns.values())
+
+    def to_frame(self):
+        """
+        DataFrame over the same (read-only) arrays.
+        """
+        return pd.DataFrame(self._columns, index=self.index, copy=False)
+
+
+def as_market_data(data):
+    """
+    Returns `data` as a MarketData, wrapping DataFrames and passing
+    anything else (already a MarketData) through unchanged.
+    """
+    if isinstance(data, pd.DataFrame):
+        return MarketData.from_frame(data)
+    return data
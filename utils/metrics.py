@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from backtester.engine import TRADE_BUY
+
 def calculate_sharpe_ratio(equity_curve, risk_free_rate=0.0):
     """
     Calculates the annualized Sharpe Ratio:
@@ -49,35 +51,72 @@ def calculate_max_drawdown(equity_curve):
     return drawdowns.min()
 
 
-def calculate_win_rate(trades):
+def batch_sharpe_ratio(equity_curves, risk_free_rate=0.0):
     """
-    Calculates % of profitable trades
+    calculate_sharpe_ratio for every row of a (curves x time) equity array at once.
+
+    Returns:
+    - 1D array of Sharpe ratios (0 where returns have no variance)
+    """
+    equity_curves = np.asarray(equity_curves, dtype=np.float64)
+    excess_returns = np.diff(equity_curves, axis=1) / equity_curves[:, :-1] - risk_free_rate
+    std = np.std(excess_returns, axis=1)
+    mean = np.mean(excess_returns, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(std == 0, 0.0, mean / std * np.sqrt(252))
+
+
+def batch_max_drawdown(equity_curves):
+    """
+    calculate_max_drawdown for every row of a (curves x time) equity array at once.
+    """
+    equity_curves = np.asarray(equity_curves, dtype=np.float64)
+    peaks = np.maximum.accumulate(equity_curves, axis=1)
+    return ((equity_curves - peaks) / peaks).min(axis=1)
+
+
+def _paired_exits(trades):
+    """
+    Pairs each exit with the most recent buy before it.
 
     Parameters:
-    - trades: list of (type, index, price, shares)
+    - trades: record array with 'type', 'price' and 'shares' fields
+      (backtester.engine.TRADE_DTYPE), or a list of (type, index, price, shares)
 
     Returns:
-    - win rate as decimal (0.6 = 60%)
+    - (buy_price, sell_price, shares) arrays for every exit that has a buy
     """
-    wins = 0
-    total = 0
+    if isinstance(trades, np.ndarray) and trades.dtype.names:
+        is_buy = trades['type'] == TRADE_BUY
+        # Position of the latest buy at or before each trade (-1 if none yet)
+        last_buy = np.maximum.accumulate(np.where(is_buy, np.arange(len(trades)), -1))
+        buy_price = trades['price'][np.maximum(last_buy, 0)]
+        exits = ~is_buy & (last_buy >= 0) & (buy_price != 0)
+        return buy_price[exits], trades['price'][exits], trades['shares'][exits]
+
+    pairs = []
+    buy_price = None
+    for trade in trades:
+        if trade[0] == 'buy':
+            buy_price = trade[2]
+        elif trade[0] in ('sell', 'stop_loss', 'take_profit') and buy_price:
+            pairs.append((buy_price, trade[2], trade[3]))
+    pairs = np.array(pairs, dtype=np.float64).reshape(-1, 3)
+    return pairs[:, 0], pairs[:, 1], pairs[:, 2]
 
-    for i in range(len(trades)):
-        if trades[i][0] in ('sell', 'stop_loss', 'take_profit'):
-            # Look back to find the most recent buy
-            buy_price = None
-            for j in range(i - 1, -1, -1):
-                if trades[j][0] == 'buy':
-                    buy_price = trades[j][2]  # Buy price
-                    break
 
-            if buy_price:
-                sell_price = trades[i][2]
-                if sell_price > buy_price:
-                    wins += 1
-                total += 1
+def calculate_win_rate(trades):
+    """
+    Calculates % of profitable trades
+
+    Parameters:
+    - trades: trade record array, or list of (type, index, price, shares)
 
-    return wins / total if total > 0 else 0
+    Returns:
+    - win rate as decimal (0.6 = 60%)
+    """
+    buy_price, sell_price, _ = _paired_exits(trades)
+    return float(np.mean(sell_price > buy_price)) if len(buy_price) else 0
 
 
 def calculate_profit_factor(trades):
@@ -85,30 +124,69 @@ def calculate_profit_factor(trades):
     Calculates profit factor = total profit / total loss
 
     Parameters:
-    - trades: list of (type, index, price, shares)
+    - trades: trade record array, or list of (type, index, price, shares)
 
     Returns:
     - profit factor (float, or inf if no losses)
     """
-    profit = 0
-    loss = 0
+    buy_price, sell_price, shares = _paired_exits(trades)
+    pnl = (sell_price - buy_price) * shares
+    profit = pnl[pnl > 0].sum()
+    loss = -pnl[pnl <= 0].sum()
 
-    for i in range(len(trades)):
-        if trades[i][0] in ('sell', 'stop_loss', 'take_profit'):
-            buy_price = None
-            shares = trades[i][3]
+    return profit / loss if loss > 0 else float('inf')
 
-            # Find the most recent corresponding buy
-            for j in range(i - 1, -1, -1):
-                if trades[j][0] == 'buy':
-                    buy_price = trades[j][2]
-                    break
 
-            if buy_price:
-                pnl = (trades[i][2] - buy_price) * shares
-                if pnl > 0:
-                    profit += pnl
-                else:
-                    loss += abs(pnl)
+def calculate_trade_statistics(ledger, prices=None):
+    """
+    Computes all round-trip statistics in one vectorized pass over a ledger.
 
-    return profit / loss if loss > 0 else float('inf')
+    Parameters:
+    - ledger: TradeLedger (backtester/ledger.py) of completed round trips
+    - prices: optional 1D price array the trades were made on, needed for MAE/MFE
+
+    Returns:
+    - dict with total_trades, win_rate, profit_factor, expectancy (avg P&L per
+      trade), avg_return, avg_hold_bars and, with prices, avg_mae / avg_mfe
+      (average worst / best move from entry while the trade was open, as decimals)
+    """
+    n = len(ledger)
+    pnl = ledger.pnl
+    profit = pnl[pnl > 0].sum()
+    loss = -pnl[pnl <= 0].sum()
+
+    stats = {
+        'total_trades': n,
+        'win_rate': float(np.mean(ledger.exit_price > ledger.entry_price)) if n else 0,
+        'profit_factor': float(profit / loss) if loss > 0 else float('inf'),
+        'expectancy': float(pnl.mean()) if n else 0.0,
+        'avg_return': float(ledger.returns.mean()) if n else 0.0,
+        'avg_hold_bars': float(ledger.holding_bars.mean()) if n else 0.0,
+    }
+
+    if prices is not None:
+        mae, mfe = _excursions(np.asarray(prices, dtype=np.float64).ravel(), ledger)
+        stats['avg_mae'] = float(mae.mean()) if n else 0.0
+        stats['avg_mfe'] = float(mfe.mean()) if n else 0.0
+
+    return stats
+
+
+def _excursions(prices, ledger):
+    """
+    Maximum adverse / favorable excursion of every round trip, using one
+    reduceat over the concatenated bars of all trades (O(bars + trades)).
+    """
+    # A position carried in from an earlier run has no entry bar here
+    starts = np.maximum(ledger.entry_index, 0)
+    lengths = ledger.exit_index - starts + 1
+    if len(lengths) == 0:
+        return np.empty(0), np.empty(0)
+
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    bar_index = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+    window = prices[bar_index]
+
+    lowest = np.fmin.reduceat(window, offsets)
+    highest = np.fmax.reduceat(window, offsets)
+    return lowest / ledger.entry_price - 1, highest / ledger.entry_price - 1
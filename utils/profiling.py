@@ -0,0 +1,150 @@
+# utils/profiling.py
+
+import cProfile
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class NullProfiler:
+    """
+    Profiler that records nothing. Used when profiling is off so the
+    instrumented code paths cost one method call per phase.
+    """
+    enabled = False
+    _noop = nullcontext()
+
+    def phase(self, name):
+        return self._noop
+
+    def stop(self):
+        pass
+
+    def report(self):
+        return None
+
+
+NULL_PROFILER = NullProfiler()
+
+# Innermost profiler with an open phase, so library code (e.g. the indicator
+# cache) can report into whichever backtest is running
+_active = []
+
+
+def active():
+    return _active[-1] if _active else NULL_PROFILER
+
+
+class Profiler:
+    """
+    Per-phase wall and CPU timers, with optional allocation tracking
+    (tracemalloc) and cProfile capture.
+
+    Phases can be nested; a phase that is already open further up the stack
+    is not counted twice. Timings accumulate over repeated calls.
+    """
+    enabled = True
+
+    def __init__(self, track_memory=True, use_cprofile=False, top=20):
+        """
+        Parameters:
+        - track_memory: record bytes allocated and peak memory per phase (slows the run down)
+        - use_cprofile: capture a cProfile of everything inside the outermost phases
+        - top: number of functions kept in the cProfile report
+        """
+        self.track_memory = track_memory
+        self.use_cprofile = use_cprofile
+        self.top = top
+        self.phases = {}
+        self._stack = []
+        self._started_tracing = False
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+
+    @contextmanager
+    def phase(self, name):
+        if any(frame['name'] == name for frame in self._stack):
+            yield
+            return
+
+        if not self._stack:
+            _active.append(self)
+            if self.track_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            if self._cprofile is not None:
+                self._cprofile.enable()
+
+        frame = {'name': name, 'peak': 0}
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['memory'] = current
+        self._stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self._stack.pop()
+
+            stats = self.phases.setdefault(name, {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+            stats['calls'] += 1
+            stats['wall'] += wall
+            stats['cpu'] += cpu
+            if 'memory' in frame and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame['peak'])
+                stats['allocated'] = stats.get('allocated', 0) + current - frame['memory']
+                stats['peak'] = max(stats.get('peak', 0), peak - frame['memory'])
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+            if not self._stack:
+                if self._cprofile is not None:
+                    self._cprofile.disable()
+                _active.remove(self)
+
+    def stop(self):
+        """
+        Stops tracemalloc if this profiler started it.
+        """
+        if self._started_tracing and not self._stack:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self):
+        """
+        Returns the structured report:
+        - phases: {name: {calls, wall, cpu[, allocated, peak]}} in first-seen order
+          (seconds and bytes; nested phases are also included in their parents)
+        - cprofile: top functions by cumulative time, when enabled
+        """
+        report = {'phases': {name: dict(stats) for name, stats in self.phases.items()}}
+        if self._cprofile is not None:
+            rows = []
+            for (filename, line, function), (_, calls, tottime, cumtime, _) in \
+                    pstats.Stats(self._cprofile).stats.items():
+                rows.append({'function': f'{filename}:{line}({function})', 'calls': calls,
+                             'tottime': tottime, 'cumtime': cumtime})
+            rows.sort(key=lambda row: row['cumtime'], reverse=True)
+            report['cprofile'] = rows[:self.top]
+        return report
+
+
+def make_profiler(profile):
+    """
+    Maps a `profile` argument to a profiler:
+    False/None -> NULL_PROFILER, True -> Profiler(), a dict -> Profiler(**dict)
+    (e.g. {'use_cprofile': True}), a Profiler is used as-is.
+    """
+    if not profile:
+        return NULL_PROFILER
+    if profile is True:
+        return Profiler()
+    if isinstance(profile, dict):
+        return Profiler(**profile)
+    return profile
@@ -0,0 +1,174 @@
+# utils/resample.py
+
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.indicators import fingerprint
+from utils.market_data import MarketData, as_market_data
+from utils.profiling import active
+
+# Resampled timeframes kept in memory (least recently used are dropped)
+MAX_TIMEFRAMES = 64
+
+_timeframes = OrderedDict()
+
+# Index keys already computed for live index objects, by id()
+_index_keys = {}
+
+
+class Timeframe:
+    """
+    Bars of a base dataset aggregated to a higher timeframe, plus the index
+    maps that line the two up.
+
+    - bars: MarketData of the higher-timeframe bars (Open = first, High = max,
+      Low = min, Close and other columns = last, Volume = sum)
+    - bucket: for every base bar, the higher-timeframe bar it belongs to
+    - available: for every base bar, the latest higher-timeframe bar that is
+      complete at that bar, or -1. A higher-timeframe bar is complete once its
+      period is over: for an int rule, on its `rule`-th base bar; for an offset
+      rule, on the first base bar at or after the end of its bin. This only
+      depends on bars up to that one, so aligned values never use later
+      prices and a bar gets the same value whatever history follows it.
+    """
+    def __init__(self, bars, bucket, available):
+        self.bars = bars
+        self.bucket = bucket
+        self.available = available
+
+    def __len__(self):
+        return len(self.bars)
+
+    def column(self, name):
+        return self.bars[name]
+
+    def align(self, values):
+        """
+        Higher-timeframe values (last axis = higher-timeframe bars, e.g. an
+        indicator or a parameter x bars matrix) mapped onto the base bars:
+        each base bar gets the value of the latest complete higher-timeframe
+        bar, NaN before the first one completes.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        aligned = values[..., np.maximum(self.available, 0)]
+        aligned[..., self.available < 0] = np.nan
+        return aligned
+
+
+def _bucket_bounds(index, rule):
+    """
+    (first base bar of each higher-timeframe bar, bar counts, labels, bin ends).
+    An int rule groups every `rule` bars (bin ends are None); a pandas offset
+    string ('1h', '1D', 'W', 'ME', ...) uses the same bins as
+    DataFrame.resample(rule), and the bin ends are the right edges of those bins.
+    """
+    n_bars = len(index)
+    if isinstance(rule, (int, np.integer)):
+        if rule < 1:
+            raise ValueError("rule must be >= 1 bars")
+        starts = np.arange(0, n_bars, rule)
+        sizes = np.diff(np.append(starts, n_bars))
+        return starts, sizes, pd.RangeIndex(len(starts)), None
+
+    if not isinstance(index, pd.DatetimeIndex):
+        raise ValueError(f"resampling to {rule!r} needs a DatetimeIndex; use an int rule for other indexes")
+    if not index.is_monotonic_increasing:
+        raise ValueError("the index must be sorted to resample")
+    # Only the bin sizes are taken from pandas; the columns are aggregated below
+    counts = pd.Series(np.ones(n_bars), index=index).resample(rule).count()
+    sizes = counts.to_numpy(dtype=np.int64)
+    keep = sizes > 0
+    sizes = sizes[keep]
+    labels = counts.index[keep]
+    # Bins are labelled by their right edge ('W', 'ME', ...) or by their left edge ('1h', 'D', 'MS', ...)
+    ends = labels if pd.Grouper(freq=rule).label == 'right' else labels + pd.tseries.frequencies.to_offset(rule)
+    return np.cumsum(sizes) - sizes, sizes, labels, ends
+
+
+def _aggregate(data, rule):
+    starts, sizes, labels, bin_ends = _bucket_bounds(data.index, rule)
+    ends = starts + sizes - 1
+    if len(starts) == 0:
+        return Timeframe(data, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+    columns = {}
+    for name in data.columns:
+        values = data[name]
+        if name == 'Open':
+            columns[name] = values[starts]
+        elif name == 'High':
+            columns[name] = np.fmax.reduceat(values, starts)  # NaN bars are skipped
+        elif name == 'Low':
+            columns[name] = np.fmin.reduceat(values, starts)
+        elif name == 'Volume':
+            columns[name] = np.add.reduceat(np.nan_to_num(values), starts)
+        else:
+            columns[name] = values[ends]
+
+    bucket = np.repeat(np.arange(len(starts), dtype=np.int64), sizes)
+    if bin_ends is None:
+        # Only a full group of `rule` bars is complete (the last group may still grow)
+        complete = np.zeros(len(data), dtype=bool)
+        complete[ends] = sizes == rule
+    else:
+        # The bars of a bin are all in once a bar reaches its right edge
+        complete = np.asarray(data.index >= bin_ends[bucket])
+    available = np.where(complete, bucket, bucket - 1)
+    return Timeframe(MarketData(columns, labels), bucket, available)
+
+
+def _index_key(index):
+    """
+    Content key of a bar index, remembered while the index object is alive
+    (like utils.indicators.fingerprint).
+    """
+    if isinstance(index, pd.RangeIndex):
+        return ('range', index.start, index.stop, index.step)
+    key = id(index)
+    if key in _index_keys:
+        return _index_keys[key][1]
+
+    if isinstance(index, pd.DatetimeIndex):
+        result = ('datetime', str(index.tz), fingerprint(index.asi8.view(np.float64)))
+    else:
+        result = ('other', fingerprint(pd.util.hash_pandas_object(index, index=False).to_numpy().view(np.float64)))
+    _index_keys[key] = (weakref.ref(index, lambda _, key=key: _index_keys.pop(key, None)), result)
+    return result
+
+
+def resample(data, rule):
+    """
+    Higher-timeframe bars of `data` with the index maps back to it.
+
+    Each (data, rule) pair is aggregated once and cached by content, so every
+    strategy and every run on the same prices shares the result. Indicators
+    computed on `timeframe.bars` are cached by utils.indicators as usual.
+
+    Parameters:
+    - data: OHLCV DataFrame or MarketData (sorted DatetimeIndex for offset rules)
+    - rule: pandas offset string ('15min', '1h', '1D', 'W', 'ME', ...) or an
+      int number of base bars
+
+    Returns:
+    - Timeframe
+    """
+    data = as_market_data(data)
+    key = (tuple((name, fingerprint(data[name])) for name in data.columns), _index_key(data.index),
+           str(rule) if not isinstance(rule, (int, np.integer)) else int(rule))
+
+    with active().phase('resample'):
+        if key in _timeframes:
+            _timeframes.move_to_end(key)
+            return _timeframes[key]
+        timeframe = _aggregate(data, rule)
+        _timeframes[key] = timeframe
+        while len(_timeframes) > MAX_TIMEFRAMES:
+            _timeframes.popitem(last=False)
+        return timeframe
+
+
+def clear_cache():
+    _timeframes.clear()
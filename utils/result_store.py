@@ -0,0 +1,258 @@
+# utils/result_store.py
+
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.market_data import as_market_data
+
+# Metrics stored for every run (the Backtester summary / simulate_batch columns)
+METRIC_COLUMNS = ('final_value', 'total_return', 'sharpe_ratio', 'max_drawdown',
+                  'win_rate', 'profit_factor', 'total_trades')
+
+# Backtester settings that change results, with their defaults (use_jit and profile do not)
+DEFAULT_SETTINGS = {'initial_cash': 100000, 'allocation_pct': 0.1, 'stop_loss_pct': 0.05, 'take_profit_pct': 0.1,
+                    'intrabar': False, 'costs': None}
+IGNORED_SETTINGS = ('use_jit', 'profile')
+
+# Engine/metrics sources, relative to the project root, that every run depends on
+# (including the sweep and process-pool runners that produce stored metrics)
+ENGINE_FILES = ('backtester/engine.py', 'backtester/backtester.py', 'backtester/costs.py', 'backtester/ledger.py',
+                'backtester/parallel.py', 'tuning/sweep.py', 'utils/metrics.py', 'utils/indicators.py',
+                'utils/kernels.py', 'utils/resample.py', 'utils/market_data.py')
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_code_versions = {}
+
+
+def _to_json(value):
+    """
+    Canonical JSON (sorted keys, NumPy scalars as Python numbers, price data
+    such as intrabar sub-bars as their fingerprint, other objects such as a
+    CostModel as their repr).
+    """
+    def default(obj):
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, pd.DataFrame) or hasattr(obj, 'columns'):
+            return data_fingerprint(obj)
+        return repr(obj)
+    return json.dumps(value, sort_keys=True, default=default)
+
+
+def data_fingerprint(data):
+    """
+    Content hash of an OHLCV DataFrame or MarketData: column names, values and index.
+    """
+    data = as_market_data(data)
+    digest = hashlib.blake2b(digest_size=16)
+    for name in data.columns:
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(data[name], dtype=np.float64).view(np.uint8))
+    digest.update(pd.util.hash_pandas_object(pd.Index(data.index), index=False).to_numpy().view(np.uint8))
+    return f'{digest.hexdigest()}:{len(data)}'
+
+
+def code_version(strategy_cls):
+    """
+    Hash of the source files a strategy's results depend on: the modules of
+    the class and its base classes, plus ENGINE_FILES. Editing any of them
+    invalidates the stored runs of that strategy only.
+    """
+    if strategy_cls in _code_versions:
+        return _code_versions[strategy_cls]
+
+    paths = {os.path.join(PROJECT_ROOT, path) for path in ENGINE_FILES}
+    for cls in strategy_cls.__mro__:
+        module = sys.modules.get(cls.__module__)
+        if module is not None and cls.__module__ != 'builtins':
+            try:
+                paths.add(os.path.abspath(inspect.getsourcefile(module)))
+            except TypeError:  # built-in module
+                pass
+
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(paths):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    _code_versions[strategy_cls] = digest.hexdigest()
+    return _code_versions[strategy_cls]
+
+
+def normalize_settings(settings):
+    """
+    Backtester keyword arguments with defaults filled in and non-result settings dropped.
+    """
+    settings = {**DEFAULT_SETTINGS, **settings}
+    return {name: value for name, value in settings.items() if name not in IGNORED_SETTINGS}
+
+
+def run_key(fingerprint, strategy_cls, params, settings):
+    """
+    Content address of one backtest: data fingerprint, strategy class,
+    parameters, Backtester settings and code version.
+    """
+    payload = _to_json({
+        'data': fingerprint,
+        'strategy': f'{strategy_cls.__module__}.{strategy_cls.__qualname__}',
+        'params': params,
+        'settings': normalize_settings(settings),
+        'code': code_version(strategy_cls),
+    })
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultStore:
+    """
+    Persistent SQLite store of backtest results, keyed by `run_key`.
+
+    Callers look runs up by key before computing them and save the misses,
+    so unchanged (ticker, strategy, params, settings) combinations are never
+    recomputed. Results can be queried back as DataFrames for leaderboards.
+
+    Parameters:
+    - path: SQLite file (created with its folder if missing)
+    """
+    def __init__(self, path=os.path.join('data', 'results.sqlite')):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        metric_columns = ', '.join(f'{name} REAL' for name in METRIC_COLUMNS)
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                ticker TEXT,
+                strategy TEXT,
+                strategy_class TEXT,
+                params TEXT,
+                settings TEXT,
+                data_fingerprint TEXT,
+                code_version TEXT,
+                created_at REAL,
+                {metric_columns}
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_strategy ON results (strategy, ticker)")
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """
+        Returns {key: metrics dict} for the keys already stored.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        columns = ', '.join(METRIC_COLUMNS)
+        for start in range(0, len(keys), 500):  # stay under SQLite's parameter limit
+            chunk = keys[start:start + 500]
+            rows = self._conn.execute(
+                f"SELECT key, {columns} FROM results WHERE key IN ({', '.join('?' * len(chunk))})", chunk)
+            for key, *values in rows:
+                metrics = dict(zip(METRIC_COLUMNS, values))
+                metrics['total_trades'] = int(metrics['total_trades'])
+                found[key] = metrics
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def put_many(self, records):
+        """
+        Saves results (replacing any with the same key).
+
+        Parameters:
+        - records: iterable of dicts with key, ticker, strategy, strategy_cls,
+          params, settings, fingerprint and the METRIC_COLUMNS values
+        """
+        now = time.time()
+        rows = [
+            (record['key'], record.get('ticker'), record['strategy'],
+             f"{record['strategy_cls'].__module__}.{record['strategy_cls'].__qualname__}",
+             _to_json(record['params']), _to_json(normalize_settings(record['settings'])),
+             record['fingerprint'], code_version(record['strategy_cls']), now)
+            + tuple(float(record[name]) for name in METRIC_COLUMNS)
+            for record in records
+        ]
+        placeholders = ', '.join('?' * (9 + len(METRIC_COLUMNS)))
+        self._conn.executemany(f"INSERT OR REPLACE INTO results VALUES ({placeholders})", rows)
+        self._conn.commit()
+
+    def put(self, record):
+        self.put_many([record])
+
+    def query(self, ticker=None, strategy=None, min_trades=0, min_win_rate=None, order_by='total_return',
+              limit=None, current_only=True):
+        """
+        Stored results as a DataFrame, best first.
+
+        Parameters:
+        - ticker, strategy: optional filters (strategy is the name runs were saved under)
+        - min_trades, min_win_rate: leaderboard filters (win rate as a decimal)
+        - order_by: metric to sort by, descending
+        - limit: maximum number of rows
+        - current_only: skip runs made with an older version of their strategy's code
+
+        Returns:
+        - DataFrame with ticker, strategy, params (dict), settings (dict) and the metrics
+        """
+        if order_by not in METRIC_COLUMNS:
+            raise ValueError(f"order_by must be one of {METRIC_COLUMNS}")
+        conditions, values = ['total_trades >= ?'], [min_trades]
+        if ticker is not None:
+            conditions.append('ticker = ?')
+            values.append(ticker)
+        if strategy is not None:
+            conditions.append('strategy = ?')
+            values.append(strategy)
+        if min_win_rate is not None:
+            conditions.append('win_rate >= ?')
+            values.append(min_win_rate)
+
+        sql = (f"SELECT ticker, strategy, strategy_class, params, settings, code_version, "
+               f"{', '.join(METRIC_COLUMNS)} FROM results WHERE {' AND '.join(conditions)} "
+               f"ORDER BY {order_by} DESC")
+        df = pd.read_sql_query(sql, self._conn, params=values)
+
+        if current_only and len(df):
+            current = {}
+            for name in df['strategy_class'].unique():
+                module, _, qualname = name.rpartition('.')
+                try:
+                    cls = getattr(importlib.import_module(module), qualname)
+                except (ImportError, AttributeError):  # strategy no longer importable: keep its runs
+                    cls = None
+                current[name] = code_version(cls) if cls is not None else None
+            known = df['strategy_class'].map(current)
+            df = df[known.isna() | (df['code_version'] == known)]
+
+        df = df.drop(columns=['code_version']).reset_index(drop=True)
+        df['params'] = df['params'].map(json.loads)
+        df['settings'] = df['settings'].map(json.loads)
+        df['total_trades'] = df['total_trades'].astype(int)
+        return df.head(limit) if limit is not None else df
+
+    def clear(self):
+        self._conn.execute("DELETE FROM results")
+        self._conn.commit()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
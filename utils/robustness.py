@@ -0,0 +1,202 @@
+# utils/robustness.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtester.costs import prepare_costs
+from backtester.engine import _cost_args, _simulate, _simulate_jit
+from utils.market_data import MarketData, as_market_data
+from utils.metrics import batch_max_drawdown, batch_sharpe_ratio
+
+# Rows of resampled paths processed at a time (bounds the (rows x time) arrays)
+CHUNK_SIZE = 1000
+
+
+def path_metrics(equity_curves):
+    """
+    Total return, Sharpe ratio and max drawdown of every row of a
+    (paths x time) equity array, using the utils.metrics formulas.
+    """
+    equity_curves = np.asarray(equity_curves, dtype=np.float64)
+    return {
+        'total_return': equity_curves[:, -1] / equity_curves[:, 0] - 1,
+        'sharpe_ratio': batch_sharpe_ratio(equity_curves),
+        'max_drawdown': batch_max_drawdown(equity_curves),
+    }
+
+
+def summarize(distributions, confidence=0.9):
+    """
+    Mean, std and central `confidence` interval of each metric distribution.
+
+    Returns:
+    - DataFrame with one row per metric: mean, std, lower, median, upper
+    """
+    tail = (1 - confidence) / 2 * 100
+    rows = {}
+    for name, values in distributions.items():
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        lower, median, upper = np.percentile(values, [tail, 50, 100 - tail]) if len(values) else (np.nan,) * 3
+        rows[name] = {'mean': values.mean() if len(values) else np.nan,
+                      'std': values.std() if len(values) else np.nan,
+                      'lower': lower, 'median': median, 'upper': upper}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def bootstrap_trades(trade_returns, n_resamples=10000, n_trades=None, allocation_pct=0.1,
+                     initial_cash=100000, seed=None):
+    """
+    Resamples round-trip returns with replacement and rebuilds one equity
+    path per resample, compounding each trade on `allocation_pct` of the
+    capital (the Backtester's sizing, ignoring whole-share rounding).
+
+    Parameters:
+    - trade_returns: per-trade returns as decimals (e.g. TradeLedger.returns)
+    - n_resamples: number of bootstrap paths
+    - n_trades: trades per path (default: as many as the input)
+    - allocation_pct, initial_cash: same as Backtester
+    - seed: random seed
+
+    Returns:
+    - dict of total_return, sharpe_ratio and max_drawdown arrays (one value
+      per resample); the Sharpe ratio here is over per-trade equity steps
+    """
+    trade_returns = np.asarray(trade_returns, dtype=np.float64)
+    trade_returns = trade_returns[np.isfinite(trade_returns)]
+    n_trades = n_trades or len(trade_returns)
+    if n_trades == 0:
+        raise ValueError("bootstrap_trades needs at least one trade return")
+    rng = np.random.default_rng(seed)
+
+    chunks = []
+    for start in range(0, n_resamples, CHUNK_SIZE):
+        rows = min(CHUNK_SIZE, n_resamples - start)
+        picks = trade_returns[rng.integers(len(trade_returns), size=(rows, n_trades))]
+        equity = np.empty((rows, n_trades + 1))
+        equity[:, 0] = initial_cash
+        np.cumprod(1 + allocation_pct * picks, axis=1, out=equity[:, 1:])
+        equity[:, 1:] *= initial_cash
+        chunks.append(path_metrics(equity))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def block_bootstrap_indices(n_bars, n_resamples, block_size, rng):
+    """
+    Moving-block bootstrap: for each resample, source bar positions built from
+    random blocks of `block_size` consecutive bars (1..n_bars-1), so short-range
+    autocorrelation and volatility clustering are kept.
+
+    Returns:
+    - int64 array of shape (n_resamples, n_bars - 1)
+    """
+    n_steps = n_bars - 1
+    block_size = max(1, min(block_size, n_steps))
+    n_blocks = -(-n_steps // block_size)
+    starts = rng.integers(1, n_bars - block_size + 1, size=(n_resamples, n_blocks))
+    indices = (starts[:, :, None] + np.arange(block_size)).reshape(n_resamples, -1)
+    return indices[:, :n_steps]
+
+
+def resample_ohlcv(data, indices):
+    """
+    Builds resampled OHLCV paths from source bar positions.
+
+    Close-to-close log returns of the chosen bars are chained from the first
+    close; each bar's Open/High/Low keep their ratio to its own close and
+    Volume is copied.
+
+    Returns:
+    - dict of column -> (paths x bars) float64 array
+    """
+    close = data['Close']
+    log_returns = np.diff(np.log(close))
+    paths = np.empty((len(indices), len(close)))
+    paths[:, 0] = close[0]
+    paths[:, 1:] = close[0] * np.exp(np.cumsum(log_returns[indices - 1], axis=1))
+
+    # Bar 0 keeps its own shape; resampled bars take the shape of their source bar
+    sources = np.concatenate([np.zeros((len(indices), 1), dtype=indices.dtype), indices], axis=1)
+    columns = {'Close': paths}
+    for name in ('Open', 'High', 'Low'):
+        if name in data:
+            columns[name] = paths * (data[name] / close)[sources]
+    if 'Volume' in data:
+        columns['Volume'] = data['Volume'][sources]
+    return columns
+
+
+def _run_paths(data, indices, strategy_cls, strategy_kwargs, backtest_kwargs):
+    """
+    Builds the resampled paths for `indices`, runs the strategy and the
+    execution loop on each, and returns the batched metrics of the
+    resulting (paths x time) equity.
+    """
+    columns = resample_ohlcv(data, indices)
+    n_paths, n_bars = columns['Close'].shape
+    kernel = _simulate_jit if backtest_kwargs.get('use_jit', True) else _simulate
+    equity = np.empty((n_paths, n_bars))
+    positions = np.empty(n_bars)
+    trade_type = np.empty(2 * n_bars, dtype=np.int8)
+    trade_index = np.empty(2 * n_bars, dtype=np.int64)
+    trade_price = np.empty(2 * n_bars)
+    trade_shares = np.empty(2 * n_bars)
+
+    cash = float(backtest_kwargs.get('initial_cash', 100000))
+    for row in range(n_paths):
+        path = MarketData({name: values[row] for name, values in columns.items()}, data.index)
+        signals = strategy_cls(path, **strategy_kwargs).generate_signal_array()
+        kernel(
+            path['Close'], signals, cash, 0.0, 0.0, cash,
+            float(backtest_kwargs.get('allocation_pct', 0.1)),
+            float(backtest_kwargs.get('stop_loss_pct', 0.05)),
+            float(backtest_kwargs.get('take_profit_pct', 0.1)),
+            *_cost_args(prepare_costs(backtest_kwargs.get('costs'), path), path['Close']),
+            equity[row], positions, trade_type, trade_index, trade_price, trade_shares
+        )
+    return path_metrics(equity)
+
+
+def bootstrap_price_paths(data, strategy_cls, strategy_kwargs={}, n_resamples=1000, block_size=20, seed=None,
+                          max_workers=1, **backtest_kwargs):
+    """
+    Runs a strategy over block-bootstrapped versions of the price history.
+
+    The block positions for every resample are drawn up front (so results
+    do not depend on the number of workers). Paths are built as (paths x time)
+    arrays in chunks of at most CHUNK_SIZE, and each worker returns only the
+    per-path metrics.
+
+    Parameters:
+    - data: OHLCV DataFrame or MarketData
+    - strategy_cls, strategy_kwargs: strategy to test
+    - n_resamples: number of synthetic paths
+    - block_size: bars per bootstrap block
+    - seed: random seed
+    - max_workers: worker processes (1 = in this process, None = all cores)
+    - backtest_kwargs: initial_cash, allocation_pct, stop_loss_pct, take_profit_pct, costs, use_jit
+
+    Returns:
+    - dict of total_return, sharpe_ratio and max_drawdown arrays (one value per path)
+    """
+    data = as_market_data(data)
+    if len(data) < 3:
+        raise ValueError("bootstrap_price_paths needs at least 3 bars")
+    rng = np.random.default_rng(seed)
+    indices = block_bootstrap_indices(len(data), n_resamples, block_size, rng)
+    chunk_size = min(CHUNK_SIZE, max(1, -(-n_resamples // (max_workers or os.cpu_count()))))
+    chunks = [indices[start:start + chunk_size] for start in range(0, n_resamples, chunk_size)]
+
+    max_workers = max_workers or os.cpu_count()
+    if max_workers > 1 and len(chunks) > 1:
+        # Workers get the source bars and their block positions, and build their own paths
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_run_paths, data, chunk, strategy_cls, strategy_kwargs, backtest_kwargs)
+                       for chunk in chunks]
+            results = [future.result() for future in futures]
+    else:
+        results = [_run_paths(data, chunk, strategy_cls, strategy_kwargs, backtest_kwargs) for chunk in chunks]
+    return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
@@ -0,0 +1,215 @@
+# utils/streaming.py
+
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class RollingMean:
+    """
+    Simple moving average updated one value at a time in O(1).
+    NaN until `window` values have been seen (like pandas rolling().mean()).
+    The running sum is rebuilt from the window every `window` updates
+    so rounding error cannot build up on long feeds.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nan_count = 0
+        self.updates = 0
+        self.value = NAN
+
+    def update(self, x):
+        self.values.append(x)
+        if math.isnan(x):
+            self.nan_count += 1
+        else:
+            self.total += x
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.total = math.fsum(v for v in self.values if not math.isnan(v))
+
+        full = len(self.values) == self.window and self.nan_count == 0
+        self.value = self.total / self.window if full else NAN
+        return self.value
+
+
+class RollingStd:
+    """
+    Rolling sample standard deviation (ddof=1) with O(1) add/remove updates
+    of the window mean and sum of squared deviations (Welford).
+    The state is rebuilt from the window every `window` updates, and after
+    a NaN has left the window.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.nan_count = 0
+        self.stale = False
+        self.updates = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = NAN
+
+    def _rebuild(self):
+        n = len(self.values)
+        self.mean = math.fsum(self.values) / n
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+        self.stale = False
+
+    def update(self, x):
+        self.values.append(x)
+        old = self.values.popleft() if len(self.values) > self.window else None
+        if math.isnan(x):
+            self.nan_count += 1
+        if old is not None and math.isnan(old):
+            self.nan_count -= 1
+        self.updates += 1
+
+        if self.nan_count:
+            # pandas gives NaN while the window holds a NaN
+            self.stale = True
+        elif self.stale or self.updates % self.window == 0:
+            self._rebuild()
+        else:
+            n = len(self.values)
+            if old is None:
+                delta = x - self.mean
+                self.mean += delta / n
+                self.m2 += delta * (x - self.mean)
+            else:
+                # Replace `old` with `x` in a full window
+                old_mean = self.mean
+                self.mean += (x - old) / n
+                self.m2 += (x - old) * (x - self.mean + old - old_mean)
+
+        n = len(self.values)
+        if n == self.window and n > 1 and not self.nan_count:
+            self.value = math.sqrt(max(self.m2, 0.0) / (n - 1))
+        else:
+            self.value = NAN
+        return self.value
+
+
+class EMA:
+    """
+    Exponential moving average, same recursion as pandas ewm(adjust=False).
+    """
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = NAN
+
+    def update(self, x):
+        if math.isnan(self.value):
+            self.value = x
+        elif not math.isnan(x):
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class RSI:
+    """
+    RSI from simple rolling means of gains and losses
+    (same definition as utils.indicators.rsi).
+    """
+    def __init__(self, window):
+        self.gain = RollingMean(window)
+        self.loss = RollingMean(window)
+        self.prev = NAN
+        self.value = NAN
+
+    def update(self, price):
+        delta = price - self.prev
+        # The first bar (no previous price) counts as no gain and no loss
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-delta if delta < 0 else 0.0)
+        self.prev = price
+
+        if math.isnan(gain) or math.isnan(loss):
+            self.value = NAN
+        elif loss == 0:
+            self.value = NAN if gain == 0 else 100.0
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+
+class MACD:
+    """
+    MACD line and signal line from three EMAs.
+    """
+    def __init__(self, fast, slow, signal):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value = NAN
+        self.signal_value = NAN
+
+    def update(self, price):
+        self.value = self.fast.update(price) - self.slow.update(price)
+        self.signal_value = self.signal.update(self.value)
+        return self.value, self.signal_value
+
+
+class RollingMax:
+    """
+    Rolling maximum over the last `window` values using a monotonic deque
+    (amortized O(1) per update).
+    """
+    def __init__(self, window):
+        self.window = window
+        self.count = 0
+        self.candidates = deque()  # (index, value), values decreasing
+        self.value = NAN
+
+    def _better(self, new, old):
+        return new >= old
+
+    def update(self, x):
+        i = self.count
+        self.count += 1
+        while self.candidates and self._better(x, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((i, x))
+        if self.candidates[0][0] <= i - self.window:
+            self.candidates.popleft()
+        self.value = self.candidates[0][1] if self.count >= self.window else NAN
+        return self.value
+
+
+class RollingMin(RollingMax):
+    """
+    Rolling minimum over the last `window` values (monotonic deque).
+    """
+    def _better(self, new, old):
+        return new <= old
+
+
+class Crossover:
+    """
+    Detects crosses between two streams, bar by bar.
+    update() returns +1 when `a` crosses above `b`, -1 when it crosses
+    below, else 0 (same rule as strategies.base_strategy.crosses_above/below).
+    """
+    def __init__(self):
+        self.prev_a = NAN
+        self.prev_b = NAN
+
+    def update(self, a, b):
+        result = 0
+        if a > b and self.prev_a <= self.prev_b:
+            result = 1
+        elif a < b and self.prev_a >= self.prev_b:
+            result = -1
+        self.prev_a = a
+        self.prev_b = b
+        return result